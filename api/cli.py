@@ -0,0 +1,117 @@
+"""
+Operational commands, run from the repository root:
+
+    python -m api.cli migrate [--target VERSION] [--dry-run]
+    python -m api.cli generate-codes --count N --expires YYYY-MM-DD [--prefix P] [--length L] [--output FILE]
+    python -m api.cli purge-promotions [--before YYYY-MM-DD]
+    python -m api.cli import-customers FILE [--format csv|ndjson] [--errors FILE] [--batch-size N]
+"""
+import argparse
+import csv
+import sys
+from datetime import datetime
+from .dependencies.database import SessionLocal, engine
+from .migrations import runner
+
+
+def migrate(args):
+    if args.dry_run:
+        for version, name, _ in runner.pending(engine):
+            if args.target is None or version <= args.target:
+                print(f"Pending {version:04d} {name}")
+        return
+    applied = runner.migrate(engine, target=args.target)
+    print(f"Applied {len(applied)} migration(s)" if applied else "Schema is up to date")
+
+
+def generate_codes(args):
+    from .controllers import promotions
+
+    output = open(args.output, "w") if args.output else sys.stdout
+
+    def write(batch):
+        output.writelines(code + "\n" for code in batch)
+        output.flush()
+
+    try:
+        with SessionLocal() as db:
+            result = promotions.generate_codes(db, args.prefix, args.count, args.expires,
+                                               length=args.length, on_batch=write)
+    finally:
+        if args.output:
+            output.close()
+    print(f"Created {result['created']} code(s), {result['collisions']} collision(s) retried", file=sys.stderr)
+
+
+def purge_promotions(args):
+    from .controllers import promotions
+
+    with SessionLocal() as db:
+        purged = promotions.purge_expired_once(db, before=args.before)
+    if purged is None:
+        print("Another process is already purging expired promotions")
+        return
+    print(f"Purged {purged['promotions']} promotion(s) and {purged['order_links']} order link(s) "
+          f"in {purged['batches']} batch(es)")
+
+
+def import_customers(args):
+    from .controllers import customers
+
+    fmt = args.format or ("ndjson" if args.file.endswith((".ndjson", ".jsonl")) else "csv")
+    errors = open(args.errors, "w", newline="") if args.errors else sys.stderr
+    writer = csv.writer(errors)
+    writer.writerow(["line", "email", "error"])
+
+    def progress(summary):
+        print(f"{summary['rows']} rows read, {summary['imported']} imported, {summary['errors']} errors",
+              file=sys.stderr)
+
+    try:
+        with open(args.file, "rb") as source, SessionLocal() as db:
+            chunks = iter(lambda: source.read(64 * 1024), b"")
+            summary = customers.import_customers(db, chunks, fmt,
+                                                 batch_size=args.batch_size or customers.IMPORT_BATCH_SIZE,
+                                                 on_error=lambda *row: writer.writerow(row), on_progress=progress)
+    finally:
+        if args.errors:
+            errors.close()
+    print(f"Imported {summary['imported']} of {summary['rows']} row(s) in {summary['batches']} batch(es), "
+          f"{summary['errors']} error(s), {summary['superseded']} superseded by a later row")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m api.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = commands.add_parser("migrate", help="Apply pending schema migrations")
+    migrate_parser.add_argument("--target", type=int, help="Stop after this migration version")
+    migrate_parser.add_argument("--dry-run", action="store_true", help="List pending migrations without applying them")
+    migrate_parser.set_defaults(handler=migrate)
+
+    generate_parser = commands.add_parser("generate-codes", help="Create single-use promotion codes in batches")
+    generate_parser.add_argument("--count", type=int, required=True, help="Number of codes to create")
+    generate_parser.add_argument("--expires", type=datetime.fromisoformat, required=True, help="Expiration date")
+    generate_parser.add_argument("--prefix", default="", help="Text every code starts with")
+    generate_parser.add_argument("--length", type=int, default=10, help="Random characters after the prefix")
+    generate_parser.add_argument("--output", help="Write the codes to this file instead of stdout")
+    generate_parser.set_defaults(handler=generate_codes)
+
+    purge_parser = commands.add_parser("purge-promotions", help="Delete expired promotions and their order links")
+    purge_parser.add_argument("--before", type=datetime.fromisoformat,
+                              help="Purge promotions that expired before this time (default: the grace period)")
+    purge_parser.set_defaults(handler=purge_promotions)
+
+    import_parser = commands.add_parser("import-customers", help="Upsert customers on email from a CSV or NDJSON file")
+    import_parser.add_argument("file", help="File to import")
+    import_parser.add_argument("--format", choices=["csv", "ndjson"], help="Default: from the file extension")
+    import_parser.add_argument("--errors", help="Write rejected rows to this CSV file instead of stderr")
+    import_parser.add_argument("--batch-size", type=int, help="Rows per upsert and commit")
+    import_parser.set_defaults(handler=import_customers)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
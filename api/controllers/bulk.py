@@ -0,0 +1,71 @@
+from fastapi import HTTPException, status
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+CHUNK_SIZE = 500
+
+
+def chunked(items, size=CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def create_many(db: Session, model, rows: list[dict], unique: str, conflict_detail: str):
+    """
+    Insert many rows in one transaction and report the outcome of each.
+
+    Rows whose ``unique`` value repeats within the request or already exists are
+    reported as conflicts; the rest are inserted with chunked executemany
+    ``INSERT`` statements and a single commit.
+    """
+    key_column = getattr(model, unique)
+    results = [{"index": index, "status": "created"} for index in range(len(rows))]
+    # MySQL's default collation compares unique strings case-insensitively
+    fold = str.casefold if db.get_bind().dialect.name == "mysql" else str
+
+    first_seen = {}
+    for index, row in enumerate(rows):
+        key = fold(row[unique])
+        if key in first_seen:
+            results[index].update(status="conflict", detail=conflict_detail)
+        else:
+            first_seen[key] = index
+
+    try:
+        existing = set()
+        for indexes in chunked(list(first_seen.values())):
+            keys = [rows[index][unique] for index in indexes]
+            found = {fold(key) for key in db.scalars(select(key_column).where(key_column.in_(keys)))}
+            if not found <= {fold(key) for key in keys}:
+                # The column's collation matched a stored value that folds
+                # differently (accents, trailing spaces); ask it key by key.
+                found = {fold(key) for key in keys
+                         if db.scalar(select(key_column).where(key_column == key).limit(1)) is not None}
+            existing |= found
+        for key in existing:
+            results[first_seen.pop(key)].update(status="conflict", detail=conflict_detail)
+
+        pending = list(first_seen.values())
+        for indexes in chunked(pending):
+            db.execute(insert(model), [rows[index] for index in indexes])
+        for indexes in chunked(pending):
+            keys = [rows[index][unique] for index in indexes]
+            for item_id, key in db.execute(select(model.id, key_column).where(key_column.in_(keys))):
+                index = first_seen.get(fold(key))
+                if index is not None:
+                    results[index]["id"] = item_id
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{conflict_detail}; a conflicting row was created concurrently, nothing was inserted"
+        )
+    except SQLAlchemyError as e:
+        db.rollback()
+        error = str(e.__dict__.get('orig', e)) or str(e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+    created = len(first_seen)
+    return {"created": created, "conflicts": len(rows) - created, "results": results}
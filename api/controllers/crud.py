@@ -0,0 +1,80 @@
+from fastapi import HTTPException, status
+from sqlalchemy import or_, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+
+def increment(db: Session, model, keys: dict, deltas: dict):
+    """
+    Add ``deltas`` to the counter columns of the row identified by ``keys``, creating it if missing.
+
+    This is one ``INSERT ... ON DUPLICATE KEY UPDATE`` (``ON CONFLICT`` on
+    SQLite) with ``column = column + delta``, so concurrent writers to the
+    same row never lose an increment. The caller owns the commit.
+    """
+    columns = [getattr(model, name) for name in deltas]
+    if db.get_bind().dialect.name == "mysql":
+        statement = mysql.insert(model).values(**keys, **deltas)
+        statement = statement.on_duplicate_key_update(
+            {column.key: column + statement.inserted[column.key] for column in columns})
+    else:
+        statement = sqlite.insert(model).values(**keys, **deltas)
+        statement = statement.on_conflict_do_update(
+            index_elements=[getattr(model, name) for name in keys],
+            set_={column.key: column + statement.excluded[column.key] for column in columns},
+        )
+    db.execute(statement)
+
+
+def update_by_id(db: Session, model, item_id, values: dict, not_found="Id not found!", expected_version=None,
+                 commit=True):
+    """
+    Apply ``values`` to one row with a single ``UPDATE ... WHERE id = :id``.
+
+    The WHERE clause also requires at least one column to differ, so a PUT
+    that changes nothing writes nothing and skips the commit. The new row is
+    read back through RETURNING where the dialect supports it, otherwise with
+    one follow-up SELECT; a missing row is reported as 404.
+
+    Versioned models get ``version = version + 1`` on every write. Passing
+    ``expected_version`` turns the statement into a compare-and-swap on the
+    version column, and a row that moved on is reported as 412.
+
+    With ``commit=False`` the caller can make further writes in the same
+    transaction and owns the commit.
+    """
+    versioned = hasattr(model, "version")
+    if values:
+        statement = (
+            update(model)
+            .where(model.id == item_id)
+            .where(or_(*(getattr(model, key).is_distinct_from(value) for key, value in values.items())))
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+        if versioned:
+            statement = statement.values(version=model.version + 1)
+            if expected_version is not None:
+                statement = statement.where(model.version == expected_version)
+        if db.get_bind().dialect.update_returning:
+            row = db.execute(statement.returning(*model.__table__.columns)).first()
+            if row is not None:
+                if commit:
+                    db.commit()
+                item = model(**row._mapping)
+                make_transient_to_detached(item)
+                return db.merge(item, load=False)
+        elif db.execute(statement).rowcount:
+            if commit:
+                db.commit()
+            expected_version = None
+
+    item = db.query(model).filter(model.id == item_id).first()
+    if not item:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found)
+    if versioned and expected_version is not None and item.version != expected_version:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"Version {expected_version} is stale, current version is {item.version}"
+        )
+    return item
@@ -0,0 +1,48 @@
+from decimal import Decimal
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from . import crud
+from ..models.customer_order_stats import CustomerOrderStats
+from ..models.orders import Order
+
+
+def record(db: Session, customer_id, total_price, count=1):
+    """
+    Add one order to its customer's stats, or take it away with ``count=-1``.
+
+    The row is upserted with atomic increments; call it inside the
+    transaction that writes the order, the caller owns the commit.
+    """
+    if customer_id is None:
+        return
+    crud.increment(db, CustomerOrderStats, {"customer_id": customer_id},
+                   {"order_count": count, "lifetime_spend": Decimal(str(total_price or 0)) * count})
+
+
+def move(db: Session, before, after):
+    """Move an order's contribution from its old (customer_id, total_price) to the new one."""
+    old = (before.customer_id, Decimal(str(before.total_price or 0)))
+    if old != (after.customer_id, Decimal(str(after.total_price or 0))):
+        record(db, before.customer_id, before.total_price, -1)
+        record(db, after.customer_id, after.total_price, 1)
+
+
+def stats(db: Session, customer_id: int):
+    """The customer's stats row by primary key; zeros when they have never ordered."""
+    row = db.execute(
+        select(CustomerOrderStats.order_count, CustomerOrderStats.lifetime_spend)
+        .where(CustomerOrderStats.customer_id == customer_id)
+    ).first()
+    order_count, lifetime_spend = row or (0, 0)
+    return {"customer_id": customer_id, "order_count": order_count, "lifetime_spend": lifetime_spend}
+
+
+def rebuild(connection):
+    """Recompute every stats row from the orders table."""
+    connection.execute(CustomerOrderStats.__table__.delete())
+    connection.execute(CustomerOrderStats.__table__.insert().from_select(
+        ["customer_id", "order_count", "lifetime_spend"],
+        select(Order.customer_id, func.count(), func.coalesce(func.sum(Order.total_price), 0))
+        .where(Order.customer_id.is_not(None))
+        .group_by(Order.customer_id),
+    ))
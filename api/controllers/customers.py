@@ -1,7 +1,22 @@
+import logging
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects import mysql, sqlite
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status, Response
 from sqlalchemy.exc import SQLAlchemyError
 from ..models import customers as model
+from ..models.orders import Order
+from ..schemas.customers import CustomerCreate
+from . import bulk, customer_order_stats, imports, orders
+from ..dependencies.config import conf
+from ..dependencies.pagination import Page
+
+IMPORT_BATCH_SIZE = getattr(conf, "customer_import_batch_size", 1000)
+# Errors kept in the HTTP response; the CLI writes every one to its error file.
+MAX_REPORTED_ERRORS = 1000
+
+logger = logging.getLogger(__name__)
 
 
 def create(db: Session, request):
@@ -26,9 +41,129 @@ def create(db: Session, request):
     return new_customer
 
 
-def read_all(db: Session):
+def create_bulk(db: Session, requests):
+    rows = [request.model_dump() for request in requests]
+    return bulk.create_many(db, model.Customer, rows, unique="email", conflict_detail="Email must be unique")
+
+
+def _upsert(db: Session, rows: list[dict]):
+    """Insert ``rows``, updating the existing customer wherever the email is already taken."""
+    if db.get_bind().dialect.name == "mysql":
+        statement = mysql.insert(model.Customer)
+        statement = statement.on_duplicate_key_update(
+            {key: statement.inserted[key] for key in ("name", "phone_number", "address")})
+    else:
+        statement = sqlite.insert(model.Customer)
+        statement = statement.on_conflict_do_update(
+            index_elements=[model.Customer.email],
+            set_={key: statement.excluded[key] for key in ("name", "phone_number", "address")},
+        )
+    db.execute(statement, rows)
+
+
+class CustomerImport:
+    """
+    Validate parsed records with ``CustomerCreate`` and upsert them on email ``batch_size`` at a time.
+
+    Each batch is one executemany upsert and one commit; when the database
+    rejects a batch, its rows are retried one by one so only the bad ones are
+    reported. Within a batch a later row for the same email wins and the
+    earlier one is counted as ``superseded``, so every row read is counted as
+    imported, an error or superseded. Errors go to
+    ``on_error(line, email, detail)`` and ``on_progress(summary)`` is called
+    after every batch.
+    """
+
+    def __init__(self, db: Session, batch_size=IMPORT_BATCH_SIZE, on_error=None, on_progress=None):
+        self.db = db
+        self.batch_size = batch_size
+        self.on_error = on_error
+        self.on_progress = on_progress
+        # MySQL's default collation compares unique strings case-insensitively
+        self._fold = str.casefold if db.get_bind().dialect.name == "mysql" else str
+        self._batch = {}
+        self.summary = {"rows": 0, "imported": 0, "errors": 0, "superseded": 0, "batches": 0}
+
+    def _error(self, line, email, detail):
+        self.summary["errors"] += 1
+        if self.on_error:
+            self.on_error(line, email, detail)
+
+    def add(self, line, record):
+        self.summary["rows"] += 1
+        if isinstance(record, Exception):
+            return self._error(line, None, str(record))
+        try:
+            customer = CustomerCreate.model_validate(record)
+        except ValidationError as e:
+            detail = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+            return self._error(line, record.get("email"), detail)
+        if self._batch.pop(self._fold(customer.email), None) is not None:
+            self.summary["superseded"] += 1
+        self._batch[self._fold(customer.email)] = (line, customer.model_dump())
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._batch:
+            return
+        batch, self._batch = list(self._batch.values()), {}
+        try:
+            _upsert(self.db, [row for _, row in batch])
+            self.db.commit()
+            self.summary["imported"] += len(batch)
+        except SQLAlchemyError:
+            self.db.rollback()
+            for line, row in batch:
+                try:
+                    _upsert(self.db, [row])
+                    self.db.commit()
+                    self.summary["imported"] += 1
+                except SQLAlchemyError as e:
+                    self.db.rollback()
+                    self._error(line, row["email"], str(e.__dict__.get('orig', e)) or str(e))
+        self.summary["batches"] += 1
+        if self.on_progress:
+            self.on_progress(dict(self.summary))
+
+    def run(self, records):
+        for line, record in records:
+            self.add(line, record)
+        self.flush()
+        return self.summary
+
+
+def import_customers(db: Session, chunks, fmt: str, batch_size=IMPORT_BATCH_SIZE, on_error=None, on_progress=None):
+    """Import customers from an iterable of CSV or NDJSON byte chunks, upserting on email."""
+    importer = CustomerImport(db, batch_size, on_error=on_error, on_progress=on_progress)
+    return importer.run(imports.records(imports.lines(chunks), fmt))
+
+
+async def import_stream(db: Session, stream, fmt: str):
+    """
+    ``import_customers`` for an uploaded request body, read as it arrives.
+
+    Progress is logged per batch; the response carries the counts and the
+    first ``MAX_REPORTED_ERRORS`` row errors.
+    """
+    errors = []
+
+    def on_error(line, email, detail):
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line, "email": email, "detail": detail})
+
+    def on_progress(summary):
+        logger.info("Customer import: %(rows)s rows read, %(imported)s imported, %(errors)s errors", summary)
+
+    summary = await imports.consume(stream, lambda chunks: import_customers(
+        db, chunks, fmt, on_error=on_error, on_progress=on_progress))
+    return {**summary, "error_details": errors}
+
+
+def read_all(db: Session, page: Page = None):
     try:
-        customers = db.query(model.Customer).all()
+        query = db.query(model.Customer)
+        customers = page.paginate(query, model.Customer.id) if page else query.all()
     except SQLAlchemyError as e:
         error = str(e.__dict__.get('orig', e)) or str(e)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
@@ -46,6 +181,41 @@ def read_one(db: Session, customer_id: int):
     return customer
 
 
+def read_orders(db: Session, customer_id: int, page: Page, summary: bool = False):
+    """
+    The customer's orders, newest first, always paged on (order_date, id).
+
+    Both views walk ix_orders_customer_history. ``summary`` returns only id,
+    order_date, total_price and status, which that index covers, and does not
+    load order details.
+    """
+    try:
+        if db.get(model.Customer, customer_id) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Customer not found")
+        if summary:
+            statement = select(Order.id, Order.order_date, Order.total_price, Order.status)
+        else:
+            statement = select(Order).options(*orders.LOAD_OPTIONS)
+        statement = page.apply(statement.where(Order.customer_id == customer_id),
+                               Order.order_date, Order.id, descending=True)
+        rows = db.execute(statement).all() if summary else db.scalars(statement).all()
+    except SQLAlchemyError as e:
+        error = str(e.__dict__.get('orig', e)) or str(e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    return page.collect(rows, Order.order_date, Order.id)
+
+
+def read_order_stats(db: Session, customer_id: int):
+    """Order count and lifetime spend from the maintained customer_order_stats row."""
+    try:
+        if db.get(model.Customer, customer_id) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Customer not found")
+        return customer_order_stats.stats(db, customer_id)
+    except SQLAlchemyError as e:
+        error = str(e.__dict__.get('orig', e)) or str(e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+
 def update(db: Session, customer_id: int, request):
     try:
         customer = db.query(model.Customer).filter(model.Customer.id == customer_id).first()
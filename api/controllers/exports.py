@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from ..models.orders import Order
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+BATCH_SIZE = 1000
+
+
+def _json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def filter_order_date(statement, start: datetime | None, end: datetime | None):
+    """Restrict a statement to orders placed in the half-open range [start, end)."""
+    if start:
+        statement = statement.where(Order.order_date >= start)
+    if end:
+        statement = statement.where(Order.order_date < end)
+    return statement
+
+
+def stream(db: Session, statement, fmt: str, filename: str):
+    """
+    Stream the rows of a Core select as NDJSON or CSV.
+
+    Rows are fetched through a server-side cursor ``BATCH_SIZE`` at a time and
+    written out one batch per chunk, so memory stays flat regardless of table size.
+    """
+    columns = [column.key for column in statement.selected_columns]
+
+    def ndjson():
+        result = db.execute(statement.execution_options(yield_per=BATCH_SIZE))
+        for batch in result.partitions():
+            yield "".join(
+                json.dumps({key: _json_value(value) for key, value in zip(columns, row)}) + "\n"
+                for row in batch
+            )
+
+    def csv_rows():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        result = db.execute(statement.execution_options(yield_per=BATCH_SIZE))
+        for batch in result.partitions():
+            writer.writerows(batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    return StreamingResponse(
+        ndjson() if fmt == "ndjson" else csv_rows(),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
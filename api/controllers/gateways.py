@@ -0,0 +1,63 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+
+class GatewayError(Exception):
+    """A failure worth retrying: timeouts, rate limits, 5xx from the provider."""
+
+
+class PaymentDeclined(Exception):
+    """The provider refused the payment; retrying will not help."""
+
+
+@dataclass
+class Charge:
+    payment_id: int
+    amount: object
+    payment_type: str | None
+    card_information: str | None
+
+
+class PaymentGateway:
+    """
+    Interface the payment workers charge through.
+
+    ``charge`` returns a provider reference, raises PaymentDeclined for a
+    final refusal and GatewayError for anything that may succeed on retry.
+    Implementations must treat ``payment_id`` as an idempotency key, because
+    a retry after a timeout can repeat a charge that already went through.
+    """
+
+    def charge(self, charge: Charge) -> str:
+        raise NotImplementedError
+
+
+class SimulatedGateway(PaymentGateway):
+    """In-process stand-in that adds latency, transient failures and declines."""
+
+    def __init__(self, latency=(0.05, 0.3), failure_rate=0.1, decline_rate=0.02, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.decline_rate = decline_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._charged = {}
+
+    def charge(self, charge: Charge) -> str:
+        with self._lock:
+            if charge.payment_id in self._charged:
+                return self._charged[charge.payment_id]
+            delay = self._random.uniform(*self.latency)
+            roll = self._random.random()
+        time.sleep(delay)
+        if roll < self.failure_rate:
+            raise GatewayError("Simulated gateway timeout")
+        if roll < self.failure_rate + self.decline_rate:
+            raise PaymentDeclined("Simulated decline")
+        with self._lock:
+            return self._charged.setdefault(charge.payment_id, f"sim-{charge.payment_id}")
+
+
+GATEWAYS = {"simulated": SimulatedGateway}
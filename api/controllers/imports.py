@@ -0,0 +1,102 @@
+import asyncio
+import codecs
+import csv
+import json
+import queue
+from starlette.concurrency import run_in_threadpool
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+QUEUE_CHUNKS = 16
+
+
+def lines(chunks):
+    """Decode an iterable of UTF-8 byte chunks into lines without reading it all first."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *complete, pending = pending.split("\n")
+        for line in complete:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def records(lines, fmt: str):
+    """
+    Yield (line_number, record) for every row of a CSV or NDJSON stream.
+
+    CSV rows are keyed by the header and empty cells become None. A row that
+    cannot be parsed is yielded with a ValueError in place of the record, so
+    one bad line does not stop the import.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            if None in row:
+                yield reader.line_num, ValueError(f"Expected {len(reader.fieldnames)} fields")
+                continue
+            yield reader.line_num, {key: value if value != "" else None for key, value in row.items()}
+        return
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, ValueError(f"Invalid JSON: {e}")
+            continue
+        yield line_number, record if isinstance(record, dict) else ValueError("Expected a JSON object")
+
+
+def _received(chunks):
+    while (chunk := chunks.get()) is not None:
+        if isinstance(chunk, BaseException):
+            raise chunk
+        yield chunk
+
+
+def _abort(chunks, error):
+    """End the worker's input with ``error`` right away, dropping whatever it has not read yet."""
+    while True:
+        try:
+            chunks.get_nowait()
+        except queue.Empty:
+            break
+    chunks.put_nowait(error)
+
+
+async def consume(stream, work):
+    """
+    Run ``work(chunks)`` in a worker thread, feeding it the async byte ``stream``.
+
+    Chunks pass through a bounded queue, so a slow consumer applies
+    backpressure to the upload instead of the body piling up in memory. If
+    the stream breaks off (a client disconnect), the same error is raised
+    inside ``work``, and awaited, so it stops mid-batch and releases its
+    session instead of waiting for chunks that never come.
+    """
+    chunks = queue.Queue(maxsize=QUEUE_CHUNKS)
+    worker = asyncio.ensure_future(run_in_threadpool(work, _received(chunks)))
+    worker.add_done_callback(lambda future: future.cancelled() or future.exception())
+
+    def put(chunk):
+        while not worker.done():
+            try:
+                chunks.put(chunk, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        async for chunk in stream:
+            if chunk and not await run_in_threadpool(put, chunk):
+                break
+    except BaseException as e:
+        _abort(chunks, e)
+        await asyncio.wait([worker])
+        raise
+    await run_in_threadpool(put, None)
+    return await worker
@@ -0,0 +1,162 @@
+import threading
+import time
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from ..models.recipes import Recipe
+from ..models.resources import Resource
+from ..dependencies import metrics
+from ..dependencies.config import conf
+
+
+class BomCache:
+    """
+    Process-local bill of materials: sandwich_id -> ((resource_id, amount, time_to_make), ...).
+
+    Recipes change rarely, so order lines read them from here instead of the
+    database. The recipes controller invalidates entries after every commit,
+    but only in its own process, so entries also expire after ``ttl`` seconds
+    to bound how long a recipe written through another worker goes unseen.
+    Sandwiches without a recipe are not cached, so one added later is found
+    on the next order.
+    """
+
+    def __init__(self, ttl=30.0):
+        self.ttl = ttl
+        self._entries = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, db: Session, sandwich_ids):
+        result = {}
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generation
+            for sandwich_id in sandwich_ids:
+                entry = self._entries.get(sandwich_id)
+                if entry is not None and now - entry[0] < self.ttl:
+                    result[sandwich_id] = entry[1]
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        missing = [sandwich_id for sandwich_id in sandwich_ids if sandwich_id not in result]
+        if not missing:
+            return result
+
+        loaded = {sandwich_id: [] for sandwich_id in missing}
+        rows = db.execute(
+            select(Recipe.sandwich_id, Recipe.resource_id, Recipe.amount, Recipe.time_to_make)
+            .where(Recipe.sandwich_id.in_(missing))
+        ).all()
+        for sandwich_id, resource_id, amount, time_to_make in rows:
+            loaded[sandwich_id].append((resource_id, amount, time_to_make))
+        loaded = {sandwich_id: tuple(bom) for sandwich_id, bom in loaded.items()}
+
+        with self._lock:
+            # Skip the fill if a recipe write invalidated us while we were reading.
+            if generation == self._generation:
+                self._entries.update((sandwich_id, (now, bom)) for sandwich_id, bom in loaded.items() if bom)
+        result.update(loaded)
+        return result
+
+    def invalidate(self, *sandwich_ids):
+        """Drop the given sandwiches, or everything when called without arguments."""
+        with self._lock:
+            self._generation += 1
+            if not sandwich_ids:
+                self._entries.clear()
+            for sandwich_id in sandwich_ids:
+                self._entries.pop(sandwich_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+bom_cache = BomCache(ttl=getattr(conf, "bom_cache_ttl", 30.0))
+
+
+@metrics.register
+def _bom_cache_metrics():
+    stats = bom_cache.stats()
+    return (
+        metrics.metric("bom_cache_hits_total", "counter", "Recipe lookups served from the cache.", [({}, stats["hits"])])
+        + metrics.metric("bom_cache_misses_total", "counter", "Recipe lookups that read the database.", [({}, stats["misses"])])
+        + metrics.metric("bom_cache_entries", "gauge", "Sandwiches with a cached recipe.", [({}, stats["size"])])
+    )
+
+
+def _insufficient(shortfalls):
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={
+            "message": "Insufficient ingredients",
+            "details": shortfalls
+        }
+    )
+
+
+def _shortfalls(required, stock):
+    return [
+        {"item": stock[resource_id][0], "available": stock[resource_id][1], "required": amount}
+        for resource_id, amount in required.items()
+        if stock[resource_id][1] < amount
+    ]
+
+
+def reserve(db: Session, lines):
+    """
+    Take stock for every (sandwich_id, quantity) line inside the current transaction.
+
+    The bill of materials comes from ``bom_cache`` and current stock is read
+    with one query (``SELECT ... FOR UPDATE`` on MySQL), then every resource is
+    decremented by a single guarded ``UPDATE ... WHERE amount >= required`` so
+    concurrent orders cannot oversell. The caller owns the commit; on any
+    shortfall the transaction is rolled back.
+    """
+    quantities = {}
+    for sandwich_id, amount in lines:
+        quantities[sandwich_id] = quantities.get(sandwich_id, 0) + amount
+
+    required = {}
+    for sandwich_id, bom in bom_cache.get_many(db, list(quantities)).items():
+        if not bom:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No recipe found for sandwich ID {sandwich_id}"
+            )
+        for resource_id, per_sandwich, _ in bom:
+            required[resource_id] = required.get(resource_id, 0) + per_sandwich * quantities[sandwich_id]
+
+    query = select(Resource.id, Resource.item, Resource.amount).where(Resource.id.in_(required))
+    if db.get_bind().dialect.name == "mysql":
+        query = query.with_for_update()
+    stock = {resource_id: (item, available) for resource_id, item, available in db.execute(query).all()}
+    for resource_id in required:
+        if resource_id not in stock:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Resource ID {resource_id} not found"
+            )
+
+    shortfalls = _shortfalls(required, stock)
+    if shortfalls:
+        raise _insufficient(shortfalls)
+
+    needed = case(required, value=Resource.id)
+    result = db.execute(
+        update(Resource)
+        .where(Resource.id.in_(required), Resource.amount >= needed)
+        .values(amount=Resource.amount - needed, version=Resource.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(required):
+        # Another order took the stock between our read and the update.
+        db.rollback()
+        current = db.execute(
+            select(Resource.id, Resource.item, Resource.amount).where(Resource.id.in_(required))
+        ).all()
+        stock = {resource_id: (item, available) for resource_id, item, available in current}
+        raise _insufficient(_shortfalls(required, stock))
@@ -0,0 +1,85 @@
+import hashlib
+import threading
+import time
+from fastapi import Response, status
+from ..dependencies import metrics
+from ..dependencies.config import conf
+
+
+class MenuSnapshot:
+    """
+    The serialized ``GET /sandwiches`` body, cached per menu version.
+
+    Sandwich, recipe and resource writes call ``bump`` after they commit; the
+    next read serializes the menu once and every later read reuses the bytes.
+    The ETag is a hash of the body, so a matching If-None-Match is answered
+    with 304 without a query, and workers that hold the same menu agree on it.
+    Like bom_cache the version is per process, so ``ttl`` bounds how long a
+    write made through another worker can go unseen.
+    """
+
+    def __init__(self, ttl=30.0, max_age=5):
+        self.ttl = ttl
+        self.max_age = max_age
+        self.version = 0
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.not_modified = 0
+        self.builds = 0
+
+    def bump(self):
+        with self._lock:
+            self.version += 1
+
+    def current(self):
+        """Return the cached (version, built_at, body, etag) if it is still current, else None."""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot[0] == self.version and time.monotonic() - snapshot[1] < self.ttl:
+            return snapshot
+        return None
+
+    def store(self, version, body: bytes):
+        """Cache ``body`` as the menu at ``version``, unless a write bumped the version meanwhile."""
+        snapshot = (version, time.monotonic(), body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        with self._lock:
+            self.builds += 1
+            if version == self.version:
+                self._snapshot = snapshot
+        return snapshot
+
+    def respond(self, snapshot, if_none_match: str | None):
+        """The cached body, or 304 when ``if_none_match`` already names it."""
+        _, _, body, etag = snapshot
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={self.max_age}"}
+        if if_none_match is not None and _matches(if_none_match, etag):
+            self.not_modified += 1
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        self.hits += 1
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def stats(self):
+        return {"version": self.version, "hits": self.hits, "not_modified": self.not_modified, "builds": self.builds}
+
+
+def _matches(if_none_match: str, etag: str):
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+snapshot = MenuSnapshot(
+    ttl=getattr(conf, "menu_snapshot_ttl", 30.0),
+    max_age=getattr(conf, "menu_max_age", 5),
+)
+
+
+@metrics.register
+def _menu_metrics():
+    stats = snapshot.stats()
+    return (
+        metrics.metric("menu_version", "gauge", "Menu writes seen by this process.", [({}, stats["version"])])
+        + metrics.metric("menu_responses_total", "counter", "Menu requests answered from the snapshot, by status.",
+                         [({"status": "200"}, stats["hits"]), ({"status": "304"}, stats["not_modified"])])
+        + metrics.metric("menu_snapshot_builds_total", "counter", "Times the menu was queried and serialized.",
+                         [({}, stats["builds"])])
+    )
@@ -1,51 +1,18 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, status, Response, Depends
 from ..models import order_details as model
-from ..models.recipes import Recipe
-from ..models.resources import Resource
+from ..dependencies.pagination import Page
+from ..models.orders import Order
+from . import crud, exports, inventory
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
+from datetime import datetime
 
+# Relationships rendered by schemas.order_details.OrderDetail
+LOAD_OPTIONS = (joinedload(model.OrderDetail.sandwich),)
 
-def create(db: Session, request):
-    insufficient_resources = []
-
-    recipes = db.query(Recipe).filter_by(sandwich_id=request.sandwich_id).all()
-    if not recipes:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"No recipe found for sandwich ID {request.sandwich_id}"
-        )
-
-    for recipe in recipes:
-        resource = db.query(Resource).filter_by(id=recipe.resource_id).first()
-        if not resource:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Resource ID {recipe.resource_id} not found"
-            )
-
-        required_amount = recipe.amount * request.amount
-        if resource.amount < required_amount:
-            insufficient_resources.append({
-                "item": resource.item,
-                "available": resource.amount,
-                "required": required_amount
-            })
-
-    if insufficient_resources:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={
-                "message": "Insufficient ingredients",
-                "details": insufficient_resources
-            }
-        )
-
-    for recipe in recipes:
-        resource = db.query(Resource).filter_by(id=recipe.resource_id).first()
-        resource.amount -= recipe.amount * request.amount
-        db.add(resource)
 
+def create(db: Session, request):
     new_item = model.OrderDetail(
         order_id=request.order_id,
         sandwich_id=request.sandwich_id,
@@ -53,19 +20,22 @@ def create(db: Session, request):
     )
 
     try:
+        inventory.reserve(db, [(request.sandwich_id, request.amount)])
         db.add(new_item)
         db.commit()
         db.refresh(new_item)
     except SQLAlchemyError as e:
+        db.rollback()
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
     return new_item
 
 
-def read_all(db: Session):
+def read_all(db: Session, page: Page = None):
     try:
-        result = db.query(model.OrderDetail).all()
+        query = db.query(model.OrderDetail).options(*LOAD_OPTIONS)
+        result = page.paginate(query, model.OrderDetail.id) if page else query.all()
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
@@ -74,7 +44,7 @@ def read_all(db: Session):
 
 def read_one(db: Session, item_id):
     try:
-        item = db.query(model.OrderDetail).filter(model.OrderDetail.id == item_id).first()
+        item = db.query(model.OrderDetail).options(*LOAD_OPTIONS).filter(model.OrderDetail.id == item_id).first()
         if not item:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
     except SQLAlchemyError as e:
@@ -85,16 +55,13 @@ def read_one(db: Session, item_id):
 
 def update(db: Session, item_id, request):
     try:
-        item = db.query(model.OrderDetail).filter(model.OrderDetail.id == item_id)
-        if not item.first():
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
         update_data = request.dict(exclude_unset=True)
-        item.update(update_data, synchronize_session=False)
-        db.commit()
+        item = crud.update_by_id(db, model.OrderDetail, item_id, update_data)
     except SQLAlchemyError as e:
+        db.rollback()
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-    return item.first()
+    return item
 
 
 def delete(db: Session, item_id):
@@ -108,3 +75,10 @@ def delete(db: Session, item_id):
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+def export(db: Session, fmt: str, start: datetime | None = None, end: datetime | None = None):
+    statement = select(*model.OrderDetail.__table__.columns).order_by(model.OrderDetail.id)
+    if start or end:
+        statement = statement.join(Order, Order.id == model.OrderDetail.order_id)
+    return exports.stream(db, exports.filter_order_date(statement, start, end), fmt, "order_details")
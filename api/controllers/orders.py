@@ -1,8 +1,18 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 from fastapi import HTTPException, status, Response, Depends
 from ..models import orders as model
+from ..models.order_details import OrderDetail
+from ..dependencies.config import conf
+from ..dependencies.pagination import Page
+from . import crud, customer_order_stats, exports, inventory
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+# Relationships rendered by schemas.orders.Order
+LOAD_OPTIONS = (selectinload(model.Order.order_details).joinedload(OrderDetail.sandwich),)
 
 
 def create(db: Session, request):
@@ -16,6 +26,7 @@ def create(db: Session, request):
 
     try:
         db.add(new_order)
+        customer_order_stats.record(db, new_order.customer_id, new_order.total_price)
         db.commit()
         db.refresh(new_order)
     except SQLAlchemyError as e:
@@ -25,9 +36,42 @@ def create(db: Session, request):
     return new_order
 
 
-def read_all(db: Session):
+def checkout(db: Session, request):
+    """
+    Create an order and all of its details, reserving stock for every line, in one commit.
+    """
+    new_order = model.Order(
+        customer_id=request.customer_id,
+        customer_name=request.customer_name,
+        tracking_number=request.tracking_number,
+        total_price=request.total_price,
+        description=request.description,
+        order_type=request.order_type,
+        status=request.status,
+        order_details=[
+            OrderDetail(sandwich_id=line.sandwich_id, amount=line.amount)
+            for line in request.order_details
+        ]
+    )
+
     try:
-        result = db.query(model.Order).all()
+        inventory.reserve(db, [(line.sandwich_id, line.amount) for line in request.order_details])
+        db.add(new_order)
+        customer_order_stats.record(db, new_order.customer_id, new_order.total_price)
+        db.commit()
+        db.refresh(new_order)
+    except SQLAlchemyError as e:
+        db.rollback()
+        error = str(e.__dict__.get('orig', e))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+    return new_order
+
+
+def read_all(db: Session, page: Page = None):
+    try:
+        query = db.query(model.Order).options(*LOAD_OPTIONS)
+        result = page.paginate(query, model.Order.id) if page else query.all()
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
@@ -36,7 +80,7 @@ def read_all(db: Session):
 
 def read_one(db: Session, item_id):
     try:
-        item = db.query(model.Order).filter(model.Order.id == item_id).first()
+        item = db.query(model.Order).options(*LOAD_OPTIONS).filter(model.Order.id == item_id).first()
         if not item:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
     except SQLAlchemyError as e:
@@ -45,26 +89,58 @@ def read_one(db: Session, item_id):
     return item
 
 
-def update(db: Session, item_id, request):
+async def read_all_async(db: AsyncSession, page: Page = None):
     try:
-        item = db.query(model.Order).filter(model.Order.id == item_id)
-        if not item.first():
+        statement = select(model.Order).options(*LOAD_OPTIONS)
+        result = await page.paginate_async(db, statement, model.Order.id) if page else (await db.scalars(statement)).all()
+    except SQLAlchemyError as e:
+        error = str(e.__dict__['orig'])
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    return result
+
+
+async def read_one_async(db: AsyncSession, item_id):
+    try:
+        item = (await db.scalars(select(model.Order).options(*LOAD_OPTIONS).filter(model.Order.id == item_id))).first()
+        if not item:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+    except SQLAlchemyError as e:
+        error = str(e.__dict__['orig'])
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    return item
+
+
+def update(db: Session, item_id, request, expected_version=None):
+    try:
         update_data = request.dict(exclude_unset=True)
-        item.update(update_data, synchronize_session=False)
+        before = None
+        if "customer_id" in update_data or "total_price" in update_data:
+            before = db.execute(
+                select(model.Order.customer_id, model.Order.total_price)
+                .where(model.Order.id == item_id)
+                .with_for_update()
+            ).first()
+        item = crud.update_by_id(db, model.Order, item_id, update_data, expected_version=expected_version,
+                                 commit=False)
+        if before is not None:
+            customer_order_stats.move(db, before, item)
         db.commit()
     except SQLAlchemyError as e:
+        db.rollback()
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-    return item.first()
+    return item
 
 
 def delete(db: Session, item_id):
     try:
         item = db.query(model.Order).filter(model.Order.id == item_id)
-        if not item.first():
+        # Locked like update, so a concurrent update cannot change what the stats subtract.
+        order = item.with_for_update().first()
+        if not order:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
         item.delete(synchronize_session=False)
+        customer_order_stats.record(db, order.customer_id, order.total_price, -1)
         db.commit()
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
@@ -72,16 +148,44 @@ def delete(db: Session, item_id):
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-def read_all_sorted_by_date(db: Session, date: datetime | None = None):
+def to_db_time(value: datetime | None):
+    """Convert an aware datetime to the naive time zone order_date is stored in."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(ZoneInfo(getattr(conf, "db_timezone", "UTC"))).replace(tzinfo=None)
+
+
+def read_all_sorted_by_date(db: Session, date: datetime | None = None,
+                            start: datetime | None = None, end: datetime | None = None, page: Page = None):
+    """
+    Orders newest first, optionally limited to the half-open range [start, end).
+
+    ``date`` is shorthand for that whole day. The bounds are plain comparisons on
+    order_date so the (order_date, id) index serves both the filter and the sort.
+    """
     try:
-        query = db.query(model.Order)
+        query = db.query(model.Order).options(*LOAD_OPTIONS)
         if date:
-            start_of_day = datetime.combine(date, datetime.min.time())
-            end_of_day = datetime.combine(date, datetime.max.time())
-            query = query.filter(model.Order.order_date.between(start_of_day, end_of_day))
+            start = datetime.combine(date, datetime.min.time(), tzinfo=date.tzinfo)
+            end = start + timedelta(days=1)
+        conditions = []
+        if start:
+            conditions.append(model.Order.order_date >= to_db_time(start))
+        if end:
+            conditions.append(model.Order.order_date < to_db_time(end))
+        if conditions:
+            query = query.filter(*conditions)
 
-        result = query.order_by(model.Order.order_date.desc()).all()
+        if page and page.active:
+            result = page.paginate(query, model.Order.order_date, model.Order.id, descending=True)
+        else:
+            result = query.order_by(model.Order.order_date.desc(), model.Order.id.desc()).all()
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
     return result
+
+
+def export(db: Session, fmt: str, start: datetime | None = None, end: datetime | None = None):
+    statement = select(*model.Order.__table__.columns).order_by(model.Order.id)
+    return exports.stream(db, exports.filter_order_date(statement, start, end), fmt, "orders")
@@ -0,0 +1,214 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import or_, select, update
+from ..dependencies import metrics
+from ..dependencies.config import conf
+from ..dependencies.database import SessionLocal
+from ..models.payments import Payment
+from .gateways import GATEWAYS, Charge, GatewayError, PaymentDeclined
+
+PENDING = "pending"
+PROCESSING = "processing"
+COMPLETED = "completed"
+DECLINED = "declined"
+FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentProcessor:
+    """
+    Charges pending payments on a pool of worker threads.
+
+    The API commits a payment as ``pending`` and enqueues its id. A worker
+    claims it with a guarded ``UPDATE ... WHERE transaction_status = 'pending'``,
+    so a payment is charged by one worker even across processes, and then
+    records the outcome. Transient gateway errors, and any unexpected error
+    while charging or recording the outcome, put the payment back to
+    ``pending`` and retry it after an exponential backoff, up to
+    ``max_attempts``; after that it is marked ``failed``. Pending payments left
+    by a restart are picked up again on ``start``, along with payments whose
+    ``processing`` claim is older than ``lease`` seconds because the worker
+    holding it died. Gateways are idempotent on the payment id, so charging a
+    reclaimed payment again is safe.
+    """
+
+    def __init__(self, session_factory, gateway, workers=4, max_attempts=5, backoff_base=0.5, backoff_max=30.0,
+                 lease=300.0):
+        self.session_factory = session_factory
+        self.gateway = gateway
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.outcomes = {COMPLETED: 0, DECLINED: 0, FAILED: 0, "retried": 0}
+        self._queue = queue.Queue()
+        self._threads = []
+        self._timers = set()
+        self._lock = threading.Lock()
+        self._running = False
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._work, name=f"payment-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        with self.session_factory() as db:
+            self.resume(db)
+
+    def resume(self, db):
+        """Reclaim expired claims and enqueue every pending payment; both read ix_payments_transaction_status."""
+        self.reclaim(db)
+        for payment_id in db.scalars(select(Payment.id).where(Payment.transaction_status == PENDING)):
+            self.enqueue(payment_id)
+
+    def stop(self, timeout=5.0):
+        """Stop taking work; payments still queued stay pending and are resumed on the next start."""
+        self._running = False
+        with self._lock:
+            for timer in self._timers:
+                timer.cancel()
+            self._timers.clear()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def reclaim(self, db):
+        """Put ``processing`` payments whose claim is older than the lease back to ``pending``."""
+        expired = datetime.now() - timedelta(seconds=self.lease)
+        result = db.execute(
+            update(Payment)
+            .where(Payment.transaction_status == PROCESSING,
+                   or_(Payment.claimed_at.is_(None), Payment.claimed_at < expired))
+            .values(transaction_status=PENDING, version=Payment.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount
+
+    def enqueue(self, payment_id, attempt=1):
+        if self._running:
+            self._queue.put((payment_id, attempt))
+
+    def backoff(self, attempt):
+        return min(self.backoff_base * 2 ** (attempt - 1), self.backoff_max)
+
+    def join(self):
+        """Block until every queued payment, including scheduled retries, is processed."""
+        while True:
+            self._queue.join()
+            with self._lock:
+                if not self._timers and not self._queue.unfinished_tasks:
+                    return
+            time.sleep(0.01)
+
+    def _retry_later(self, payment_id, attempt):
+        def fire():
+            self.enqueue(payment_id, attempt)
+            with self._lock:
+                self._timers.discard(timer)
+
+        timer = threading.Timer(self.backoff(attempt - 1), fire)
+        timer.daemon = True
+        with self._lock:
+            if not self._running:
+                return
+            self._timers.add(timer)
+        timer.start()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self.process(*item)
+            except Exception:
+                logger.exception("Payment worker failed on %s", item)
+            finally:
+                self._queue.task_done()
+
+    def _set_status(self, db, payment_id, status, expected, **values):
+        result = db.execute(
+            update(Payment)
+            .where(Payment.id == payment_id, Payment.transaction_status == expected)
+            .values(transaction_status=status, version=Payment.version + 1, **values)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount == 1
+
+    def process(self, payment_id, attempt=1):
+        retry = FAILED if attempt >= self.max_attempts else PENDING
+        with self.session_factory() as db:
+            if not self._set_status(db, payment_id, PROCESSING, expected=PENDING, claimed_at=datetime.now()):
+                return
+            try:
+                payment = db.execute(
+                    select(Payment.id, Payment.amount, Payment.payment_type, Payment.card_information)
+                    .where(Payment.id == payment_id)
+                ).one()
+                # Hand the connection back to the pool while the gateway works.
+                db.commit()
+                try:
+                    self.gateway.charge(Charge(payment.id, payment.amount, payment.payment_type,
+                                               payment.card_information))
+                except PaymentDeclined:
+                    outcome = DECLINED
+                except GatewayError:
+                    outcome = retry
+                except Exception:
+                    logger.exception("Unexpected error charging payment %s", payment_id)
+                    outcome = retry
+                else:
+                    outcome = COMPLETED
+                self._set_status(db, payment_id, outcome, expected=PROCESSING)
+            except Exception:
+                # The outcome was not recorded; release the claim so the
+                # payment is charged again (idempotently) rather than stuck.
+                logger.exception("Could not record the outcome of payment %s", payment_id)
+                db.rollback()
+                outcome = retry
+                self._set_status(db, payment_id, outcome, expected=PROCESSING)
+
+        with self._lock:
+            self.outcomes["retried" if outcome == PENDING else outcome] += 1
+        if outcome == PENDING:
+            self._retry_later(payment_id, attempt + 1)
+
+    def collect(self):
+        return (
+            metrics.metric("payment_queue_depth", "gauge", "Payments waiting for a worker.",
+                           [({}, self._queue.qsize())])
+            + metrics.metric("payment_retries_scheduled", "gauge", "Payments waiting out a backoff.",
+                             [({}, len(self._timers))])
+            + metrics.metric("payments_processed_total", "counter", "Payments processed, by outcome.",
+                             [({"outcome": outcome}, count) for outcome, count in self.outcomes.items()])
+        )
+
+
+processor = PaymentProcessor(
+    SessionLocal,
+    GATEWAYS[getattr(conf, "payment_gateway", "simulated")](),
+    workers=getattr(conf, "payment_workers", 4),
+    max_attempts=getattr(conf, "payment_max_attempts", 5),
+    backoff_base=getattr(conf, "payment_backoff_base", 0.5),
+    backoff_max=getattr(conf, "payment_backoff_max", 30.0),
+    lease=getattr(conf, "payment_lease", 300.0),
+)
+metrics.register(processor.collect)
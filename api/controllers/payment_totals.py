@@ -0,0 +1,57 @@
+from datetime import date, datetime
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from . import crud
+from ..models.payment_totals import PaymentTotal
+from ..models.payments import Payment
+
+
+def record(db: Session, created_at: datetime, payment_type, amount, count=1):
+    """
+    Add ``amount`` and ``count`` to the ledger row for that day and payment type.
+
+    The row is upserted with an atomic increment, so concurrent payments on
+    the same day do not lose updates. Call it inside the transaction that
+    writes the payment; the caller owns the commit.
+    """
+    crud.increment(db, PaymentTotal, dict(day=created_at.date(), payment_type=payment_type or ""),
+                   dict(total=amount or 0, payment_count=count))
+
+
+def move(db: Session, before, after):
+    """Move a payment's contribution from its old (created_at, payment_type, amount) to the new one."""
+    old = (before.created_at.date(), before.payment_type or "", before.amount or 0)
+    new = (after.created_at.date(), after.payment_type or "", after.amount or 0)
+    if old != new:
+        record(db, before.created_at, before.payment_type, -(before.amount or 0), -1)
+        record(db, after.created_at, after.payment_type, after.amount, 1)
+
+
+def totals(db: Session, start: date | None = None, end: date | None = None):
+    """Sum the ledger over the days in [start, end), in total and per payment type."""
+    statement = (
+        select(PaymentTotal.payment_type, func.sum(PaymentTotal.total), func.sum(PaymentTotal.payment_count))
+        .group_by(PaymentTotal.payment_type)
+    )
+    if start:
+        statement = statement.where(PaymentTotal.day >= start)
+    if end:
+        statement = statement.where(PaymentTotal.day < end)
+    rows = db.execute(statement).all()
+    return {
+        "total": sum((total for _, total, _ in rows), 0),
+        "count": sum(count for _, _, count in rows),
+        "by_payment_type": {payment_type: total for payment_type, total, _ in rows},
+    }
+
+
+def rebuild(connection):
+    """Recompute every ledger row from the payments table."""
+    day = func.date(Payment.created_at)
+    payment_type = func.coalesce(Payment.payment_type, "")
+    connection.execute(PaymentTotal.__table__.delete())
+    connection.execute(PaymentTotal.__table__.insert().from_select(
+        ["day", "payment_type", "total", "payment_count"],
+        select(day, payment_type, func.coalesce(func.sum(Payment.amount), 0), func.count())
+        .group_by(day, payment_type),
+    ))
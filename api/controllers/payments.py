@@ -1,21 +1,38 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from fastapi import HTTPException, status, Response
 from sqlalchemy.exc import SQLAlchemyError
 from ..models import payments as model
 from ..models.orders import Order
-from sqlalchemy.sql import func
+from ..models.order_details import OrderDetail
+from ..dependencies.pagination import Page
+from sqlalchemy import select
+from datetime import date, datetime, timezone
+from . import crud, exports, payment_processing, payment_totals
+from .orders import to_db_time
+
+# Relationships rendered by schemas.payments.Payment
+LOAD_OPTIONS = (
+    joinedload(model.Payment.order).selectinload(Order.order_details).joinedload(OrderDetail.sandwich),
+)
 
 
 def create(db: Session, request):
+    """
+    Accept a payment as pending and queue it for the payment workers; the
+    gateway is never called on the request path.
+    """
     new_payment = model.Payment(
         order_id=request.order_id,
         card_information=request.card_information,
-        transaction_status=request.transaction_status,
-        payment_type=request.payment_type
+        amount=request.total,
+        transaction_status=payment_processing.PENDING,
+        payment_type=request.payment_type,
+        created_at=to_db_time(datetime.now(timezone.utc))
     )
 
     try:
         db.add(new_payment)
+        payment_totals.record(db, new_payment.created_at, new_payment.payment_type, new_payment.amount)
         db.commit()
         db.refresh(new_payment)
     except SQLAlchemyError as e:
@@ -24,12 +41,14 @@ def create(db: Session, request):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
+    payment_processing.processor.enqueue(new_payment.id)
     return new_payment
 
 
-def read_all(db: Session):
+def read_all(db: Session, page: Page = None):
     try:
-        payments = db.query(model.Payment).all()
+        query = db.query(model.Payment).options(*LOAD_OPTIONS)
+        payments = page.paginate(query, model.Payment.id) if page else query.all()
     except SQLAlchemyError as e:
         error = str(e.__dict__.get('orig', e)) or str(e)
         raise HTTPException(
@@ -39,7 +58,7 @@ def read_all(db: Session):
 
 def read_one(db: Session, payment_id: int):
     try:
-        payment = db.query(model.Payment).filter(
+        payment = db.query(model.Payment).options(*LOAD_OPTIONS).filter(
             model.Payment.id == payment_id).first()
         if not payment:
             raise HTTPException(
@@ -51,20 +70,24 @@ def read_one(db: Session, payment_id: int):
     return payment
 
 
-def update(db: Session, payment_id: int, request):
+def update(db: Session, payment_id: int, request, expected_version=None):
     try:
-        payment = db.query(model.Payment).filter(
-            model.Payment.id == payment_id).first()
-        if not payment:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found")
-
         update_data = request.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(payment, key, value)
-
+        if "total" in update_data:
+            update_data["amount"] = update_data.pop("total")
+        before = None
+        if "amount" in update_data or "payment_type" in update_data:
+            before = db.execute(
+                select(model.Payment.created_at, model.Payment.payment_type, model.Payment.amount)
+                .where(model.Payment.id == payment_id)
+                .with_for_update()
+            ).first()
+        payment = crud.update_by_id(
+            db, model.Payment, payment_id, update_data,
+            not_found="Payment not found", expected_version=expected_version, commit=False)
+        if before is not None:
+            payment_totals.move(db, before, payment)
         db.commit()
-        db.refresh(payment)
     except SQLAlchemyError as e:
         db.rollback()
         error = str(e.__dict__.get('orig', e)) or str(e)
@@ -75,12 +98,14 @@ def update(db: Session, payment_id: int, request):
 
 def delete(db: Session, payment_id: int):
     try:
+        # Locked like update, so a concurrent update cannot change what the ledger subtracts.
         payment = db.query(model.Payment).filter(
-            model.Payment.id == payment_id).first()
+            model.Payment.id == payment_id).with_for_update().first()
         if not payment:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found")
         db.delete(payment)
+        payment_totals.record(db, payment.created_at, payment.payment_type, -(payment.amount or 0), -1)
         db.commit()
     except SQLAlchemyError as e:
         db.rollback()
@@ -90,9 +115,25 @@ def delete(db: Session, payment_id: int):
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-def get_total_payments(db: Session) -> float:
+def get_total_payments(db: Session, start: date | None = None, end: date | None = None):
+    """
+    Sum payments made on the days in [start, end) from the payment_totals ledger,
+    which holds one row per day and payment type.
+    """
+    try:
+        return payment_totals.totals(db, start, end)
+    except SQLAlchemyError as e:
+        error = str(e.__dict__.get('orig', e)) or str(e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+
+def export(db: Session, fmt: str, start: datetime | None = None, end: datetime | None = None):
     """
-    Calculate the sum of all payments.
+    Stream payments for accounting. Card information is never exported.
     """
-    total = db.query(func.sum(model.Payment.amount)).scalar()
-    return total if total else 0.0
+    columns = [column for column in model.Payment.__table__.columns if column.key != "card_information"]
+    statement = select(*columns).order_by(model.Payment.id)
+    if start or end:
+        statement = statement.join(Order, Order.id == model.Payment.order_id)
+    return exports.stream(db, exports.filter_order_date(statement, start, end), fmt, "payments")
@@ -1,8 +1,214 @@
-from sqlalchemy.orm import Session
+import heapq
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import delete as sql_delete, insert, select, text
+from sqlalchemy.orm import Session, joinedload, selectinload
 from fastapi import HTTPException, status, Response
-from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from datetime import datetime, timedelta, timezone
 from ..models import promotions as model
+from . import bulk
+from .orders import to_db_time
+from ..models.orders import Order
+from ..models.order_details import OrderDetail
+from ..dependencies import metrics
+from ..dependencies.bloom import BloomFilter
+from ..dependencies.config import conf
+from ..dependencies.database import SessionLocal
+from ..dependencies.pagination import Page
+
+# Unambiguous when read aloud or printed: no 0/O or 1/I.
+CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+GENERATE_BATCH_SIZE = getattr(conf, "promotion_generate_batch_size", 5000)
+GENERATE_MAX_RETRIES = 5
+PURGE_BATCH_SIZE = getattr(conf, "promotion_purge_batch_size", 1000)
+PURGE_LOCK_NAME = "promotion_purge"
+
+logger = logging.getLogger(__name__)
+
+# Relationships rendered by schemas.promotions.Promotion
+LOAD_OPTIONS = (
+    selectinload(model.Promotion.orders).selectinload(Order.order_details).joinedload(OrderDetail.sandwich),
+)
+
+
+
+class PromotionCodeCache:
+    """
+    Process-local lookup of promotion codes for ``validate``.
+
+    A Bloom filter of every existing code rejects codes that certainly do not
+    exist without a query, which is what brute-forced random codes hit. Codes
+    that pass it are read once and cached until their expiration_date, or for
+    at most ``ttl`` seconds, so a code deleted, renamed or expired early by
+    another worker stops validating here within ``ttl`` too. Writes in this process call ``add`` or ``invalidate``;
+    after an invalidation the filter is rebuilt on the next lookup.
+    Codes are compared case-folded to match MySQL's case-insensitive collation.
+    Once the filter holds more codes than it was sized for it is dropped and
+    rebuilt at the new size rather than left to saturate.
+
+    Codes created by other workers or the CLI are not seen by ``add``, so
+    every ``refresh`` seconds the filter also reads codes with ids above the
+    highest it holds, and every ``ttl`` seconds it is rebuilt outright, which
+    catches codes renamed elsewhere. The filter is always read from the
+    primary, since a lagging replica would leave codes out of it for good.
+    ``ttl=0`` turns the filter and the cache off, and every lookup costs a query.
+    """
+
+    def __init__(self, max_entries=10000, error_rate=0.01, ttl=300.0, refresh=5.0):
+        self.max_entries = max_entries
+        self.error_rate = error_rate
+        self.ttl = ttl
+        self.refresh = refresh
+        self._bloom = None
+        self._last_id = 0
+        self._built_at = 0.0
+        self._checked_at = 0.0
+        self._entries = OrderedDict()
+        self._expiry = []
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self.false_positives = 0
+
+    def _filter(self, db: Session):
+        if not self.ttl:
+            return None
+        with self._lock:
+            bloom, generation, last_id = self._bloom, self._generation, self._last_id
+            clock = time.monotonic()
+            fresh = bloom is not None and clock - self._built_at < self.ttl
+            if fresh and clock - self._checked_at < self.refresh:
+                return bloom
+        if fresh:
+            rows = db.execute(select(model.Promotion.id, model.Promotion.promotion_code)
+                              .where(model.Promotion.id > last_id)).all()
+            with self._lock:
+                if self._bloom is bloom and not bloom.full(len(rows)):
+                    for _, code in rows:
+                        bloom.add(code.casefold())
+                    self._last_id = max([self._last_id, *(promotion_id for promotion_id, _ in rows)])
+                    self._checked_at = clock
+                    return bloom
+        rows = db.execute(select(model.Promotion.id, model.Promotion.promotion_code)).all()
+        bloom = BloomFilter.from_iterable((code.casefold() for _, code in rows), self.error_rate)
+        with self._lock:
+            # Skip the install if a write invalidated us while we were reading.
+            if generation == self._generation:
+                self._bloom = bloom
+                self._last_id = max((promotion_id for promotion_id, _ in rows), default=0)
+                self._built_at = self._checked_at = clock
+        return bloom
+
+    def _evict(self, now):
+        while self._expiry and self._expiry[0][0] <= now:
+            evict_at, key = heapq.heappop(self._expiry)
+            cached = self._entries.get(key)
+            if cached is not None and cached[1] == evict_at:
+                del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if len(self._expiry) > 2 * self.max_entries:
+            self._expiry = [(evict_at, key) for key, (_, evict_at) in self._entries.items()]
+            heapq.heapify(self._expiry)
+
+    def lookup(self, db: Session, code: str, now: datetime, primary: Session = None):
+        """
+        Return (id, promotion_code, expiration_date) for ``code``, or None when it does not exist.
+
+        The filter is read from ``primary`` (default ``db``); a code it admits
+        that ``db`` does not have yet is looked up on ``primary`` as well.
+        """
+        primary = primary or db
+        key = code.casefold()
+        with self._lock:
+            self._evict(now)
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[0]
+            generation = self._generation
+
+        bloom = self._filter(primary)
+        if bloom is not None and key not in bloom:
+            with self._lock:
+                self.rejected += 1
+            return None
+
+        query = (select(model.Promotion.id, model.Promotion.promotion_code, model.Promotion.expiration_date)
+                 .where(model.Promotion.promotion_code == code))
+        row = db.execute(query).first()
+        if row is None and primary is not db:
+            row = primary.execute(query).first()
+        with self._lock:
+            if row is None:
+                self.false_positives += 1
+                return None
+            self.misses += 1
+            entry = tuple(row)
+            evict_at = min(entry[2], now + timedelta(seconds=self.ttl))
+            if generation == self._generation and evict_at > now:
+                self._entries[key] = (entry, evict_at)
+                heapq.heappush(self._expiry, (evict_at, key))
+                self._evict(now)
+        return entry
+
+    def add(self, *codes):
+        """Record newly created codes, rebuilding the filter instead once they would overfill it."""
+        with self._lock:
+            self._generation += 1
+            if self._bloom is not None and self._bloom.full(len(codes)):
+                self._bloom = None
+            elif self._bloom is not None:
+                for code in codes:
+                    self._bloom.add(code.casefold())
+
+    def invalidate(self):
+        """Forget every cached code and rebuild the filter on the next lookup."""
+        with self._lock:
+            self._generation += 1
+            self._bloom = None
+            self._entries.clear()
+            self._expiry.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "rejected": self.rejected,
+                    "false_positives": self.false_positives, "size": len(self._entries),
+                    "codes": len(self._bloom) if self._bloom is not None else 0}
+
+
+code_cache = PromotionCodeCache(
+    max_entries=getattr(conf, "promotion_cache_max_entries", 10000),
+    error_rate=getattr(conf, "promotion_bloom_error_rate", 0.01),
+    ttl=getattr(conf, "promotion_bloom_ttl", 300.0),
+    refresh=getattr(conf, "promotion_bloom_refresh", 5.0),
+)
+
+
+@metrics.register
+def _code_cache_metrics():
+    stats = code_cache.stats()
+    return (
+        metrics.metric("promotion_cache_hits_total", "counter", "Code validations served from the cache.",
+                       [({}, stats["hits"])])
+        + metrics.metric("promotion_cache_misses_total", "counter", "Code validations that read an existing code.",
+                         [({}, stats["misses"])])
+        + metrics.metric("promotion_bloom_rejections_total", "counter",
+                         "Code validations rejected by the Bloom filter without a query.", [({}, stats["rejected"])])
+        + metrics.metric("promotion_bloom_false_positives_total", "counter",
+                         "Unknown codes that passed the Bloom filter and cost a query.",
+                         [({}, stats["false_positives"])])
+        + metrics.metric("promotion_cache_entries", "gauge", "Promotion codes cached until they expire.",
+                         [({}, stats["size"])])
+        + metrics.metric("promotion_bloom_codes", "gauge", "Codes held by the Bloom filter.", [({}, stats["codes"])])
+    )
 
 
 def create(db: Session, request):
@@ -14,6 +220,7 @@ def create(db: Session, request):
     try:
         db.add(new_promotion)
         db.commit()
+        code_cache.add(new_promotion.promotion_code)
         db.refresh(new_promotion)
     except SQLAlchemyError as e:
         db.rollback()
@@ -25,9 +232,133 @@ def create(db: Session, request):
     return new_promotion
 
 
-def read_all(db: Session):
+def create_bulk(db: Session, requests):
+    rows = [request.model_dump() for request in requests]
+    result = bulk.create_many(db, model.Promotion, rows, unique="promotion_code", conflict_detail="Promotion code must be unique")
+    code_cache.add(*(row["promotion_code"] for row in rows))
+    return result
+
+
+def _random_codes(prefix: str, length: int, count: int, exclude=()):
+    codes, exclude = set(), set(exclude)
+    while len(codes) < count:
+        code = prefix + "".join(secrets.choice(CODE_ALPHABET) for _ in range(length))
+        if code not in exclude:
+            codes.add(code)
+    return list(codes)
+
+
+def generate_codes(db: Session, prefix: str, count: int, expiration_date: datetime, length: int = 10,
+                   batch_size: int = GENERATE_BATCH_SIZE, on_batch=None):
+    """
+    Insert ``count`` new single-use codes of the form prefix + ``length`` random characters.
+
+    Codes are inserted ``batch_size`` at a time, one multi-row INSERT and one
+    commit per batch. A batch that hits an existing code is rolled back, the
+    taken codes are swapped for fresh ones and the batch is retried, so the
+    codes returned are exactly the ones created. ``on_batch`` is called with
+    each committed batch, which lets callers stream codes out.
+    """
+    if len(CODE_ALPHABET) ** length < count * 100:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"{length} random characters are too few for {count} unique codes")
+    codes, collisions = [], 0
     try:
-        promotions = db.query(model.Promotion).all()
+        while len(codes) < count:
+            batch = _random_codes(prefix, length, min(batch_size, count - len(codes)))
+            for _ in range(GENERATE_MAX_RETRIES):
+                try:
+                    db.execute(insert(model.Promotion),
+                               [{"promotion_code": code, "expiration_date": expiration_date} for code in batch])
+                    db.commit()
+                    break
+                except IntegrityError:
+                    db.rollback()
+                    taken = {code.casefold() for code in db.scalars(
+                        select(model.Promotion.promotion_code).where(model.Promotion.promotion_code.in_(batch)))}
+                    kept = [code for code in batch if code.casefold() not in taken]
+                    if len(kept) == len(batch):
+                        raise
+                    collisions += len(batch) - len(kept)
+                    batch = kept + _random_codes(prefix, length, len(batch) - len(kept), exclude=kept)
+            else:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                    detail="Could not find unused codes; use a longer code length")
+            code_cache.add(*batch)
+            codes.extend(batch)
+            if on_batch:
+                on_batch(batch)
+    except SQLAlchemyError as e:
+        db.rollback()
+        error = str(e.__dict__.get('orig', e)) or str(e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    return {"created": len(codes), "collisions": collisions, "codes": codes}
+
+
+def purge_expired(db: Session, before: datetime | None = None, batch_size: int = PURGE_BATCH_SIZE):
+    """
+    Delete promotions that expired before ``before``, and their order links, in chunks.
+
+    Each chunk takes the next ``batch_size`` expired ids, deletes their
+    order_promotions rows and then the promotions, and commits, so no
+    transaction holds locks on more than one chunk. Defaults to everything
+    expired ``promotion_purge_grace_days`` ago; a ``before`` in the future is
+    clamped to now, so live promotions are never purged.
+    """
+    now = datetime.now(timezone.utc)
+    if before is None:
+        before = now - timedelta(days=getattr(conf, "promotion_purge_grace_days", 30))
+    before = min(to_db_time(before), to_db_time(now))
+    purged = {"promotions": 0, "order_links": 0, "batches": 0}
+    try:
+        while True:
+            ids = db.scalars(
+                select(model.Promotion.id)
+                .where(model.Promotion.expiration_date < before)
+                .order_by(model.Promotion.expiration_date, model.Promotion.id)
+                .limit(batch_size)
+            ).all()
+            if not ids:
+                break
+            links = db.execute(sql_delete(model.order_promotions).where(model.order_promotions.c.promotion_id.in_(ids)))
+            db.execute(sql_delete(model.Promotion).where(model.Promotion.id.in_(ids)))
+            db.commit()
+            purged["promotions"] += len(ids)
+            purged["order_links"] += links.rowcount
+            purged["batches"] += 1
+    except SQLAlchemyError as e:
+        db.rollback()
+        error = str(e.__dict__.get('orig', e)) or str(e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    finally:
+        if purged["promotions"]:
+            code_cache.invalidate()
+    return purged
+
+
+def purge_expired_once(db: Session, before: datetime | None = None):
+    """
+    ``purge_expired`` unless another process is already purging.
+
+    On MySQL a named lock, held on its own connection for the whole run, lets
+    one web worker or CLI run purge at a time; the rest return None at once
+    instead of deleting the same chunks and waiting on each other's locks.
+    """
+    with db.get_bind().connect() as lock:
+        locked = lock.dialect.name == "mysql"
+        if locked and not lock.scalar(text("SELECT GET_LOCK(:name, 0)"), {"name": PURGE_LOCK_NAME}):
+            return None
+        try:
+            return purge_expired(db, before=before)
+        finally:
+            if locked:
+                lock.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": PURGE_LOCK_NAME})
+
+
+def read_all(db: Session, page: Page = None):
+    try:
+        query = db.query(model.Promotion).options(*LOAD_OPTIONS)
+        promotions = page.paginate(query, model.Promotion.id) if page else query.all()
     except SQLAlchemyError as e:
         error = str(e.__dict__.get('orig', e)) or str(e)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
@@ -36,7 +367,7 @@ def read_all(db: Session):
 
 def read_one(db: Session, promotion_id: int):
     try:
-        promotion = db.query(model.Promotion).filter(model.Promotion.id == promotion_id).first()
+        promotion = db.query(model.Promotion).options(*LOAD_OPTIONS).filter(model.Promotion.id == promotion_id).first()
         if not promotion:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Promotion not found")
     except SQLAlchemyError as e:
@@ -45,6 +376,28 @@ def read_one(db: Session, promotion_id: int):
     return promotion
 
 
+def validate(db: Session, code: str, primary: Session = None):
+    """
+    Whether ``code`` is an existing promotion that has not expired.
+
+    Served by ``code_cache``: unknown codes are usually rejected by its Bloom
+    filter and live codes from memory, so only the first lookup of a code (and
+    the rare false positive) reaches the database. ``primary`` is where the
+    filter is built from when ``db`` is a replica.
+    """
+    now = to_db_time(datetime.now(timezone.utc))
+    try:
+        entry = code_cache.lookup(db, code, now, primary=primary)
+    except SQLAlchemyError as e:
+        error = str(e.__dict__.get('orig', e)) or str(e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    if entry is None:
+        return {"promotion_code": code, "valid": False}
+    promotion_id, promotion_code, expiration_date = entry
+    return {"promotion_code": promotion_code, "valid": expiration_date > now,
+            "promotion_id": promotion_id, "expiration_date": expiration_date}
+
+
 def update(db: Session, promotion_id: int, request):
     try:
         promotion = db.query(model.Promotion).filter(model.Promotion.id == promotion_id).first()
@@ -56,6 +409,7 @@ def update(db: Session, promotion_id: int, request):
             setattr(promotion, key, value)
 
         db.commit()
+        code_cache.invalidate()
         db.refresh(promotion)
     except SQLAlchemyError as e:
         db.rollback()
@@ -73,8 +427,51 @@ def delete(db: Session, promotion_id: int):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Promotion not found")
         db.delete(promotion)
         db.commit()
+        code_cache.invalidate()
     except SQLAlchemyError as e:
         db.rollback()
         error = str(e.__dict__.get('orig', e)) or str(e)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+class ExpiredPromotionPurger:
+    """
+    Run ``purge_expired_once`` every ``interval`` seconds on a daemon thread.
+
+    Every web worker runs one, but only the worker that takes the purge lock
+    does any work each round. Set ``promotion_purge_interval`` to 0 to leave
+    purging to ``python -m api.cli purge-promotions`` on a schedule instead.
+    """
+
+    def __init__(self, session_factory, interval):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None or not self.interval:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="promotion-purger", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                with self.session_factory() as db:
+                    purged = purge_expired_once(db)
+                if purged and purged["promotions"]:
+                    logger.info("Purged %(promotions)s expired promotions and %(order_links)s order links", purged)
+            except Exception:
+                logger.exception("Purging expired promotions failed")
+
+
+purger = ExpiredPromotionPurger(SessionLocal, interval=getattr(conf, "promotion_purge_interval", 60 * 60))
@@ -1,8 +1,14 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, status, Response
 from ..models import recipes as model
+from . import crud, menu
+from ..dependencies.pagination import Page
+from .inventory import bom_cache
 from sqlalchemy.exc import SQLAlchemyError
 
+# Relationships rendered by schemas.recipes.Recipe
+LOAD_OPTIONS = (joinedload(model.Recipe.sandwich), joinedload(model.Recipe.resource))
+
 
 def create(db: Session, request):
     new_item = model.Recipe(
@@ -19,12 +25,15 @@ def create(db: Session, request):
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
+    bom_cache.invalidate(new_item.sandwich_id)
+    menu.snapshot.bump()
     return new_item
 
 
-def read_all(db: Session):
+def read_all(db: Session, page: Page = None):
     try:
-        result = db.query(model.Recipe).all()
+        query = db.query(model.Recipe).options(*LOAD_OPTIONS)
+        result = page.paginate(query, model.Recipe.id) if page else query.all()
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
@@ -33,7 +42,7 @@ def read_all(db: Session):
 
 def read_one(db: Session, item_id):
     try:
-        item = db.query(model.Recipe).filter(model.Recipe.id == item_id).first()
+        item = db.query(model.Recipe).options(*LOAD_OPTIONS).filter(model.Recipe.id == item_id).first()
         if not item:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
     except SQLAlchemyError as e:
@@ -44,26 +53,33 @@ def read_one(db: Session, item_id):
 
 def update(db: Session, item_id, request):
     try:
-        item = db.query(model.Recipe).filter(model.Recipe.id == item_id)
-        if not item.first():
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
         update_data = request.dict(exclude_unset=True)
-        item.update(update_data, synchronize_session=False)
-        db.commit()
+        item = crud.update_by_id(db, model.Recipe, item_id, update_data)
     except SQLAlchemyError as e:
+        db.rollback()
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-    return item.first()
+    if "sandwich_id" in update_data:
+        # The previous sandwich is not known after a single UPDATE, so drop them all
+        bom_cache.invalidate()
+    else:
+        bom_cache.invalidate(item.sandwich_id)
+    menu.snapshot.bump()
+    return item
 
 
 def delete(db: Session, item_id):
     try:
         item = db.query(model.Recipe).filter(model.Recipe.id == item_id)
-        if not item.first():
+        existing = item.first()
+        if not existing:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+        sandwich_id = existing.sandwich_id
         item.delete(synchronize_session=False)
         db.commit()
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    bom_cache.invalidate(sandwich_id)
+    menu.snapshot.bump()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
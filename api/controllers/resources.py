@@ -1,6 +1,10 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status, Response
 from ..models import resources as model
+from . import bulk, crud, menu
+from ..dependencies.pagination import Page
 from sqlalchemy.exc import SQLAlchemyError
 
 
@@ -19,12 +23,21 @@ def create(db: Session, request):
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
+    menu.snapshot.bump()
     return new_item
 
 
-def read_all(db: Session):
+def create_bulk(db: Session, requests):
+    rows = [request.model_dump() for request in requests]
+    result = bulk.create_many(db, model.Resource, rows, unique="item", conflict_detail="Item must be unique")
+    menu.snapshot.bump()
+    return result
+
+
+def read_all(db: Session, page: Page = None):
     try:
-        result = db.query(model.Resource).all()
+        query = db.query(model.Resource)
+        result = page.paginate(query, model.Resource.id) if page else query.all()
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
@@ -42,18 +55,37 @@ def read_one(db: Session, item_id):
     return item
 
 
-def update(db: Session, item_id, request):
+async def read_all_async(db: AsyncSession, page: Page = None):
     try:
-        item = db.query(model.Resource).filter(model.Resource.id == item_id)
-        if not item.first():
+        statement = select(model.Resource)
+        result = await page.paginate_async(db, statement, model.Resource.id) if page else (await db.scalars(statement)).all()
+    except SQLAlchemyError as e:
+        error = str(e.__dict__['orig'])
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    return result
+
+
+async def read_one_async(db: AsyncSession, item_id):
+    try:
+        item = (await db.scalars(select(model.Resource).filter(model.Resource.id == item_id))).first()
+        if not item:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+    except SQLAlchemyError as e:
+        error = str(e.__dict__['orig'])
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    return item
+
+
+def update(db: Session, item_id, request, expected_version=None):
+    try:
         update_data = request.dict(exclude_unset=True)
-        item.update(update_data, synchronize_session=False)
-        db.commit()
+        item = crud.update_by_id(db, model.Resource, item_id, update_data, expected_version=expected_version)
     except SQLAlchemyError as e:
+        db.rollback()
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-    return item.first()
+    menu.snapshot.bump()
+    return item
 
 
 def delete(db: Session, item_id):
@@ -66,4 +98,5 @@ def delete(db: Session, item_id):
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    menu.snapshot.bump()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
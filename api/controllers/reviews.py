@@ -1,7 +1,17 @@
-from sqlalchemy.orm import Session
+import re
+from sqlalchemy import Float, column, func, select, table, text, type_coerce
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, status, Response
 from sqlalchemy.exc import SQLAlchemyError
 from ..models import reviews as model
+from . import sandwich_ratings
+from ..dependencies.pagination import Page
+
+reviews_fts = table("reviews_fts", column("rowid"))
+
+# Relationships rendered by schemas.reviews.Review
+LOAD_OPTIONS = (joinedload(model.Review.customer), joinedload(model.Review.sandwich))
 
 
 def create(db: Session, request):
@@ -14,6 +24,7 @@ def create(db: Session, request):
 
     try:
         db.add(new_review)
+        sandwich_ratings.record(db, new_review.sandwich_id, new_review.score)
         db.commit()
         db.refresh(new_review)
     except SQLAlchemyError as e:
@@ -24,18 +35,62 @@ def create(db: Session, request):
     return new_review
 
 
-def read_all(db: Session):
+def read_all(db: Session, page: Page = None):
     try:
-        reviews = db.query(model.Review).all()
+        query = db.query(model.Review).options(*LOAD_OPTIONS)
+        reviews = page.paginate(query, model.Review.id) if page else query.all()
     except SQLAlchemyError as e:
         error = str(e.__dict__.get('orig', e)) or str(e)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
     return reviews
 
 
+def _search_terms(q: str):
+    return re.findall(r"\w+", q.lower())
+
+
+def search(db: Session, q: str, page: Page, sandwich_id: int | None = None, score: int | None = None):
+    """
+    Reviews whose text matches any word of ``q``, best matches first.
+
+    On MySQL this is a natural-language MATCH against the FULLTEXT index on
+    review_text (so words shorter than innodb_ft_min_token_size and stopwords
+    are ignored); elsewhere it uses the reviews_fts FTS5 table ranked by BM25.
+    Both indexes are maintained by the database on every review write. Results
+    are always paged by (relevance, id), ``page.limit`` at a time.
+    """
+    terms = _search_terms(q)
+    if not terms:
+        return []
+    if db.get_bind().dialect.name == "mysql":
+        relevance = type_coerce(match(model.Review.review_text, against=" ".join(terms))
+                                .in_natural_language_mode(), Float).label("relevance")
+        statement = select(model.Review, relevance).where(relevance > 0)
+    else:
+        # BM25 is lower for better matches; negate it so both backends sort descending.
+        relevance = type_coerce(-func.bm25(text("reviews_fts")), Float).label("relevance")
+        statement = (
+            select(model.Review, relevance)
+            .join(reviews_fts, reviews_fts.c.rowid == model.Review.id)
+            .where(text("reviews_fts MATCH :terms").bindparams(terms=" OR ".join(f'"{term}"' for term in terms)))
+        )
+    if sandwich_id is not None:
+        statement = statement.where(model.Review.sandwich_id == sandwich_id)
+    if score is not None:
+        statement = statement.where(model.Review.score == score)
+    statement = statement.add_columns(model.Review.id.label("id")).options(*LOAD_OPTIONS)
+
+    try:
+        rows = db.execute(page.apply(statement, relevance, model.Review.id, descending=True)).all()
+    except SQLAlchemyError as e:
+        error = str(e.__dict__.get('orig', e)) or str(e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    return [{"relevance": row.relevance, "review": row.Review} for row in page.collect(rows, relevance, model.Review.id)]
+
+
 def read_one(db: Session, review_id: int):
     try:
-        review = db.query(model.Review).filter(model.Review.id == review_id).first()
+        review = db.query(model.Review).options(*LOAD_OPTIONS).filter(model.Review.id == review_id).first()
         if not review:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Review not found")
     except SQLAlchemyError as e:
@@ -46,14 +101,17 @@ def read_one(db: Session, review_id: int):
 
 def update(db: Session, review_id: int, request):
     try:
-        review = db.query(model.Review).filter(model.Review.id == review_id).first()
+        # Locked so a concurrent update cannot move the same old score twice.
+        review = db.query(model.Review).filter(model.Review.id == review_id).with_for_update().first()
         if not review:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Review not found")
 
+        before = sandwich_ratings.Rated(review.sandwich_id, review.score)
         update_data = request.dict(exclude_unset=True)
         for key, value in update_data.items():
             setattr(review, key, value)
 
+        sandwich_ratings.move(db, before, review)
         db.commit()
         db.refresh(review)
     except SQLAlchemyError as e:
@@ -65,10 +123,12 @@ def update(db: Session, review_id: int, request):
 
 def delete(db: Session, review_id: int):
     try:
-        review = db.query(model.Review).filter(model.Review.id == review_id).first()
+        # Locked like update, so a concurrent update cannot change the score subtracted.
+        review = db.query(model.Review).filter(model.Review.id == review_id).with_for_update().first()
         if not review:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Review not found")
         db.delete(review)
+        sandwich_ratings.record(db, review.sandwich_id, review.score, -1)
         db.commit()
     except SQLAlchemyError as e:
         db.rollback()
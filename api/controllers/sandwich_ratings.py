@@ -0,0 +1,79 @@
+from collections import namedtuple
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from . import crud
+from ..models.reviews import Review
+from ..models.sandwich_ratings import SandwichRatingStats
+from ..models.sandwiches import Sandwich
+
+SCORES = range(1, 6)
+COUNTERS = ("review_count", "score_sum", *(f"score_{score}" for score in SCORES))
+
+Rated = namedtuple("Rated", "sandwich_id score")
+
+
+def record(db: Session, sandwich_id, score, count=1):
+    """
+    Add one review's score to its sandwich's stats, or take it away with ``count=-1``.
+
+    The row is upserted with atomic increments, so concurrent reviews of the
+    same sandwich do not lose updates. Reviews without a score are not
+    counted, and scores outside 1-5 count toward the average but have no
+    histogram bucket. Call it inside the transaction that writes the review; the
+    caller owns the commit.
+    """
+    if sandwich_id is None or score is None:
+        return
+    deltas = {"review_count": count, "score_sum": score * count}
+    if score in SCORES:
+        deltas[f"score_{score}"] = count
+    crud.increment(db, SandwichRatingStats, {"sandwich_id": sandwich_id}, deltas)
+
+
+def move(db: Session, before, after):
+    """Move a review's score from its old (sandwich_id, score) to the new one."""
+    if (before.sandwich_id, before.score) != (after.sandwich_id, after.score):
+        record(db, before.sandwich_id, before.score, -1)
+        record(db, after.sandwich_id, after.score, 1)
+
+
+def _summary(sandwich_id, row):
+    counts = dict(zip(COUNTERS, row or (0,) * len(COUNTERS)))
+    return {
+        "sandwich_id": sandwich_id,
+        "review_count": counts["review_count"],
+        "average_score": round(counts["score_sum"] / counts["review_count"], 2) if counts["review_count"] else None,
+        "histogram": {str(score): counts[f"score_{score}"] for score in SCORES},
+    }
+
+
+def rating(db: Session, sandwich_id: int):
+    """Stats for one sandwich by primary key, or None when the sandwich does not exist."""
+    columns = [getattr(SandwichRatingStats, name) for name in COUNTERS]
+    row = db.execute(select(*columns).where(SandwichRatingStats.sandwich_id == sandwich_id)).first()
+    if row is None and db.get(Sandwich, sandwich_id) is None:
+        return None
+    return _summary(sandwich_id, row)
+
+
+def ratings(db: Session):
+    """Stats for every sandwich on the menu, including those with no reviews yet."""
+    columns = [func.coalesce(getattr(SandwichRatingStats, name), 0) for name in COUNTERS]
+    rows = db.execute(
+        select(Sandwich.id, *columns)
+        .outerjoin(SandwichRatingStats, SandwichRatingStats.sandwich_id == Sandwich.id)
+        .order_by(Sandwich.id)
+    ).all()
+    return [_summary(row[0], row[1:]) for row in rows]
+
+
+def rebuild(connection):
+    """Recompute every stats row from the reviews table."""
+    scored = select(
+        Review.sandwich_id,
+        func.count(),
+        func.sum(Review.score),
+        *(func.sum(case((Review.score == score, 1), else_=0)) for score in SCORES),
+    ).where(Review.sandwich_id.is_not(None), Review.score.is_not(None)).group_by(Review.sandwich_id)
+    connection.execute(SandwichRatingStats.__table__.delete())
+    connection.execute(SandwichRatingStats.__table__.insert().from_select(["sandwich_id", *COUNTERS], scored))
@@ -1,8 +1,16 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status, Response
+from pydantic import TypeAdapter
 from ..models import sandwiches as model
+from ..schemas import sandwiches as schema
+from . import bulk, crud, menu, sandwich_ratings
+from ..dependencies.pagination import Page
 from sqlalchemy.exc import SQLAlchemyError
 
+MENU = TypeAdapter(list[schema.Sandwich])
+
 
 def create(db: Session, request):
     new_item = model.Sandwich(
@@ -20,12 +28,21 @@ def create(db: Session, request):
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
+    menu.snapshot.bump()
     return new_item
 
 
-def read_all(db: Session):
+def create_bulk(db: Session, requests):
+    rows = [request.model_dump() for request in requests]
+    result = bulk.create_many(db, model.Sandwich, rows, unique="sandwich_name", conflict_detail="Sandwich name must be unique")
+    menu.snapshot.bump()
+    return result
+
+
+def read_all(db: Session, page: Page = None):
     try:
-        result = db.query(model.Sandwich).all()
+        query = db.query(model.Sandwich)
+        result = page.paginate(query, model.Sandwich.id) if page else query.all()
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
@@ -43,18 +60,73 @@ def read_one(db: Session, item_id):
     return item
 
 
-def update(db: Session, item_id, request):
+def read_rating(db: Session, item_id):
+    """Review count, average score and histogram from sandwich_rating_stats, one primary-key read."""
     try:
-        item = db.query(model.Sandwich).filter(model.Sandwich.id == item_id)
-        if not item.first():
+        rating = sandwich_ratings.rating(db, item_id)
+        if rating is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+    except SQLAlchemyError as e:
+        error = str(e.__dict__['orig'])
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    return rating
+
+
+def read_ratings(db: Session):
+    try:
+        return sandwich_ratings.ratings(db)
+    except SQLAlchemyError as e:
+        error = str(e.__dict__['orig'])
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+
+async def read_all_async(db: AsyncSession, page: Page = None):
+    try:
+        statement = select(model.Sandwich)
+        result = await page.paginate_async(db, statement, model.Sandwich.id) if page else (await db.scalars(statement)).all()
+    except SQLAlchemyError as e:
+        error = str(e.__dict__['orig'])
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    return result
+
+
+async def read_one_async(db: AsyncSession, item_id):
+    try:
+        item = (await db.scalars(select(model.Sandwich).filter(model.Sandwich.id == item_id))).first()
+        if not item:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+    except SQLAlchemyError as e:
+        error = str(e.__dict__['orig'])
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    return item
+
+
+async def read_menu_async(db: AsyncSession, if_none_match: str | None = None):
+    """
+    Every sandwich as pre-serialized JSON from ``menu.snapshot``.
+
+    The query and serialization run only on the first read after a menu
+    write (or after the snapshot's ttl); other reads reuse the cached bytes,
+    and a matching If-None-Match gets a 304 without either.
+    """
+    snapshot = menu.snapshot.current()
+    if snapshot is None:
+        version = menu.snapshot.version
+        items = await read_all_async(db)
+        snapshot = menu.snapshot.store(version, MENU.dump_json(MENU.validate_python(items, from_attributes=True)))
+    return menu.snapshot.respond(snapshot, if_none_match)
+
+
+def update(db: Session, item_id, request):
+    try:
         update_data = request.dict(exclude_unset=True)
-        item.update(update_data, synchronize_session=False)
-        db.commit()
+        item = crud.update_by_id(db, model.Sandwich, item_id, update_data)
     except SQLAlchemyError as e:
+        db.rollback()
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-    return item.first()
+    menu.snapshot.bump()
+    return item
 
 
 def delete(db: Session, item_id):
@@ -67,4 +139,5 @@ def delete(db: Session, item_id):
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    menu.snapshot.bump()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
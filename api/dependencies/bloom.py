@@ -0,0 +1,49 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Set membership with no false negatives and a bounded false-positive rate.
+
+    Sized for ``capacity`` items at ``error_rate``; adding more than that
+    still works but raises the false-positive rate. Bit positions come from
+    double hashing one blake2b digest, so a lookup costs a single hash.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(int(capacity), 1)
+        self.capacity = capacity
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    @classmethod
+    def from_iterable(cls, items, error_rate=0.01, headroom=2.0, min_capacity=1024):
+        """Build a filter holding ``items`` with room for ``headroom`` times as many before a rebuild."""
+        items = list(items)
+        bloom = cls(max(len(items) * headroom, min_capacity), error_rate)
+        for item in items:
+            bloom.add(item)
+        return bloom
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def full(self, extra=0):
+        """Whether holding ``extra`` more items would exceed the capacity the filter was sized for."""
+        return self.count + extra > self.capacity
+
+    def __len__(self):
+        return self.count
@@ -1,14 +1,65 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import conf
+from . import metrics
+from .routing import ReplicaSet, RoutingSession
 from urllib.parse import quote_plus
 
-SQLALCHEMY_DATABASE_URL = f"mysql+pymysql://{conf.db_user}:{quote_plus(conf.db_password)}@{conf.db_host}:{conf.db_port}/{conf.db_name}?charset=utf8mb4"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL
+ASYNC_DRIVER = getattr(conf, "db_async_driver", "aiomysql")
+
+
+def database_url(host, port, driver="pymysql"):
+    return f"mysql+{driver}://{conf.db_user}:{quote_plus(conf.db_password)}@{host}:{port}/{conf.db_name}?charset=utf8mb4"
+
+
+SQLALCHEMY_DATABASE_URL = database_url(conf.db_host, conf.db_port)
+ASYNC_DATABASE_URL = database_url(conf.db_host, conf.db_port, ASYNC_DRIVER)
+# Read replicas as "host" or "host:port", sharing the primary's credentials and schema.
+REPLICA_HOSTS = [
+    (host, int(port or conf.db_port))
+    for host, _, port in (entry.partition(":") for entry in getattr(conf, "db_replica_hosts", []))
+]
+REPLICA_FALLBACK = getattr(conf, "db_replica_fallback", True)
+REPLICA_CHECK_INTERVAL = getattr(conf, "db_replica_check_interval", 5.0)
+
+# pool_size + max_overflow should cover the worker threadpool (40 threads by
+# default), and pool_recycle must stay below MySQL's wait_timeout.
+POOL_OPTIONS = dict(
+    pool_size=getattr(conf, "db_pool_size", 10),
+    max_overflow=getattr(conf, "db_max_overflow", 30),
+    pool_timeout=getattr(conf, "db_pool_timeout", 30),
+    pool_recycle=getattr(conf, "db_pool_recycle", 1800),
+    pool_pre_ping=getattr(conf, "db_pool_pre_ping", True),
 )
+engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=metrics.MeteredQueuePool, **POOL_OPTIONS)
+metrics.register_pool("primary", engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async handlers wait on the database without holding a worker thread.
+async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=metrics.MeteredAsyncAdaptedQueuePool, **POOL_OPTIONS)
+metrics.register_pool("primary_async", async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# GET handlers read from the replicas; see RoutingSession for when a session returns to the primary.
+replica_engines = []
+async_replica_engines = []
+for host, port in REPLICA_HOSTS:
+    replica_engines.append(create_engine(database_url(host, port), poolclass=metrics.MeteredQueuePool, **POOL_OPTIONS))
+    metrics.register_pool(f"replica_{host}_{port}", replica_engines[-1])
+    async_replica_engines.append(create_async_engine(
+        database_url(host, port, ASYNC_DRIVER), poolclass=metrics.MeteredAsyncAdaptedQueuePool, **POOL_OPTIONS))
+    metrics.register_pool(f"replica_{host}_{port}_async", async_replica_engines[-1].sync_engine)
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, primary=engine,
+    replicas=ReplicaSet(replica_engines, REPLICA_CHECK_INTERVAL), fallback=REPLICA_FALLBACK,
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False, primary=async_engine.sync_engine,
+    replicas=ReplicaSet([e.sync_engine for e in async_replica_engines], REPLICA_CHECK_INTERVAL),
+    fallback=REPLICA_FALLBACK,
+)
+
 Base = declarative_base()
 
 
@@ -18,3 +69,21 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,308 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from . import metrics
+from ..models.idempotency_keys import IdempotencyKey
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "done", "response", "expires_at")
+
+    def __init__(self, fingerprint, expires_at):
+        self.fingerprint = fingerprint
+        self.done = asyncio.Event()
+        self.response = None
+        self.expires_at = expires_at
+
+
+class IdempotencyStore:
+    """
+    Bounded in-process store of first responses, keyed by (path, Idempotency-Key).
+
+    Entries live for ``ttl`` seconds and the oldest are evicted past
+    ``max_entries``; they are kept in insertion order, which is also expiry
+    order, so eviction only looks at the front. An entry is created when a
+    request claims a key, so duplicates that arrive while it is in flight wait
+    on ``done`` instead of running the handler again. The store belongs to one
+    event loop and one worker process; ``IdempotencyRecords`` is what makes a
+    retry that reaches another worker replay too.
+    """
+
+    def __init__(self, max_entries=10000, ttl=24 * 60 * 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self.replays = 0
+        self.waits = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def collect(self):
+        return (
+            metrics.metric("idempotency_entries", "gauge", "Stored idempotent responses.", [({}, len(self))])
+            + metrics.metric("idempotency_replays_total", "counter", "Retries answered from the store.",
+                             [({}, self.replays)])
+            + metrics.metric("idempotency_waits_total", "counter", "Duplicates that waited on an in-flight request.",
+                             [({}, self.waits)])
+        )
+
+    def _evict(self, now):
+        while self._entries and next(iter(self._entries.values())).expires_at <= now:
+            self._entries.popitem(last=False)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def claim(self, key, fingerprint):
+        """Return (entry, owner); the owner must call ``complete`` or ``release``."""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > now:
+            return entry, False
+        # Re-inserted at the end, so the entries stay in expiry order.
+        self._entries.pop(key, None)
+        entry = self._entries[key] = _Entry(fingerprint, now + self.ttl)
+        self._evict(now)
+        return entry, True
+
+    def complete(self, entry, response):
+        entry.response = response
+        entry.done.set()
+
+    def release(self, key, entry):
+        """Forget a claim whose request failed, so a retry runs it again."""
+        if self._entries.get(key) is entry:
+            del self._entries[key]
+        entry.done.set()
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class IdempotencyRecords:
+    """
+    The idempotency_keys table: first responses shared by every worker process.
+
+    A request inserts its (path, key) row before the handler runs, so exactly
+    one worker wins the unique index; the others read the row and replay its
+    response, or poll it every ``poll_interval`` seconds while the first
+    request is still running, for up to ``wait_timeout``. Rows expire after
+    ``ttl`` seconds, and every ``purge_every`` claims a worker deletes up to
+    that many expired rows, which keeps the table bounded without a scheduler.
+    """
+
+    def __init__(self, session_factory, ttl=24 * 60 * 60, poll_interval=0.1, wait_timeout=30.0, purge_every=1000):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.wait_timeout = wait_timeout
+        self.purge_every = purge_every
+        self._claims = 0
+
+    @staticmethod
+    def _where(path, key):
+        return (IdempotencyKey.path == path, IdempotencyKey.key == key)
+
+    async def claim(self, path, key, fingerprint):
+        """
+        Return None when this request owns the key and must run the handler.
+
+        Otherwise return the row's (fingerprint, response) as seen by the first
+        request's worker; response is None if it was still running after
+        ``wait_timeout``.
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            now = _utcnow()
+            async with self.session_factory() as db:
+                try:
+                    db.add(IdempotencyKey(path=path, key=key, fingerprint=fingerprint,
+                                          expires_at=now + timedelta(seconds=self.ttl)))
+                    await db.commit()
+                    await self._purge(db, now)
+                    return None
+                except IntegrityError:
+                    await db.rollback()
+                row = (await db.execute(
+                    select(IdempotencyKey.fingerprint, IdempotencyKey.status_code, IdempotencyKey.headers,
+                           IdempotencyKey.body, IdempotencyKey.expires_at).where(*self._where(path, key))
+                )).first()
+                if row is not None and row.expires_at <= now:
+                    await db.execute(delete(IdempotencyKey).where(*self._where(path, key),
+                                                                  IdempotencyKey.expires_at <= now))
+                    await db.commit()
+                    continue
+            if row is None:
+                # Released by a failed first request; try to claim it again.
+                continue
+            if row.fingerprint != fingerprint or row.status_code is not None or time.monotonic() >= deadline:
+                response = None
+                if row.status_code is not None:
+                    headers = [(name.encode("latin-1"), value.encode("latin-1"))
+                               for name, value in json.loads(row.headers)]
+                    response = (row.status_code, headers, row.body)
+                return row.fingerprint, response
+            await asyncio.sleep(self.poll_interval)
+
+    async def _purge(self, db, now):
+        self._claims += 1
+        if self._claims % self.purge_every:
+            return
+        ids = (await db.scalars(select(IdempotencyKey.id).where(IdempotencyKey.expires_at <= now)
+                                .limit(self.purge_every))).all()
+        if ids:
+            await db.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(ids)))
+            await db.commit()
+
+    async def complete(self, path, key, response):
+        status, headers, body = response
+        encoded = json.dumps([(name.decode("latin-1"), value.decode("latin-1")) for name, value in headers])
+        async with self.session_factory() as db:
+            await db.execute(update(IdempotencyKey).where(*self._where(path, key))
+                             .values(status_code=status, headers=encoded, body=body))
+            await db.commit()
+
+    async def release(self, path, key):
+        """Delete a claim whose request failed, so a retry on any worker runs it again."""
+        async with self.session_factory() as db:
+            await db.execute(delete(IdempotencyKey).where(*self._where(path, key),
+                                                          IdempotencyKey.status_code.is_(None)))
+            await db.commit()
+
+
+class IdempotencyMiddleware:
+    """
+    Honour the Idempotency-Key header on POSTs to ``paths``.
+
+    The first response for a key is stored, unless it is a server error, and
+    replayed byte for byte to retries with an ``Idempotent-Replayed: true``
+    header. Reusing a key with a different body is rejected with 422. With
+    ``records``, retries that reach another worker replay from the shared
+    table too; one that arrives while the first request is still running
+    elsewhere past ``records.wait_timeout`` gets 409.
+    """
+
+    def __init__(self, app, paths, store: IdempotencyStore = None, records: IdempotencyRecords = None):
+        self.app = app
+        self.paths = set(paths)
+        self.store = store if store is not None else IdempotencyStore()
+        self.records = records
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+        key = dict(scope["headers"]).get(IDEMPOTENCY_KEY_HEADER.lower().encode())
+        if key is None:
+            return await self.app(scope, receive, send)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return await _send_json(send, 400, f"{IDEMPOTENCY_KEY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters")
+
+        body = await _read_body(receive)
+        fingerprint = hashlib.sha256(body).hexdigest()
+        store_key = (scope["path"], key)
+        while True:
+            entry, owner = self.store.claim(store_key, fingerprint)
+            if entry.fingerprint != fingerprint:
+                return await _send_json(send, 422, f"{IDEMPOTENCY_KEY_HEADER} was already used for a different request")
+            if owner:
+                break
+            if entry.response is None:
+                self.store.waits += 1
+                await entry.done.wait()
+            if entry.response is not None:
+                self.store.replays += 1
+                return await _replay(send, entry.response)
+            # The first request failed without a response to keep; run this one instead.
+
+        path, record_key = scope["path"], key.decode("latin-1")
+        if self.records is not None:
+            try:
+                shared = await self.records.claim(path, record_key, fingerprint)
+            except BaseException:
+                self.store.release(store_key, entry)
+                raise
+            if shared is not None:
+                recorded_fingerprint, response = shared
+                if recorded_fingerprint != fingerprint:
+                    self.store.release(store_key, entry)
+                    return await _send_json(send, 422,
+                                            f"{IDEMPOTENCY_KEY_HEADER} was already used for a different request")
+                if response is None:
+                    self.store.release(store_key, entry)
+                    return await _send_json(send, 409, "A request with this Idempotency-Key is still in progress")
+                self.store.complete(entry, response)
+                self.store.replays += 1
+                return await _replay(send, response)
+
+        captured = {"body": []}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                captured["status"] = message["status"]
+                captured["headers"] = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                captured["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, _replay_receive(body, receive), capture)
+        except BaseException:
+            self.store.release(store_key, entry)
+            if self.records is not None:
+                await self.records.release(path, record_key)
+            raise
+        if captured.get("status", 500) >= 500:
+            self.store.release(store_key, entry)
+            if self.records is not None:
+                await self.records.release(path, record_key)
+        else:
+            response = (captured["status"], captured["headers"], b"".join(captured["body"]))
+            if self.records is not None:
+                await self.records.complete(path, record_key, response)
+            self.store.complete(entry, response)
+
+
+async def _read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+def _replay_receive(body, receive):
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
+
+
+async def _replay(send, response):
+    status, headers, body = response
+    await send({"type": "http.response.start", "status": status,
+                "headers": [*headers, (REPLAYED_HEADER.lower().encode(), b"true")]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_json(send, status, detail):
+    body = json.dumps({"detail": detail}).encode()
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,141 @@
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+CHECKOUT_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_collectors = []
+
+
+def register(collector):
+    """Add a callable that returns Prometheus exposition lines for ``render``."""
+    _collectors.append(collector)
+    return collector
+
+
+def render():
+    lines = []
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+def metric(name, kind, help_text, samples):
+    """Format one metric family; ``samples`` is a list of (labels, value) pairs."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{_labels(labels)} {value}" for labels, value in samples)
+    return lines
+
+
+class Histogram:
+    """A minimal thread-safe cumulative histogram in the Prometheus style."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self._counts = [0] * len(buckets)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self._sum += value
+            self._count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+
+    def samples(self, labels):
+        with self._lock:
+            counts, total, count = list(self._counts), self._sum, self._count
+        result, cumulative = [], 0
+        for bound, bucket in zip(self.buckets, counts):
+            cumulative += bucket
+            result.append(("_bucket", {**labels, "le": bound}, cumulative))
+        result.append(("_bucket", {**labels, "le": "+Inf"}, count))
+        result.append(("_sum", labels, total))
+        result.append(("_count", labels, count))
+        return result
+
+
+class _MeteredPool:
+    """Records how long checkouts wait and how often the pool overflows."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_wait = Histogram(CHECKOUT_WAIT_BUCKETS)
+        self.overflow_connections = 0
+        self.checkout_timeouts = 0
+        event.listen(self, "connect", self._on_connect)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        if self.overflow() > 0:
+            self.overflow_connections += 1
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            self.checkout_wait.observe(time.perf_counter() - started)
+
+
+class MeteredQueuePool(_MeteredPool, QueuePool):
+    """QueuePool that records how long checkouts wait and how often the pool overflows."""
+
+
+class MeteredAsyncAdaptedQueuePool(_MeteredPool, AsyncAdaptedQueuePool):
+    """The asyncio engines' pool, metered the same way."""
+
+
+def pool_collector(pools):
+    """
+    Expose the live state of every (name, engine) pool in ``pools`` under the label pool=name.
+
+    Each metric family is written once with one sample per pool; repeating
+    a family's ``# TYPE`` line makes the whole page invalid to a scraper.
+    """
+
+    def collect():
+        queued = [({"pool": name}, engine.pool) for name, engine in pools if isinstance(engine.pool, QueuePool)]
+        metered = [(labels, pool) for labels, pool in queued if isinstance(pool, _MeteredPool)]
+        lines = []
+        lines += metric("db_pool_size", "gauge", "Configured persistent connections.",
+                        [(labels, pool.size()) for labels, pool in queued])
+        lines += metric("db_pool_checked_out", "gauge", "Connections in use.",
+                        [(labels, pool.checkedout()) for labels, pool in queued])
+        lines += metric("db_pool_idle", "gauge", "Connections idle in the pool.",
+                        [(labels, pool.checkedin()) for labels, pool in queued])
+        lines += metric("db_pool_overflow", "gauge", "Connections open beyond pool_size.",
+                        [(labels, max(pool.overflow(), 0)) for labels, pool in queued])
+        lines += metric("db_pool_overflow_connections_total", "counter", "Connections opened beyond pool_size.",
+                        [(labels, pool.overflow_connections) for labels, pool in metered])
+        lines += metric("db_pool_checkout_timeouts_total", "counter", "Checkouts that gave up after pool_timeout.",
+                        [(labels, pool.checkout_timeouts) for labels, pool in metered])
+        lines += ["# HELP db_pool_checkout_wait_seconds Time spent waiting for a connection.",
+                  "# TYPE db_pool_checkout_wait_seconds histogram"]
+        lines += [f"db_pool_checkout_wait_seconds{suffix}{_labels(sample_labels)} {value}"
+                  for labels, pool in metered for suffix, sample_labels, value in pool.checkout_wait.samples(labels)]
+        return lines
+
+    return collect
+
+
+_pools = []
+register(pool_collector(_pools))
+
+
+def register_pool(name, engine):
+    """Export ``engine``'s pool on /metrics under the label pool=name."""
+    _pools.append((name, engine))
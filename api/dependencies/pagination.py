@@ -0,0 +1,100 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_LIMIT = 100
+
+
+def _encode(values):
+    def default(value):
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+    raw = json.dumps(values, default=default, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor, columns):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        decoded = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            if value is not None and python_type in (date, datetime):
+                value = python_type.fromisoformat(value)
+            elif value is not None and python_type is Decimal:
+                value = Decimal(value)
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+class Page:
+    """
+    Opt-in keyset pagination for list endpoints.
+
+    Send ``limit`` (and ``after`` from the previous response's ``X-Next-Cursor``
+    header) to page through a table. Pages are selected with a keyset condition
+    on the sort columns rather than OFFSET, so deep pages cost the same as the first.
+    Without either parameter the endpoint returns every row as before.
+    """
+
+    def __init__(
+        self,
+        response: Response,
+        limit: int | None = Query(None, ge=1, le=1000, description="Maximum number of rows to return"),
+        after: str | None = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    ):
+        self.response = response
+        self.limit = limit
+        self.after = after
+        self.next_cursor = None
+
+    @property
+    def active(self):
+        return self.limit is not None or self.after is not None
+
+    def apply(self, query, *columns, descending=False):
+        """Add the keyset filter, ordering and limit to a Query or Select."""
+        if self.after is not None:
+            values = _decode(self.after, columns)
+            query = query.filter(or_(*(
+                and_(*(column == value for column, value in zip(columns[:i], values[:i])),
+                     columns[i] < values[i] if descending else columns[i] > values[i])
+                for i in range(len(columns))
+            )))
+        ordering = [column.desc() if descending else column.asc() for column in columns]
+        return query.order_by(*ordering).limit((self.limit or DEFAULT_LIMIT) + 1)
+
+    def collect(self, rows, *columns):
+        """Trim the look-ahead row and publish the cursor for the next page."""
+        limit = self.limit or DEFAULT_LIMIT
+        if len(rows) > limit:
+            rows = rows[:limit]
+            self.next_cursor = _encode([getattr(rows[-1], column.key) for column in columns])
+            if self.response is not None:
+                self.response.headers[NEXT_CURSOR_HEADER] = self.next_cursor
+        return rows
+
+    def paginate(self, query, *columns, descending=False):
+        if not self.active:
+            return query.all()
+        return self.collect(self.apply(query, *columns, descending=descending).all(), *columns)
+
+    async def paginate_async(self, db, statement, *columns, descending=False):
+        """``paginate`` for a Select executed on an AsyncSession."""
+        if not self.active:
+            return (await db.scalars(statement)).all()
+        rows = (await db.scalars(self.apply(statement, *columns, descending=descending))).all()
+        return self.collect(rows, *columns)
@@ -0,0 +1,107 @@
+import itertools
+import threading
+import time
+from fastapi import HTTPException, status
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+
+class ReplicaSet:
+    """
+    Read replicas chosen round-robin, skipping any that failed a health check.
+
+    A replica is probed with ``SELECT 1`` at most once per ``check_interval``
+    seconds, and is marked down immediately when one of its connections is
+    reported as disconnected.
+    """
+
+    def __init__(self, engines, check_interval=5.0):
+        self.engines = list(engines)
+        self.check_interval = check_interval
+        self._healthy = {id(engine): True for engine in self.engines}
+        self._checked_at = {id(engine): 0.0 for engine in self.engines}
+        self._order = itertools.cycle(self.engines)
+        self._lock = threading.Lock()
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def __bool__(self):
+        return bool(self.engines)
+
+    def _on_error(self, context):
+        if context.is_disconnect and context.engine is not None:
+            self.mark_down(context.engine)
+
+    def mark_down(self, engine):
+        with self._lock:
+            self._healthy[id(engine)] = False
+            self._checked_at[id(engine)] = time.monotonic()
+
+    def _probe(self, engine):
+        try:
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            return True
+        except DBAPIError:
+            return False
+
+    def is_healthy(self, engine):
+        now = time.monotonic()
+        with self._lock:
+            due = now - self._checked_at[id(engine)] >= self.check_interval
+            if due:
+                self._checked_at[id(engine)] = now
+        if due:
+            healthy = self._probe(engine)
+            with self._lock:
+                self._healthy[id(engine)] = healthy
+        return self._healthy[id(engine)]
+
+    def choose(self):
+        """Return the next healthy replica, or None when every replica is down."""
+        for _ in range(len(self.engines)):
+            with self._lock:
+                engine = next(self._order)
+            if self.is_healthy(engine):
+                return engine
+        return None
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from a replica until it writes.
+
+    The replica is picked once per session, so every read in a request sees
+    the same snapshot. Flushes, DML statements and ``SELECT ... FOR UPDATE``
+    pin the session to the primary for the rest of its life, which keeps
+    read-after-write within a request consistent. With no healthy replica,
+    reads fall back to the primary when ``fallback`` is set, and fail with 503
+    otherwise.
+    """
+
+    def __init__(self, primary, replicas: ReplicaSet, fallback=True, **kwargs):
+        super().__init__(**kwargs)
+        self.primary = primary
+        self.replicas = replicas
+        self.fallback = fallback
+        self.pinned = False
+        self._replica = None
+        event.listen(self, "before_flush", self._pin)
+
+    def _pin(self, *args):
+        self.pinned = True
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if clause is not None and (clause.is_dml or getattr(clause, "_for_update_arg", None) is not None):
+            self.pinned = True
+        if self.pinned or not self.replicas:
+            return self.primary
+        if self._replica is None:
+            self._replica = self.replicas.choose()
+            if self._replica is None:
+                if not self.fallback:
+                    raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                        detail="No read replica available")
+                self._replica = self.primary
+        return self._replica
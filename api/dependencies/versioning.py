@@ -0,0 +1,21 @@
+from fastapi import Header, HTTPException, Response, status
+
+
+def set_etag(response: Response, item):
+    """Expose the row version as a strong ETag."""
+    response.headers["ETag"] = f'"{item.version}"'
+
+
+def if_match_version(if_match: str | None = Header(None)) -> int | None:
+    """
+    Read the expected row version from an If-Match header.
+
+    Returns None when the header is absent or ``*``, meaning the write is
+    unconditional. Anything that is not one of our ETags can never match.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.strip().removeprefix("W/").strip('"')
+    if not tag.isdigit():
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="If-Match does not match")
+    return int(tag)
@@ -1,12 +1,28 @@
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import index as indexRoute
 from .models import model_loader
+from .routers import index as indexRoute
+from .dependencies import metrics
 from .dependencies.config import conf
+from .dependencies.pagination import NEXT_CURSOR_HEADER
+from .dependencies.database import AsyncSessionLocal
+from .dependencies.idempotency import IdempotencyMiddleware, IdempotencyRecords, IdempotencyStore, REPLAYED_HEADER
+from .controllers.payment_processing import processor as payment_processor
+from .controllers.promotions import purger as promotion_purger
+
+
+@asynccontextmanager
+async def lifespan(app):
+    payment_processor.start()
+    promotion_purger.start()
+    yield
+    promotion_purger.stop()
+    payment_processor.stop()
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 origins = ["*"]
 
@@ -16,9 +32,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", REPLAYED_HEADER],
+)
+idempotency_store = IdempotencyStore(
+    max_entries=getattr(conf, "idempotency_max_entries", 10000),
+    ttl=getattr(conf, "idempotency_ttl", 24 * 60 * 60),
+)
+metrics.register(idempotency_store.collect)
+idempotency_records = IdempotencyRecords(AsyncSessionLocal, ttl=getattr(conf, "idempotency_ttl", 24 * 60 * 60))
+app.add_middleware(
+    IdempotencyMiddleware,
+    paths=["/orders/", "/orders/checkout", "/payments/"],
+    store=idempotency_store,
+    records=idempotency_records,
 )
 
-model_loader.index()
 indexRoute.load_routes(app)
 
 
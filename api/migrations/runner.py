@@ -0,0 +1,90 @@
+import importlib
+import pkgutil
+from sqlalchemy import Column, DATETIME, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.schema import CreateColumn
+from . import versions
+
+metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DATETIME, nullable=False),
+)
+LOCK_NAME = "schema_migrations"
+LOCK_TIMEOUT = 300
+
+
+def discover():
+    """Return (version, name, module) for every ``v<NNNN>_<name>`` module, in order."""
+    found = []
+    for info in pkgutil.iter_modules(versions.__path__):
+        prefix, _, name = info.name.partition("_")
+        if prefix.startswith("v") and prefix[1:].isdigit():
+            module = importlib.import_module(f"{versions.__name__}.{info.name}")
+            found.append((int(prefix[1:]), name, module))
+    return sorted(found, key=lambda migration: migration[0])
+
+
+def applied(connection):
+    schema_migrations.create(connection, checkfirst=True)
+    return set(connection.scalars(select(schema_migrations.c.version)))
+
+
+def pending(engine):
+    with engine.connect() as connection:
+        done = applied(connection)
+        connection.commit()
+    return [migration for migration in discover() if migration[0] not in done]
+
+
+def migrate(engine, target=None, log=print):
+    """
+    Apply every pending migration up to ``target``, each in its own transaction.
+
+    On MySQL the run holds a named lock, so concurrent deploys apply each
+    migration exactly once. Returns the versions that were applied.
+    """
+    applied_now = []
+    with engine.connect() as connection:
+        locked = connection.dialect.name == "mysql"
+        if locked and not connection.scalar(text("SELECT GET_LOCK(:name, :timeout)"),
+                                            {"name": LOCK_NAME, "timeout": LOCK_TIMEOUT}):
+            raise RuntimeError("Timed out waiting for another migration run to finish")
+        try:
+            done = applied(connection)
+            connection.commit()
+            for version, name, module in discover():
+                if version in done or (target is not None and version > target):
+                    continue
+                log(f"Applying {version:04d} {name}")
+                with connection.begin():
+                    module.upgrade(connection)
+                    connection.execute(schema_migrations.insert().values(
+                        version=version, name=name, applied_at=func.now()))
+                applied_now.append(version)
+        finally:
+            if locked:
+                connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": LOCK_NAME})
+    return applied_now
+
+
+def add_column(connection, column):
+    """Add a model's table-bound ``column`` unless it is already there."""
+    table = column.table.name
+    if column.name not in {c["name"] for c in inspect(connection).get_columns(table)}:
+        definition = CreateColumn(column).compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {definition}"))
+
+
+def create_index(connection, index):
+    """Create ``index`` unless its table already has an index with that name."""
+    if index.name not in {i["name"] for i in inspect(connection).get_indexes(index.table.name)}:
+        index.create(connection)
+
+
+def drop_index(connection, table, name):
+    if name in {i["name"] for i in inspect(connection).get_indexes(table)}:
+        dialect = connection.dialect.name
+        connection.execute(text(f"DROP INDEX {name} ON {table}" if dialect == "mysql" else f"DROP INDEX {name}"))
@@ -0,0 +1,7 @@
+"""Create every table that does not exist yet from the current models."""
+from ...dependencies.database import Base
+from ...models import model_loader
+
+
+def upgrade(connection):
+    Base.metadata.create_all(connection)
@@ -0,0 +1,10 @@
+"""Optimistic concurrency columns on orders, resources and payments."""
+from ..runner import add_column
+from ...models.orders import Order
+from ...models.payments import Payment
+from ...models.resources import Resource
+
+
+def upgrade(connection):
+    for model in (Order, Resource, Payment):
+        add_column(connection, model.__table__.c.version)
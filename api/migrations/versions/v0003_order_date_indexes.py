@@ -0,0 +1,8 @@
+"""Indexes behind the date-sorted and status/date order listings."""
+from ..runner import create_index
+from ...models.orders import Order
+
+
+def upgrade(connection):
+    for index in Order.__table__.indexes:
+        create_index(connection, index)
@@ -0,0 +1,24 @@
+"""
+Index every foreign key the controllers join or filter on, and drop the
+indexes on amount columns, which no query filters by.
+
+On MySQL, creating these indexes lets InnoDB drop the implicit index it
+made for each foreign key constraint, so the key is not indexed twice.
+"""
+from ..runner import create_index, drop_index
+from ...models.order_details import OrderDetail
+from ...models.orders import Order
+from ...models.payments import Payment
+from ...models.promotions import order_promotions
+from ...models.recipes import Recipe
+from ...models.reviews import Review
+
+TABLES = (OrderDetail.__table__, Recipe.__table__, Review.__table__, Payment.__table__, Order.__table__, order_promotions)
+
+
+def upgrade(connection):
+    for table in TABLES:
+        for index in table.indexes:
+            create_index(connection, index)
+    for table in ("order_details", "recipes", "resources"):
+        drop_index(connection, table, f"ix_{table}_amount")
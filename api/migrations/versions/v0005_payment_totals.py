@@ -0,0 +1,28 @@
+"""
+Store payment amounts as DECIMAL, date payments, and build the payment_totals ledger.
+
+Existing payments are dated by their order; the ledger is then rebuilt from them.
+"""
+from sqlalchemy import inspect, text
+from ..runner import add_column
+from ...controllers import payment_totals
+from ...models.payment_totals import PaymentTotal
+from ...models.payments import Payment
+
+
+def upgrade(connection):
+    existing = {column["name"] for column in inspect(connection).get_columns("payments")}
+    if connection.dialect.name == "mysql":
+        connection.execute(text("UPDATE payments SET amount = 0 WHERE amount IS NULL"))
+        connection.execute(text("ALTER TABLE payments MODIFY amount DECIMAL(10, 2) NOT NULL DEFAULT 0"))
+        add_column(connection, Payment.__table__.c.created_at)
+    elif "created_at" not in existing:
+        # SQLite cannot add a column with a non-constant default.
+        connection.execute(text("ALTER TABLE payments ADD COLUMN created_at DATETIME"))
+    if "created_at" not in existing:
+        connection.execute(text(
+            "UPDATE payments SET created_at = COALESCE("
+            "(SELECT orders.order_date FROM orders WHERE orders.id = payments.order_id), CURRENT_TIMESTAMP)"
+        ))
+    PaymentTotal.__table__.create(connection, checkfirst=True)
+    payment_totals.rebuild(connection)
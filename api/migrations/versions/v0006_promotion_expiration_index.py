@@ -0,0 +1,11 @@
+"""
+Index promotions.expiration_date, so the expired-promotion purge finds
+each chunk without scanning the table.
+"""
+from ..runner import create_index
+from ...models.promotions import Promotion
+
+
+def upgrade(connection):
+    for index in Promotion.__table__.indexes:
+        create_index(connection, index)
@@ -0,0 +1,10 @@
+"""
+Build the sandwich_rating_stats table from the existing reviews.
+"""
+from ...controllers import sandwich_ratings
+from ...models.sandwich_ratings import SandwichRatingStats
+
+
+def upgrade(connection):
+    SandwichRatingStats.__table__.create(connection, checkfirst=True)
+    sandwich_ratings.rebuild(connection)
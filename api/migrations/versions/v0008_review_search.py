@@ -0,0 +1,18 @@
+"""
+Index review_text for GET /reviews/search: a FULLTEXT index on MySQL, and
+on SQLite an FTS5 table with the triggers that keep it current, filled from
+the existing reviews.
+"""
+from sqlalchemy import text
+from ..runner import create_index
+from ...models.reviews import Review, SQLITE_FTS
+
+
+def upgrade(connection):
+    if connection.dialect.name == "mysql":
+        create_index(connection, next(index for index in Review.__table__.indexes
+                                      if index.name == "ft_reviews_review_text"))
+    elif connection.dialect.name == "sqlite":
+        for statement in SQLITE_FTS:
+            connection.execute(text(statement))
+        connection.execute(text("INSERT INTO reviews_fts (reviews_fts) VALUES ('rebuild')"))
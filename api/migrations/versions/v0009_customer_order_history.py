@@ -0,0 +1,17 @@
+"""
+Index orders for customer order history, replacing the single-column
+customer_id index it makes redundant, and build customer_order_stats from
+the existing orders.
+"""
+from ..runner import create_index, drop_index
+from ...controllers import customer_order_stats
+from ...models.customer_order_stats import CustomerOrderStats
+from ...models.orders import Order
+
+
+def upgrade(connection):
+    for index in Order.__table__.indexes:
+        create_index(connection, index)
+    drop_index(connection, "orders", "ix_orders_customer_id")
+    CustomerOrderStats.__table__.create(connection, checkfirst=True)
+    customer_order_stats.rebuild(connection)
@@ -0,0 +1,7 @@
+"""Record when a payment worker claimed a payment, so abandoned claims can be reclaimed."""
+from ..runner import add_column
+from ...models.payments import Payment
+
+
+def upgrade(connection):
+    add_column(connection, Payment.__table__.c.claimed_at)
@@ -0,0 +1,8 @@
+"""
+Create the idempotency_keys table shared by every worker's IdempotencyMiddleware.
+"""
+from ...models.idempotency_keys import IdempotencyKey
+
+
+def upgrade(connection):
+    IdempotencyKey.__table__.create(connection, checkfirst=True)
@@ -0,0 +1,11 @@
+"""
+Index payments.transaction_status, so the payment processor finds pending and
+stale processing payments on startup without scanning the table.
+"""
+from ..runner import create_index
+from ...models.payments import Payment
+
+
+def upgrade(connection):
+    for index in Payment.__table__.indexes:
+        create_index(connection, index)
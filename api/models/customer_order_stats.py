@@ -0,0 +1,11 @@
+from sqlalchemy import Column, ForeignKey, Integer, DECIMAL
+from ..dependencies.database import Base
+
+
+class CustomerOrderStats(Base):
+    """Order count and lifetime spend per customer, kept by controllers.customer_order_stats."""
+    __tablename__ = "customer_order_stats"
+
+    customer_id = Column(Integer, ForeignKey("customers.id", ondelete="CASCADE"), primary_key=True)
+    order_count = Column(Integer, nullable=False, server_default="0")
+    lifetime_spend = Column(DECIMAL(14, 2), nullable=False, server_default="0")
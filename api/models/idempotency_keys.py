@@ -0,0 +1,22 @@
+from sqlalchemy import Column, DATETIME, Index, Integer, LargeBinary, String, Text
+from sqlalchemy.dialects import mysql
+from ..dependencies.database import Base
+
+
+class IdempotencyKey(Base):
+    """The first response to a keyed POST, shared by every worker; see dependencies.idempotency."""
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    path = Column(String(100), nullable=False)
+    key = Column(String(255), nullable=False)
+    fingerprint = Column(String(64), nullable=False)
+    # NULL while the first request is still running.
+    status_code = Column(Integer)
+    headers = Column(Text)
+    body = Column(LargeBinary().with_variant(mysql.MEDIUMBLOB(), "mysql"))
+    expires_at = Column(DATETIME, nullable=False, index=True)
+
+    __table_args__ = (
+        Index("ux_idempotency_keys_path_key", "path", "key", unique=True),
+    )
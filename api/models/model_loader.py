@@ -1,14 +1,8 @@
-from . import orders, order_details, recipes, sandwiches, resources, reviews, payments, promotions
+from . import orders, order_details, recipes, sandwiches, resources, reviews, payments, promotions, customers, payment_totals, sandwich_ratings, customer_order_stats, idempotency_keys
 
-from ..dependencies.database import engine
+from ..dependencies.database import Base, engine
 
 
 def index():
-    orders.Base.metadata.create_all(engine)
-    order_details.Base.metadata.create_all(engine)
-    recipes.Base.metadata.create_all(engine)
-    sandwiches.Base.metadata.create_all(engine)
-    resources.Base.metadata.create_all(engine)
-    reviews.Base.metadata.create_all(engine)
-    payments.Base.metadata.create_all(engine)
-    promotions.Base.metadata.create_all(engine)
+    """Create missing tables in one pass; deploys use ``python -m api.cli migrate`` instead."""
+    Base.metadata.create_all(engine)
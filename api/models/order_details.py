@@ -7,9 +7,9 @@ class OrderDetail(Base):
     __tablename__ = "order_details"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
-    sandwich_id = Column(Integer, ForeignKey("sandwiches.id"))
-    amount = Column(Integer, index=True, nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
+    sandwich_id = Column(Integer, ForeignKey("sandwiches.id"), index=True)
+    amount = Column(Integer, nullable=False)
 
     sandwich = relationship("Sandwich", back_populates="order_details")
     order = relationship("Order", back_populates="order_details")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, DECIMAL, DATETIME
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, DECIMAL, DATETIME, desc
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from sqlalchemy.sql import func
@@ -7,6 +7,13 @@ from ..dependencies.database import Base
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_order_date_id", "order_date", "id"),
+        Index("ix_orders_status_order_date", "status", "order_date"),
+        # Serves a customer's order history newest first; status and total_price
+        # make it covering for the summary view.
+        Index("ix_orders_customer_history", "customer_id", desc("order_date"), desc("id"), "status", "total_price"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     customer_id = Column(Integer, ForeignKey("customers.id"))
@@ -17,6 +24,7 @@ class Order(Base):
     description = Column(String(300))
     order_type = Column(String(50), nullable=False, default="Dine-In")
     status = Column(String(50), nullable=False, default="pending")
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     customer = relationship("Customer", back_populates="orders")
     order_details = relationship("OrderDetail", back_populates="order")
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Date, Integer, String, DECIMAL
+from ..dependencies.database import Base
+
+
+class PaymentTotal(Base):
+    """Running totals of payments per day and payment type, kept by controllers.payment_totals."""
+    __tablename__ = "payment_totals"
+
+    day = Column(Date, primary_key=True)
+    payment_type = Column(String(50), primary_key=True, server_default="")
+    total = Column(DECIMAL(14, 2), nullable=False, server_default="0")
+    payment_count = Column(Integer, nullable=False, server_default="0")
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, DECIMAL, DATETIME
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from ..dependencies.database import Base
 
 
@@ -7,10 +8,13 @@ class Payment(Base):
     __tablename__ = "payments"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
     card_information = Column(String(100))
-    amount = Column(Float)
-    transaction_status = Column(String(50))
+    amount = Column(DECIMAL(10, 2), nullable=False, server_default="0")
+    transaction_status = Column(String(50), index=True)
     payment_type = Column(String(50))
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    created_at = Column(DATETIME, nullable=False, server_default=func.now())
+    claimed_at = Column(DATETIME)
 
     order = relationship("Order", back_populates="payment")
@@ -4,8 +4,8 @@ from ..dependencies.database import Base
 
 order_promotions = Table(
     'order_promotions', Base.metadata,
-    Column('order_id', Integer, ForeignKey('orders.id')),
-    Column('promotion_id', Integer, ForeignKey('promotions.id'))
+    Column('order_id', Integer, ForeignKey('orders.id'), index=True),
+    Column('promotion_id', Integer, ForeignKey('promotions.id'), index=True)
 )
 
 
@@ -14,6 +14,6 @@ class Promotion(Base):
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     promotion_code = Column(String(50), unique=True, nullable=False)
-    expiration_date = Column(DateTime, nullable=False)
+    expiration_date = Column(DateTime, nullable=False, index=True)
 
     orders = relationship("Order", secondary=order_promotions, back_populates="promotions")
@@ -8,9 +8,9 @@ class Recipe(Base):
     __tablename__ = "recipes"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    sandwich_id = Column(Integer, ForeignKey("sandwiches.id"))
-    resource_id = Column(Integer, ForeignKey("resources.id"))
-    amount = Column(Integer, index=True, nullable=False, server_default='0.0')
+    sandwich_id = Column(Integer, ForeignKey("sandwiches.id"), index=True)
+    resource_id = Column(Integer, ForeignKey("resources.id"), index=True)
+    amount = Column(Integer, nullable=False, server_default='0.0')
     time_to_make = Column(Integer, nullable=False, server_default="0")
 
     sandwich = relationship("Sandwich", back_populates="recipes")
@@ -9,7 +9,8 @@ class Resource(Base):
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     item = Column(String(100), unique=True, nullable=False)
-    amount = Column(Integer, index=True, nullable=False, server_default='0.0')
+    amount = Column(Integer, nullable=False, server_default='0.0')
     unit = Column(String(20))
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     recipes = relationship("Recipe", back_populates="resource")
@@ -1,15 +1,35 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, DDL, Index, Integer, String, ForeignKey, event
 from sqlalchemy.orm import relationship
 from ..dependencies.database import Base
 
+# SQLite has no FULLTEXT; an external-content FTS5 table kept current by triggers stands in for it.
+SQLITE_FTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5(review_text, content='reviews', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_insert AFTER INSERT ON reviews BEGIN"
+    " INSERT INTO reviews_fts (rowid, review_text) VALUES (new.id, new.review_text); END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_delete AFTER DELETE ON reviews BEGIN"
+    " INSERT INTO reviews_fts (reviews_fts, rowid, review_text) VALUES ('delete', old.id, old.review_text); END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_update AFTER UPDATE OF review_text ON reviews BEGIN"
+    " INSERT INTO reviews_fts (reviews_fts, rowid, review_text) VALUES ('delete', old.id, old.review_text);"
+    " INSERT INTO reviews_fts (rowid, review_text) VALUES (new.id, new.review_text); END",
+)
+
 class Review(Base):
     __tablename__ = "reviews"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    customer_id = Column(Integer, ForeignKey("customers.id"))
-    sandwich_id = Column(Integer, ForeignKey("sandwiches.id"))
+    customer_id = Column(Integer, ForeignKey("customers.id"), index=True)
+    sandwich_id = Column(Integer, ForeignKey("sandwiches.id"), index=True)
     review_text = Column(String(500))
     score = Column(Integer)
 
     customer = relationship("Customer", back_populates="reviews")
     sandwich = relationship("Sandwich", back_populates="reviews")
+
+    __table_args__ = (
+        Index("ft_reviews_review_text", "review_text", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
+
+
+for statement in SQLITE_FTS:
+    event.listen(Review.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, ForeignKey, Integer
+from ..dependencies.database import Base
+
+
+class SandwichRatingStats(Base):
+    """Review count, score sum and score histogram per sandwich, kept by controllers.sandwich_ratings."""
+    __tablename__ = "sandwich_rating_stats"
+
+    sandwich_id = Column(Integer, ForeignKey("sandwiches.id", ondelete="CASCADE"), primary_key=True)
+    review_count = Column(Integer, nullable=False, server_default="0")
+    score_sum = Column(Integer, nullable=False, server_default="0")
+    score_1 = Column(Integer, nullable=False, server_default="0")
+    score_2 = Column(Integer, nullable=False, server_default="0")
+    score_3 = Column(Integer, nullable=False, server_default="0")
+    score_4 = Column(Integer, nullable=False, server_default="0")
+    score_5 = Column(Integer, nullable=False, server_default="0")
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlalchemy.orm import Session
 from ..controllers import customers as controller
 from ..schemas import customers as schema
-from ..dependencies.database import get_db
+from ..schemas.orders import Order, OrderSummary
+from ..schemas.bulk import BulkResult
+from ..dependencies.database import get_db, get_read_db
+from ..dependencies.pagination import Page
 
 router = APIRouter(
     tags=['Customers'],
@@ -15,16 +18,46 @@ def create(request: schema.CustomerCreate, db: Session = Depends(get_db)):
     return controller.create(db=db, request=request)
 
 
+@router.post("/bulk", response_model=BulkResult)
+def create_bulk(request: list[schema.CustomerCreate], db: Session = Depends(get_db)):
+    return controller.create_bulk(db=db, requests=request)
+
+
+@router.post("/import", response_model=schema.CustomerImportResult)
+async def import_customers(
+    request: Request,
+    fmt: str = Query("csv", alias="format", pattern="^(ndjson|csv)$"),
+    db: Session = Depends(get_db),
+):
+    """Upsert customers on email from a CSV or NDJSON request body, streamed in batches."""
+    return await controller.import_stream(db, request.stream(), fmt)
+
+
 @router.get("/", response_model=list[schema.Customer])
-def read_all(db: Session = Depends(get_db)):
-    return controller.read_all(db)
+def read_all(page: Page = Depends(), db: Session = Depends(get_read_db)):
+    return controller.read_all(db, page)
 
 
 @router.get("/{customer_id}", response_model=schema.Customer)
-def read_one(customer_id: int, db: Session = Depends(get_db)):
+def read_one(customer_id: int, db: Session = Depends(get_read_db)):
     return controller.read_one(db, customer_id=customer_id)
 
 
+@router.get("/{customer_id}/orders", response_model=list[Order | OrderSummary])
+def read_orders(
+    customer_id: int,
+    summary: bool = Query(False, description="Return only id, order_date, total_price and status"),
+    page: Page = Depends(),
+    db: Session = Depends(get_read_db),
+):
+    return controller.read_orders(db, customer_id, page, summary=summary)
+
+
+@router.get("/{customer_id}/orders/stats", response_model=schema.CustomerOrderStats)
+def read_order_stats(customer_id: int, db: Session = Depends(get_read_db)):
+    return controller.read_order_stats(db, customer_id)
+
+
 @router.put("/{customer_id}", response_model=schema.Customer)
 def update(customer_id: int, request: schema.CustomerUpdate, db: Session = Depends(get_db)):
     return controller.update(db=db, request=request, customer_id=customer_id)
@@ -1,4 +1,4 @@
-from . import orders, order_details, recipes, resources, sandwiches, customers, reviews, payments, promotions
+from . import orders, order_details, recipes, resources, sandwiches, customers, reviews, payments, promotions, metrics
 
 
 def load_routes(app):
@@ -10,4 +10,5 @@ def load_routes(app):
     app.include_router(customers.router)
     app.include_router(reviews.router)
     app.include_router(payments.router)
-    app.include_router(promotions.router)
\ No newline at end of file
+    app.include_router(promotions.router)
+    app.include_router(metrics.router)
\ No newline at end of file
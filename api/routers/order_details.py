@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, FastAPI, status, Response
+from fastapi import APIRouter, Depends, FastAPI, status, Response, Query
 from sqlalchemy.orm import Session
+from datetime import datetime
 from ..controllers import order_details as controller
 from ..schemas import order_details as schema
-from ..dependencies.database import engine, get_db
+from ..dependencies.database import engine, get_db, get_read_db
+from ..dependencies.pagination import Page
 
 router = APIRouter(
     tags=['Order Details'],
@@ -16,12 +18,22 @@ def create(request: schema.OrderDetailCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=list[schema.OrderDetail])
-def read_all(db: Session = Depends(get_db)):
-    return controller.read_all(db)
+def read_all(page: Page = Depends(), db: Session = Depends(get_read_db)):
+    return controller.read_all(db, page)
+
+
+@router.get("/export")
+def export(
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    start: datetime | None = Query(None, description="Only include orders placed at or after this time"),
+    end: datetime | None = Query(None, description="Only include orders placed before this time"),
+    db: Session = Depends(get_read_db),
+):
+    return controller.export(db, fmt, start, end)
 
 
 @router.get("/{item_id}", response_model=schema.OrderDetail)
-def read_one(item_id: int, db: Session = Depends(get_db)):
+def read_one(item_id: int, db: Session = Depends(get_read_db)):
     return controller.read_one(db, item_id=item_id)
 
 
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, FastAPI, status, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..controllers import orders as controller
 from ..schemas import orders as schema
-from ..dependencies.database import engine, get_db
+from ..dependencies.database import engine, get_async_read_db, get_db, get_read_db
+from ..dependencies.pagination import Page
+from ..dependencies.versioning import if_match_version, set_etag
 from fastapi import Query
 from datetime import datetime
 
@@ -16,6 +19,10 @@ router = APIRouter(
 def create(request: schema.OrderCreate, db: Session = Depends(get_db)):
     return controller.create(db=db, request=request)
 
+@router.post("/checkout", response_model=schema.Order)
+def checkout(request: schema.OrderCheckout, db: Session = Depends(get_db)):
+    return controller.checkout(db=db, request=request)
+
 @router.get("/sorted-by-date", response_model=list[schema.Order])
 def read_all_sorted_by_date(
     date: datetime | None = Query(
@@ -24,23 +31,47 @@ def read_all_sorted_by_date(
         description="Filter orders by this date (YYYY-MM-DD)",
         example="2024-11-06",
     ),
-    db: Session = Depends(get_db),
+    start: datetime | None = Query(None, description="Only orders placed at or after this time"),
+    end: datetime | None = Query(None, description="Only orders placed before this time"),
+    page: Page = Depends(),
+    db: Session = Depends(get_read_db),
+):
+    return controller.read_all_sorted_by_date(db, date, start=start, end=end, page=page)
+
+
+@router.get("/export")
+def export(
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    start: datetime | None = Query(None, description="Only include orders placed at or after this time"),
+    end: datetime | None = Query(None, description="Only include orders placed before this time"),
+    db: Session = Depends(get_read_db),
 ):
-    return controller.read_all_sorted_by_date(db, date)
+    return controller.export(db, fmt, start, end)
+
 
 @router.get("/", response_model=list[schema.Order])
-def read_all(db: Session = Depends(get_db)):
-    return controller.read_all(db)
+async def read_all(page: Page = Depends(), db: AsyncSession = Depends(get_async_read_db)):
+    return await controller.read_all_async(db, page)
 
 
 @router.get("/{item_id}", response_model=schema.Order)
-def read_one(item_id: int, db: Session = Depends(get_db)):
-    return controller.read_one(db, item_id=item_id)
+async def read_one(item_id: int, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+    item = await controller.read_one_async(db, item_id=item_id)
+    set_etag(response, item)
+    return item
 
 
 @router.put("/{item_id}", response_model=schema.Order)
-def update(item_id: int, request: schema.OrderUpdate, db: Session = Depends(get_db)):
-    return controller.update(db=db, request=request, item_id=item_id)
+def update(
+    item_id: int,
+    request: schema.OrderUpdate,
+    response: Response,
+    expected_version: int | None = Depends(if_match_version),
+    db: Session = Depends(get_db),
+):
+    item = controller.update(db=db, request=request, item_id=item_id, expected_version=expected_version)
+    set_etag(response, item)
+    return item
 
 
 @router.delete("/{item_id}")
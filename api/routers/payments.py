@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, Query, status
+from datetime import date, datetime
 from sqlalchemy.orm import Session
 from ..controllers import payments as controller
 from ..schemas import payments as schema
 from ..schemas.payments import Payment, TotalPayments
-from ..dependencies.database import get_db
+from ..dependencies.database import get_db, get_read_db
+from ..dependencies.pagination import Page
+from ..dependencies.versioning import if_match_version, set_etag
 
 router = APIRouter(
     tags=['Payments'],
@@ -12,9 +15,12 @@ router = APIRouter(
 
 
 @router.get("/total", response_model=TotalPayments)
-def calculate_total(db: Session = Depends(get_db)):
-    total = controller.get_total_payments(db)
-    return {"total": total}
+def calculate_total(
+    start: date | None = Query(None, description="First day to include"),
+    end: date | None = Query(None, description="Day after the last day to include"),
+    db: Session = Depends(get_read_db),
+):
+    return controller.get_total_payments(db, start, end)
 
 
 @router.post("/", response_model=schema.Payment)
@@ -23,18 +29,38 @@ def create(request: schema.PaymentCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=list[schema.Payment])
-def read_all(db: Session = Depends(get_db)):
-    return controller.read_all(db)
+def read_all(page: Page = Depends(), db: Session = Depends(get_read_db)):
+    return controller.read_all(db, page)
+
+
+@router.get("/export")
+def export(
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    start: datetime | None = Query(None, description="Only include orders placed at or after this time"),
+    end: datetime | None = Query(None, description="Only include orders placed before this time"),
+    db: Session = Depends(get_read_db),
+):
+    return controller.export(db, fmt, start, end)
 
 
 @router.get("/{payment_id}", response_model=schema.Payment)
-def read_one(payment_id: int, db: Session = Depends(get_db)):
-    return controller.read_one(db, payment_id=payment_id)
+def read_one(payment_id: int, response: Response, db: Session = Depends(get_read_db)):
+    item = controller.read_one(db, payment_id=payment_id)
+    set_etag(response, item)
+    return item
 
 
 @router.put("/{payment_id}", response_model=schema.Payment)
-def update(payment_id: int, request: schema.PaymentUpdate, db: Session = Depends(get_db)):
-    return controller.update(db=db, request=request, payment_id=payment_id)
+def update(
+    payment_id: int,
+    request: schema.PaymentUpdate,
+    response: Response,
+    expected_version: int | None = Depends(if_match_version),
+    db: Session = Depends(get_db),
+):
+    item = controller.update(db=db, request=request, payment_id=payment_id, expected_version=expected_version)
+    set_etag(response, item)
+    return item
 
 
 @router.delete("/{payment_id}", status_code=status.HTTP_204_NO_CONTENT)
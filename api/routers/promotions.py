@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, status
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 from ..controllers import promotions as controller
 from ..schemas import promotions as schema
-from ..dependencies.database import get_db
+from ..schemas.bulk import BulkResult
+from ..dependencies.database import get_db, get_read_db
+from ..dependencies.pagination import Page
 
 router = APIRouter(
     tags=['Promotions'],
@@ -15,13 +18,36 @@ def create(request: schema.PromotionCreate, db: Session = Depends(get_db)):
     return controller.create(db=db, request=request)
 
 
+@router.post("/bulk", response_model=BulkResult)
+def create_bulk(request: list[schema.PromotionCreate], db: Session = Depends(get_db)):
+    return controller.create_bulk(db=db, requests=request)
+
+
+@router.post("/generate", response_model=schema.PromotionGenerateResult)
+def generate(request: schema.PromotionGenerate, db: Session = Depends(get_db)):
+    return controller.generate_codes(db, request.prefix, request.count, request.expiration_date, length=request.length)
+
+
+@router.post("/purge-expired", response_model=schema.PromotionPurgeResult)
+def purge_expired(
+    before: datetime | None = Query(None, description="Purge promotions that expired before this time"),
+    db: Session = Depends(get_db),
+):
+    return controller.purge_expired(db, before=before)
+
+
 @router.get("/", response_model=list[schema.Promotion])
-def read_all(db: Session = Depends(get_db)):
-    return controller.read_all(db)
+def read_all(page: Page = Depends(), db: Session = Depends(get_read_db)):
+    return controller.read_all(db, page)
+
+
+@router.get("/validate/{code}", response_model=schema.PromotionValidation)
+def validate(code: str, db: Session = Depends(get_read_db), primary: Session = Depends(get_db)):
+    return controller.validate(db, code, primary=primary)
 
 
 @router.get("/{promotion_id}", response_model=schema.Promotion)
-def read_one(promotion_id: int, db: Session = Depends(get_db)):
+def read_one(promotion_id: int, db: Session = Depends(get_read_db)):
     return controller.read_one(db, promotion_id=promotion_id)
 
 
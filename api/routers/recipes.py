@@ -2,7 +2,8 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from ..controllers import recipes as controller
 from ..schemas import recipes as schema
-from ..dependencies.database import get_db
+from ..dependencies.database import get_db, get_read_db
+from ..dependencies.pagination import Page
 
 router = APIRouter(
     tags=['Recipes'],
@@ -16,12 +17,12 @@ def create(request: schema.RecipeCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=list[schema.Recipe])
-def read_all(db: Session = Depends(get_db)):
-    return controller.read_all(db)
+def read_all(page: Page = Depends(), db: Session = Depends(get_read_db)):
+    return controller.read_all(db, page)
 
 
 @router.get("/{item_id}", response_model=schema.Recipe)
-def read_one(item_id: int, db: Session = Depends(get_db)):
+def read_one(item_id: int, db: Session = Depends(get_read_db)):
     return controller.read_one(db, item_id=item_id)
 
 
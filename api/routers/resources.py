@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..controllers import resources as controller
 from ..schemas import resources as schema
-from ..dependencies.database import get_db
+from ..schemas.bulk import BulkResult
+from ..dependencies.database import get_async_read_db, get_db
+from ..dependencies.pagination import Page
+from ..dependencies.versioning import if_match_version, set_etag
 
 router = APIRouter(
     tags=['Resources'],
@@ -15,19 +19,34 @@ def create(request: schema.ResourceCreate, db: Session = Depends(get_db)):
     return controller.create(db=db, request=request)
 
 
+@router.post("/bulk", response_model=BulkResult)
+def create_bulk(request: list[schema.ResourceCreate], db: Session = Depends(get_db)):
+    return controller.create_bulk(db=db, requests=request)
+
+
 @router.get("/", response_model=list[schema.Resource])
-def read_all(db: Session = Depends(get_db)):
-    return controller.read_all(db)
+async def read_all(page: Page = Depends(), db: AsyncSession = Depends(get_async_read_db)):
+    return await controller.read_all_async(db, page)
 
 
 @router.get("/{item_id}", response_model=schema.Resource)
-def read_one(item_id: int, db: Session = Depends(get_db)):
-    return controller.read_one(db, item_id=item_id)
+async def read_one(item_id: int, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+    item = await controller.read_one_async(db, item_id=item_id)
+    set_etag(response, item)
+    return item
 
 
 @router.put("/{item_id}", response_model=schema.Resource)
-def update(item_id: int, request: schema.ResourceUpdate, db: Session = Depends(get_db)):
-    return controller.update(db=db, request=request, item_id=item_id)
+def update(
+    item_id: int,
+    request: schema.ResourceUpdate,
+    response: Response,
+    expected_version: int | None = Depends(if_match_version),
+    db: Session = Depends(get_db),
+):
+    item = controller.update(db=db, request=request, item_id=item_id, expected_version=expected_version)
+    set_etag(response, item)
+    return item
 
 
 @router.delete("/{item_id}")
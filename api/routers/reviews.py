@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 from ..controllers import reviews as controller
 from ..schemas import reviews as schema
-from ..dependencies.database import get_db
+from ..dependencies.database import get_db, get_read_db
+from ..dependencies.pagination import Page
 
 router = APIRouter(
     tags=['Reviews'],
@@ -16,12 +17,23 @@ def create(request: schema.ReviewCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=list[schema.Review])
-def read_all(db: Session = Depends(get_db)):
-    return controller.read_all(db)
+def read_all(page: Page = Depends(), db: Session = Depends(get_read_db)):
+    return controller.read_all(db, page)
+
+
+@router.get("/search", response_model=list[schema.ReviewSearchHit])
+def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to look for in the review text"),
+    sandwich_id: int | None = Query(None, description="Only reviews of this sandwich"),
+    score: int | None = Query(None, description="Only reviews with this score"),
+    page: Page = Depends(),
+    db: Session = Depends(get_read_db),
+):
+    return controller.search(db, q, page, sandwich_id=sandwich_id, score=score)
 
 
 @router.get("/{review_id}", response_model=schema.Review)
-def read_one(review_id: int, db: Session = Depends(get_db)):
+def read_one(review_id: int, db: Session = Depends(get_read_db)):
     return controller.read_one(db, review_id=review_id)
 
 
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..controllers import sandwiches as controller
 from ..schemas import sandwiches as schema
-from ..dependencies.database import get_db
+from ..schemas.bulk import BulkResult
+from ..dependencies.database import get_async_read_db, get_db, get_read_db
+from ..dependencies.pagination import Page
 
 router = APIRouter(
     tags=['Sandwiches'],
@@ -15,14 +18,35 @@ def create(request: schema.SandwichCreate, db: Session = Depends(get_db)):
     return controller.create(db=db, request=request)
 
 
+@router.post("/bulk", response_model=BulkResult)
+def create_bulk(request: list[schema.SandwichCreate], db: Session = Depends(get_db)):
+    return controller.create_bulk(db=db, requests=request)
+
+
 @router.get("/", response_model=list[schema.Sandwich])
-def read_all(db: Session = Depends(get_db)):
-    return controller.read_all(db)
+async def read_all(
+    page: Page = Depends(),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    if page.active:
+        return await controller.read_all_async(db, page)
+    return await controller.read_menu_async(db, if_none_match)
+
+
+@router.get("/ratings", response_model=list[schema.SandwichRating])
+def read_ratings(db: Session = Depends(get_read_db)):
+    return controller.read_ratings(db)
+
+
+@router.get("/{item_id}/rating", response_model=schema.SandwichRating)
+def read_rating(item_id: int, db: Session = Depends(get_read_db)):
+    return controller.read_rating(db, item_id=item_id)
 
 
 @router.get("/{item_id}", response_model=schema.Sandwich)
-def read_one(item_id: int, db: Session = Depends(get_db)):
-    return controller.read_one(db, item_id=item_id)
+async def read_one(item_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    return await controller.read_one_async(db, item_id=item_id)
 
 
 @router.put("/{item_id}", response_model=schema.Sandwich)
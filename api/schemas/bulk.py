@@ -0,0 +1,15 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    status: str
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    created: int
+    conflicts: int
+    results: list[BulkItemResult]
@@ -21,3 +21,24 @@ class Customer(CustomerBase):
 
     class Config:
         from_attributes = True
+
+
+class CustomerOrderStats(BaseModel):
+    customer_id: int
+    order_count: int = 0
+    lifetime_spend: float = 0
+
+
+class CustomerImportError(BaseModel):
+    line: int
+    email: Optional[str] = None
+    detail: str
+
+
+class CustomerImportResult(BaseModel):
+    rows: int
+    imported: int
+    errors: int
+    superseded: int
+    batches: int
+    error_details: list[CustomerImportError] = []
@@ -18,6 +18,15 @@ class OrderCreate(OrderBase):
     pass
 
 
+class CheckoutLine(BaseModel):
+    sandwich_id: int
+    amount: int = Field(..., gt=0)
+
+
+class OrderCheckout(OrderBase):
+    order_details: list[CheckoutLine] = Field(..., min_length=1)
+
+
 class OrderUpdate(BaseModel):
     customer_id: Optional[int] = None
     customer_name: Optional[str] = None
@@ -28,17 +37,33 @@ class OrderUpdate(BaseModel):
     status: Optional[str] = None
 
 
+def _format_order_date(value):
+    """Format the order_date field to a string."""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+
 class Order(OrderBase):
     id: int
+    version: Optional[int] = None
     order_date: str = Field(..., alias="order_date", description="Formatted order date")
     order_details: list[OrderDetail] = None
 
-    @field_validator("order_date", mode="before")
-    def format_order_date(cls, value):
-        """Format the order_date field to a string."""
-        if isinstance(value, datetime):
-            return value.strftime("%Y-%m-%d %H:%M:%S")
-        return value
+    format_order_date = field_validator("order_date", mode="before")(_format_order_date)
+
+    class Config:
+        from_attributes = True
+
+
+class OrderSummary(BaseModel):
+    """The columns of an order a history list needs, without its details."""
+    id: int
+    order_date: str = Field(..., description="Formatted order date")
+    total_price: Optional[float] = None
+    status: str
+
+    format_order_date = field_validator("order_date", mode="before")(_format_order_date)
 
     class Config:
         from_attributes = True
@@ -1,13 +1,18 @@
-from typing import Optional
-from pydantic import BaseModel
+from datetime import datetime
+from decimal import Decimal
+from typing import Annotated, Optional
+from pydantic import AliasChoices, BaseModel, Field, PlainSerializer
 from .orders import Order
 
+# Exact on the way in and in the database, a JSON number on the way out.
+Money = Annotated[Decimal, Field(max_digits=10, decimal_places=2), PlainSerializer(float, return_type=float, when_used="json")]
+
 
 class PaymentBase(BaseModel):
     order_id: int
     card_information: str
-    total: float
-    transaction_status: str
+    total: Money = Field(..., validation_alias=AliasChoices("total", "amount"))
+    transaction_status: str = "pending"
     payment_type: str
 
 
@@ -18,12 +23,15 @@ class PaymentCreate(PaymentBase):
 class PaymentUpdate(BaseModel):
     order_id: Optional[int] = None
     card_information: Optional[str] = None
+    total: Optional[Money] = None
     transaction_status: Optional[str] = None
     payment_type: Optional[str] = None
 
 
 class Payment(PaymentBase):
     id: int
+    version: Optional[int] = None
+    created_at: Optional[datetime] = None
     order: Optional[Order] = None
 
     class Config:
@@ -32,3 +40,5 @@ class Payment(PaymentBase):
 
 class TotalPayments(BaseModel):
     total: float
+    count: int = 0
+    by_payment_type: dict[str, float] = {}
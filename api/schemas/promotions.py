@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from .orders import Order
 
 class PromotionBase(BaseModel):
@@ -20,3 +20,29 @@ class Promotion(PromotionBase):
 
     class Config:
         from_attributes = True
+
+class PromotionValidation(BaseModel):
+    promotion_code: str
+    valid: bool
+    promotion_id: Optional[int] = None
+    expiration_date: Optional[datetime] = None
+
+
+class PromotionGenerate(BaseModel):
+    prefix: str = Field("", max_length=18, pattern="^[A-Za-z0-9_-]*$")
+    # Larger runs belong to ``python -m api.cli generate-codes``, which streams the codes to a file.
+    count: int = Field(..., ge=1, le=10_000)
+    length: int = Field(10, ge=6, le=32)
+    expiration_date: datetime
+
+
+class PromotionGenerateResult(BaseModel):
+    created: int
+    collisions: int
+    codes: List[str]
+
+
+class PromotionPurgeResult(BaseModel):
+    promotions: int
+    order_links: int
+    batches: int
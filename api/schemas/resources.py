@@ -20,6 +20,7 @@ class ResourceUpdate(BaseModel):
 
 class Resource(ResourceBase):
     id: int
+    version: Optional[int] = None
 
     class ConfigDict:
         from_attributes = True
@@ -25,3 +25,8 @@ class Review(ReviewBase):
 
     class Config:
         from_attributes = True
+
+
+class ReviewSearchHit(BaseModel):
+    relevance: float
+    review: Review
@@ -25,4 +25,11 @@ class Sandwich(SandwichBase):
     id: int
 
     class ConfigDict:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class SandwichRating(BaseModel):
+    sandwich_id: int
+    review_count: int
+    average_score: Optional[float] = None
+    histogram: dict[str, int]
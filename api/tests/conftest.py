@@ -0,0 +1,67 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
+from ..dependencies.database import Base, get_async_db, get_async_read_db, get_db, get_read_db
+from ..models import model_loader, customers
+from ..controllers import inventory, menu, promotions
+
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    """Process-local caches must not leak rows between tests."""
+    inventory.bom_cache.invalidate()
+    promotions.code_cache.invalidate()
+    menu.snapshot.bump()
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return tmp_path / "test.db"
+
+
+@pytest.fixture
+def sqlite_engine(sqlite_path):
+    """Fixture to provide a SQLite engine with every table created."""
+    engine = create_engine(
+        f"sqlite:///{sqlite_path}", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def sqlite_session(sqlite_engine):
+    """Fixture to provide a real session bound to the in-memory SQLite engine."""
+    session = sessionmaker(autocommit=False, autoflush=False, bind=sqlite_engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def sqlite_async_sessions(sqlite_engine, sqlite_path):
+    """Fixture to provide an aiosqlite session factory on the same database file."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{sqlite_path}", poolclass=NullPool)
+    return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def sqlite_client(sqlite_session, sqlite_async_sessions):
+    """Fixture to provide a TestClient whose requests use the SQLite database."""
+    from ..main import app, idempotency_records
+
+    async def get_sqlite_async_db():
+        async with sqlite_async_sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = lambda: sqlite_session
+    app.dependency_overrides[get_read_db] = lambda: sqlite_session
+    app.dependency_overrides[get_async_db] = get_sqlite_async_db
+    app.dependency_overrides[get_async_read_db] = get_sqlite_async_db
+    session_factory, idempotency_records.session_factory = idempotency_records.session_factory, sqlite_async_sessions
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    idempotency_records.session_factory = session_factory
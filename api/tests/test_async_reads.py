@@ -0,0 +1,53 @@
+from datetime import datetime
+from ..dependencies.pagination import NEXT_CURSOR_HEADER
+from ..models.customers import Customer
+from ..models.order_details import OrderDetail
+from ..models.orders import Order
+from ..models.resources import Resource
+from ..models.sandwiches import Sandwich
+
+
+def seed(session):
+    customer = Customer(name="Customer", email="customer@example.com")
+    sandwich = Sandwich(sandwich_name="Club", price=7)
+    session.add_all([
+        Order(customer=customer, customer_name=f"Customer {i}", order_date=datetime(2024, 11, 1),
+              order_details=[OrderDetail(sandwich=sandwich, amount=i + 1)])
+        for i in range(5)
+    ])
+    session.add(Resource(item="Bread", amount=10, unit="slices"))
+    session.commit()
+
+
+def test_orders_list_renders_eager_loaded_details(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+
+    response = sqlite_client.get("/orders/")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+    assert response.json()[0]["order_details"][0]["sandwich"]["sandwich_name"] == "Club"
+
+
+def test_async_list_pages_with_cursor(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+
+    first = sqlite_client.get("/orders/", params={"limit": 3})
+    second = sqlite_client.get("/orders/", params={"limit": 3, "after": first.headers[NEXT_CURSOR_HEADER]})
+
+    assert [o["customer_name"] for o in first.json()] == ["Customer 0", "Customer 1", "Customer 2"]
+    assert [o["customer_name"] for o in second.json()] == ["Customer 3", "Customer 4"]
+    assert NEXT_CURSOR_HEADER not in second.headers
+
+
+def test_async_read_one(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+
+    resource = sqlite_client.get("/resources/1")
+    sandwich = sqlite_client.get("/sandwiches/1")
+
+    assert resource.json()["item"] == "Bread"
+    assert resource.headers["ETag"] == '"1"'
+    assert sandwich.json()["sandwich_name"] == "Club"
+    assert sqlite_client.get("/sandwiches/99").status_code == 404
+    assert sqlite_client.get("/sandwiches/", params={"limit": 1}).json()[0]["id"] == 1
@@ -0,0 +1,63 @@
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.orm import declarative_base
+from ..controllers import bulk, customers, resources
+from ..models.customers import Customer
+from ..models.resources import Resource
+from ..schemas.customers import CustomerCreate
+
+
+def test_bulk_create_reports_each_row(sqlite_session):
+    sqlite_session.add(Customer(name="Existing", email="taken@example.com"))
+    sqlite_session.commit()
+    requests = [
+        CustomerCreate(name="A", email="a@example.com"),
+        CustomerCreate(name="B", email="taken@example.com"),
+        CustomerCreate(name="C", email="c@example.com"),
+        CustomerCreate(name="D", email="a@example.com"),
+    ]
+
+    result = customers.create_bulk(sqlite_session, requests)
+
+    assert result["created"] == 2
+    assert result["conflicts"] == 2
+    assert [row["status"] for row in result["results"]] == ["created", "conflict", "created", "conflict"]
+    assert result["results"][1]["detail"] == "Email must be unique"
+    created = {c.email: c.id for c in sqlite_session.query(Customer).all()}
+    assert result["results"][0]["id"] == created["a@example.com"]
+    assert result["results"][2]["id"] == created["c@example.com"]
+
+
+def test_bulk_endpoint_inserts_in_chunks(sqlite_client, sqlite_session):
+    payload = [{"item": f"Item {i}", "amount": i} for i in range(1200)]
+
+    response = sqlite_client.post("/resources/bulk", json=payload)
+
+    assert response.status_code == 200
+    assert response.json()["created"] == 1200
+    assert sqlite_session.query(Resource).count() == 1200
+
+
+def test_bulk_endpoint_validates_every_row(sqlite_client, sqlite_session):
+    response = sqlite_client.post("/resources/bulk", json=[{"item": "Bread", "amount": 1}, {"item": "Cheese"}])
+
+    assert response.status_code == 422
+    assert sqlite_session.query(Resource).count() == 0
+
+
+def test_keys_matched_only_by_the_column_collation_are_conflicts(sqlite_session):
+    Base = declarative_base()
+
+    class Tag(Base):
+        __tablename__ = "tags"
+        id = Column(Integer, primary_key=True)
+        name = Column(String(50, collation="NOCASE"), unique=True)
+
+    Base.metadata.create_all(sqlite_session.get_bind())
+    sqlite_session.add(Tag(name="Vegan"))
+    sqlite_session.commit()
+
+    result = bulk.create_many(sqlite_session, Tag, [{"name": "vegan"}, {"name": "Spicy"}], unique="name",
+                              conflict_detail="Tag must be unique")
+
+    assert [row["status"] for row in result["results"]] == ["conflict", "created"]
+    assert result["results"][1]["id"] == sqlite_session.query(Tag.id).filter_by(name="Spicy").scalar()
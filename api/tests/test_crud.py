@@ -0,0 +1,77 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from ..controllers import crud
+from ..models.resources import Resource
+
+
+def recorded_statements(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2].split()[0]))
+    return statements
+
+
+@pytest.fixture
+def resource(sqlite_session):
+    sqlite_session.add(Resource(id=1, item="Bread", amount=10, unit="slice"))
+    sqlite_session.commit()
+    sqlite_session.expunge_all()
+
+
+def test_update_is_a_single_statement(sqlite_engine, sqlite_session, resource):
+    statements = recorded_statements(sqlite_engine)
+
+    item = crud.update_by_id(sqlite_session, Resource, 1, {"amount": 25})
+
+    assert statements == ["UPDATE"]
+    assert (item.id, item.item, item.amount) == (1, "Bread", 25)
+    assert sqlite_session.query(Resource.amount).filter(Resource.id == 1).scalar() == 25
+
+
+def test_unchanged_values_skip_the_write(sqlite_engine, sqlite_session, resource):
+    statements = recorded_statements(sqlite_engine)
+
+    item = crud.update_by_id(sqlite_session, Resource, 1, {"amount": 10, "unit": "slice"})
+
+    assert statements == ["UPDATE", "SELECT"]
+    assert item.amount == 10
+
+
+def test_missing_row_is_404(sqlite_session, resource):
+    with pytest.raises(HTTPException) as exc:
+        crud.update_by_id(sqlite_session, Resource, 99, {"amount": 1})
+
+    assert exc.value.status_code == 404
+
+
+def test_put_still_renders_nested_relationships(sqlite_client, sqlite_session):
+    order = sqlite_client.post("/orders/", json={"customer_id": 1, "customer_name": "John Doe"}).json()
+
+    response = sqlite_client.put(f"/orders/{order['id']}", json={"status": "ready"})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert response.json()["order_details"] == []
+
+
+def test_versioned_update_is_compare_and_swap(sqlite_session, resource):
+    item = crud.update_by_id(sqlite_session, Resource, 1, {"amount": 20}, expected_version=1)
+    assert item.version == 2
+
+    with pytest.raises(HTTPException) as exc:
+        crud.update_by_id(sqlite_session, Resource, 1, {"amount": 30}, expected_version=1)
+
+    assert exc.value.status_code == 412
+    assert sqlite_session.query(Resource.amount).filter(Resource.id == 1).scalar() == 20
+
+
+def test_etag_and_if_match_round_trip(sqlite_client, resource):
+    etag = sqlite_client.get("/resources/1").headers["ETag"]
+
+    first = sqlite_client.put("/resources/1", json={"amount": 5}, headers={"If-Match": etag})
+    second = sqlite_client.put("/resources/1", json={"amount": 7}, headers={"If-Match": etag})
+
+    assert first.status_code == 200
+    assert first.headers["ETag"] == '"2"'
+    assert second.status_code == 412
+    assert sqlite_client.get("/resources/1").json()["amount"] == 5
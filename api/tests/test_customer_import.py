@@ -0,0 +1,121 @@
+import asyncio
+import csv
+import json
+import threading
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from .. import cli
+from ..controllers import customers, imports
+from ..models.customers import Customer
+
+CSV = (
+    "name,email,phone_number,address\n"
+    "Ann,ann@example.com,555-0100,\n"
+    "Bob,bob@example.com,,\"12 Long Road\n"
+    "Flat 3\"\n"
+    ",nameless@example.com,,\n"
+    "Cy,cy@example.com,,,extra\n"
+    "Ann Again,ann@example.com,555-0199,\n"
+)
+
+
+def emails_and_names(session):
+    session.expire_all()
+    return {customer.email: customer.name for customer in session.query(Customer)}
+
+
+def test_lines_survive_chunk_boundaries():
+    data = "é,ü\n\"a\nb\",c\nlast".encode()
+    chunks = [data[i:i + 1] for i in range(len(data))]
+
+    assert list(imports.lines(chunks)) == ["é,ü\n", "\"a\n", "b\",c\n", "last"]
+
+
+def test_disconnect_stops_the_worker_without_committing_the_open_batch(sqlite_session):
+    class Disconnected(Exception):
+        pass
+
+    async def stream():
+        yield b'{"name": "Ann", "email": "ann@example.com"}\n'
+        raise Disconnected()
+
+    finished = threading.Event()
+
+    def work(chunks):
+        try:
+            return customers.import_customers(sqlite_session, chunks, "ndjson")
+        finally:
+            finished.set()
+
+    with pytest.raises(Disconnected):
+        asyncio.run(imports.consume(stream(), work))
+
+    assert finished.wait(5)
+    assert emails_and_names(sqlite_session) == {}
+
+
+def test_csv_upload_upserts_on_email_and_reports_bad_rows(sqlite_client, sqlite_session):
+    sqlite_session.add(Customer(name="Old Bob", email="bob@example.com", phone_number="555-0000"))
+    sqlite_session.commit()
+
+    response = sqlite_client.post("/customers/import?format=csv", content=CSV.encode(),
+                                  headers={"content-type": "text/csv"})
+
+    body = response.json()
+    assert response.status_code == 200
+    assert (body["rows"], body["imported"], body["errors"], body["superseded"]) == (5, 2, 2, 1)
+    assert [(error["line"], error["email"]) for error in body["error_details"]] == [
+        (5, "nameless@example.com"), (6, None)]
+    assert emails_and_names(sqlite_session) == {"bob@example.com": "Bob", "ann@example.com": "Ann Again"}
+    bob = sqlite_session.query(Customer).filter_by(email="bob@example.com").one()
+    assert bob.address == "12 Long Road\nFlat 3" and bob.phone_number is None
+
+
+def test_ndjson_upload_reports_unparseable_lines(sqlite_client, sqlite_session):
+    body = "\n".join([
+        json.dumps({"name": "Dee", "email": "dee@example.com"}),
+        "{not json",
+        "[1, 2]",
+        "",
+        json.dumps({"name": "Eve", "email": "eve@example.com", "address": "1 Main St"}),
+    ])
+
+    result = sqlite_client.post("/customers/import?format=ndjson", content=body.encode()).json()
+
+    assert (result["rows"], result["imported"], result["errors"]) == (4, 2, 2)
+    assert [error["line"] for error in result["error_details"]] == [2, 3]
+    assert set(emails_and_names(sqlite_session)) == {"dee@example.com", "eve@example.com"}
+
+
+def test_batches_commit_as_they_go_and_isolate_rejected_rows(sqlite_session):
+    sqlite_session.execute(text(
+        "CREATE TRIGGER reject_blocked BEFORE INSERT ON customers WHEN new.email = 'blocked@example.com'"
+        " BEGIN SELECT RAISE(ABORT, 'blocked'); END"))
+    sqlite_session.commit()
+    rows = [{"name": f"C{i}", "email": f"c{i}@example.com"} for i in range(5)]
+    rows.insert(2, {"name": "Blocked", "email": "blocked@example.com"})
+    chunks = [(json.dumps(row) + "\n").encode() for row in rows]
+    progress, errors = [], []
+
+    summary = customers.import_customers(sqlite_session, chunks, "ndjson", batch_size=2,
+                                         on_error=lambda *error: errors.append(error), on_progress=progress.append)
+
+    assert summary == {"rows": 6, "imported": 5, "errors": 1, "superseded": 0, "batches": 3}
+    assert [snapshot["imported"] for snapshot in progress] == [2, 3, 5]
+    assert errors == [(3, "blocked@example.com", "blocked")]
+    assert len(emails_and_names(sqlite_session)) == 5
+
+
+def test_cli_imports_a_file_and_writes_an_error_file(sqlite_engine, sqlite_session, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(cli, "SessionLocal", sessionmaker(bind=sqlite_engine))
+    source, errors = tmp_path / "customers.csv", tmp_path / "errors.csv"
+    source.write_text(CSV)
+
+    cli.main(["import-customers", str(source), "--errors", str(errors), "--batch-size", "2"])
+
+    assert "Imported 3 of 5 row(s) in 2 batch(es), 2 error(s), 0 superseded" in capsys.readouterr().out
+    with open(errors, newline="") as f:
+        assert [row[:2] for row in csv.reader(f)] == [["line", "email"], ["5", "nameless@example.com"],
+                                                      ["6", ""]]
+    assert emails_and_names(sqlite_session)["ann@example.com"] == "Ann Again"
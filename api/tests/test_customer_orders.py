@@ -0,0 +1,107 @@
+from datetime import datetime
+from fastapi import Response
+from sqlalchemy import create_engine, inspect, text
+from ..controllers import customers
+from ..dependencies.pagination import Page
+from ..migrations import runner
+from ..models.customers import Customer
+from ..models.order_details import OrderDetail
+from ..models.orders import Order
+from ..models.sandwiches import Sandwich
+from .test_query_plans import query_plans
+
+
+def seed(session):
+    session.add_all([
+        Customer(id=1, name="A", email="a@example.com"),
+        Customer(id=2, name="B", email="b@example.com"),
+        Sandwich(id=1, sandwich_name="BLT", price=5),
+    ])
+    session.add_all([
+        Order(id=i, customer_id=1 if i % 2 else 2, customer_name="A", total_price=i,
+              order_date=datetime(2024, 11, 1 + i), status="pending",
+              order_details=[OrderDetail(sandwich_id=1, amount=1)])
+        for i in range(1, 8)
+    ])
+    session.commit()
+
+
+def test_history_is_newest_first_and_paged(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+
+    first = sqlite_client.get("/customers/1/orders", params={"limit": 3})
+    second = sqlite_client.get("/customers/1/orders", params={"limit": 3, "after": first.headers["X-Next-Cursor"]})
+
+    assert [order["id"] for order in first.json()] == [7, 5, 3]
+    assert [order["id"] for order in second.json()] == [1]
+    assert first.json()[0]["order_details"][0]["sandwich_id"] == 1
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_summary_view_returns_only_the_projection(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+
+    response = sqlite_client.get("/customers/2/orders", params={"summary": True})
+
+    assert response.json() == [
+        {"id": i, "order_date": f"2024-11-{1 + i:02d} 00:00:00", "total_price": float(i), "status": "pending"}
+        for i in (6, 4, 2)
+    ]
+
+
+def test_summary_view_reads_only_the_covering_index(sqlite_session):
+    seed(sqlite_session)
+    page = Page(Response(), limit=2, after=None)
+
+    plans = query_plans(sqlite_session, lambda: customers.read_orders(sqlite_session, 1, page, summary=True))
+
+    assert "USING COVERING INDEX ix_orders_customer_history" in plans[-1]
+    assert "TEMP B-TREE" not in plans[-1]
+
+
+def test_unknown_customer_is_404(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+
+    assert sqlite_client.get("/customers/99/orders").status_code == 404
+    assert sqlite_client.get("/customers/99/orders/stats").status_code == 404
+
+
+def test_stats_follow_order_writes(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+    sqlite_session.execute(text("DELETE FROM customer_order_stats"))
+    sqlite_session.commit()
+
+    def stats(customer_id):
+        return sqlite_client.get(f"/customers/{customer_id}/orders/stats").json()
+
+    created = sqlite_client.post("/orders/", json={
+        "customer_id": 1, "customer_name": "A", "total_price": 10.25}).json()
+    sqlite_client.post("/orders/", json={"customer_id": 1, "customer_name": "A", "total_price": 4.5})
+    assert stats(1) == {"customer_id": 1, "order_count": 2, "lifetime_spend": 14.75}
+
+    sqlite_client.put(f"/orders/{created['id']}", json={"total_price": 20})
+    assert stats(1)["lifetime_spend"] == 24.5
+
+    sqlite_client.put(f"/orders/{created['id']}", json={"customer_id": 2, "description": "moved"})
+    assert stats(1) == {"customer_id": 1, "order_count": 1, "lifetime_spend": 4.5}
+    assert stats(2) == {"customer_id": 2, "order_count": 1, "lifetime_spend": 20.0}
+
+    sqlite_client.delete(f"/orders/{created['id']}")
+    assert stats(2) == {"customer_id": 2, "order_count": 0, "lifetime_spend": 0.0}
+
+
+def test_rebuild_and_migration_replace_the_customer_index(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'history.db'}")
+    runner.migrate(engine, target=1, log=lambda message: None)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE INDEX ix_orders_customer_id ON orders (customer_id)"))
+        connection.execute(text("INSERT INTO customers (id, name, email) VALUES (1, 'A', 'a@example.com')"))
+        connection.execute(text("INSERT INTO orders (customer_id, total_price, order_type, status)"
+                                " VALUES (1, 2.50, 'Dine-In', 'pending'), (1, 1.25, 'Dine-In', 'pending')"))
+
+    runner.migrate(engine, log=lambda message: None)
+
+    indexes = {index["name"] for index in inspect(engine).get_indexes("orders")}
+    assert "ix_orders_customer_history" in indexes and "ix_orders_customer_id" not in indexes
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT order_count, lifetime_spend FROM customer_order_stats")).one() == (2, 3.75)
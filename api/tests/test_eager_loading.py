@@ -0,0 +1,71 @@
+from datetime import datetime
+import pytest
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from ..controllers import orders, payments, promotions, reviews
+from ..models.customers import Customer
+from ..models.order_details import OrderDetail
+from ..models.orders import Order
+from ..models.payments import Payment
+from ..models.promotions import Promotion
+from ..models.reviews import Review
+from ..models.sandwiches import Sandwich
+from ..schemas import orders as order_schema
+from ..schemas import promotions as promotion_schema
+from ..schemas import reviews as review_schema
+
+
+def seed(session, start, stop):
+    for i in range(start, stop):
+        customer = Customer(name=f"Customer {i}", email=f"customer{i}@example.com")
+        sandwich = Sandwich(sandwich_name=f"Sandwich {i}", price=5)
+        order = Order(customer=customer, customer_name=customer.name, order_date=datetime(2024, 11, 1))
+        order.order_details = [OrderDetail(sandwich=sandwich, amount=1), OrderDetail(sandwich=sandwich, amount=2)]
+        session.add_all([
+            order,
+            Payment(order=order, card_information="1234", payment_type="Card"),
+            Review(customer=customer, sandwich=sandwich, review_text="Good", score=5),
+            Promotion(promotion_code=f"CODE{i}", expiration_date=datetime(2030, 1, 1), orders=[order]),
+        ])
+    session.commit()
+    session.expunge_all()
+
+
+def count_queries(session, fn):
+    statements = []
+
+    def record(*args):
+        statements.append(args[2])
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    session.expunge_all()
+    return len(statements)
+
+
+def render(schema, rows):
+    return TypeAdapter(list[schema]).validate_python(rows, from_attributes=True)
+
+
+CASES = {
+    "orders": lambda db: render(order_schema.Order, orders.read_all(db)),
+    "reviews": lambda db: render(review_schema.Review, reviews.read_all(db)),
+    "payments": lambda db: render(order_schema.Order, [p.order for p in payments.read_all(db)]),
+    "promotions": lambda db: render(promotion_schema.Promotion, promotions.read_all(db)),
+}
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_list_query_count_is_independent_of_row_count(sqlite_session, name):
+    seed(sqlite_session, 0, 2)
+    small = count_queries(sqlite_session, lambda: CASES[name](sqlite_session))
+
+    seed(sqlite_session, 2, 20)
+    large = count_queries(sqlite_session, lambda: CASES[name](sqlite_session))
+
+    assert small == large
+    assert large <= 3
@@ -0,0 +1,56 @@
+import csv
+import io
+import json
+from datetime import datetime
+from ..models.order_details import OrderDetail
+from ..models.orders import Order
+from ..models.payments import Payment
+from ..models.sandwiches import Sandwich
+
+
+def seed(session):
+    sandwich = Sandwich(sandwich_name="Club", price=7)
+    for day in (1, 2, 3):
+        order = Order(customer_name=f"Customer {day}", order_date=datetime(2024, 11, day, 12), total_price=10)
+        order.order_details = [OrderDetail(sandwich=sandwich, amount=day)]
+        session.add_all([order, Payment(order=order, card_information="4111", payment_type="Card")])
+    session.commit()
+
+
+def test_export_orders_ndjson(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+
+    response = sqlite_client.get("/orders/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["customer_name"] for row in rows] == ["Customer 1", "Customer 2", "Customer 3"]
+    assert rows[0]["order_date"] == "2024-11-01T12:00:00"
+
+
+def test_export_order_details_csv_with_date_range(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+
+    response = sqlite_client.get(
+        "/orderdetails/export",
+        params={"format": "csv", "start": "2024-11-02T00:00:00", "end": "2024-11-03T00:00:00"}
+    )
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert response.headers["content-type"].startswith("text/csv")
+    assert [row["amount"] for row in rows] == ["2"]
+
+
+def test_export_payments_omits_card_information(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+
+    response = sqlite_client.get("/payments/export", params={"start": "2024-11-02T00:00:00"})
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 2
+    assert all("card_information" not in row for row in rows)
+
+
+def test_export_rejects_unknown_format(sqlite_client):
+    assert sqlite_client.get("/orders/export", params={"format": "xml"}).status_code == 422
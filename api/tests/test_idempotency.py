@@ -0,0 +1,181 @@
+import asyncio
+import time
+import uuid
+import httpx
+from fastapi import FastAPI, HTTPException
+from sqlalchemy import func, select
+from ..dependencies.idempotency import IdempotencyMiddleware, IdempotencyRecords, IdempotencyStore, REPLAYED_HEADER
+from ..models.customers import Customer
+from ..models.orders import Order
+from ..models.payments import Payment
+
+
+def order_body():
+    return {"customer_id": 1, "customer_name": "A", "description": "Lunch"}
+
+
+def seed(session):
+    session.add(Customer(id=1, name="A", email="a@example.com"))
+    session.commit()
+
+
+def test_retry_replays_the_first_response(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+
+    first = sqlite_client.post("/orders/", json=order_body(), headers=headers)
+    retry = sqlite_client.post("/orders/", json=order_body(), headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.content == first.content
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert REPLAYED_HEADER not in first.headers
+    assert sqlite_session.scalar(select(func.count()).select_from(Order)) == 1
+
+
+def test_key_reused_with_a_different_body_is_rejected(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    sqlite_client.post("/orders/", json=order_body(), headers=headers)
+
+    response = sqlite_client.post("/orders/", json={**order_body(), "description": "Dinner"}, headers=headers)
+
+    assert response.status_code == 422
+
+
+def test_requests_without_a_key_are_not_deduplicated(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+    sqlite_session.add(Order(id=1, customer_id=1, customer_name="A"))
+    sqlite_session.commit()
+    body = {"order_id": 1, "card_information": "4111", "total": 5,
+            "transaction_status": "Completed", "payment_type": "Card"}
+
+    sqlite_client.post("/payments/", json=body)
+    sqlite_client.post("/payments/", json=body)
+
+    assert sqlite_session.scalar(select(func.count()).select_from(Payment)) == 2
+
+
+def slow_app(store, records=None):
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.post("/work")
+    async def work(fail: bool = False):
+        app.state.calls += 1
+        await asyncio.sleep(0.05)
+        if fail:
+            raise HTTPException(status_code=503, detail="Try again")
+        return {"call": app.state.calls}
+
+    app.add_middleware(IdempotencyMiddleware, paths=["/work"], store=store, records=records)
+    return app
+
+
+async def post(app, path, key):
+    """Call the ASGI app directly, so concurrent calls really overlap."""
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+             "headers": [(b"idempotency-key", key.encode())], "client": ("test", 1), "server": ("test", 80)}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages[0]["status"], b"".join(m.get("body", b"") for m in messages[1:]), dict(messages[0]["headers"])
+
+
+def test_concurrent_duplicates_wait_for_the_first_request():
+    store = IdempotencyStore()
+    app = slow_app(store)
+
+    async def send_all():
+        return await asyncio.gather(*(post(app, "/work", "same") for _ in range(5)))
+
+    responses = asyncio.run(send_all())
+
+    assert app.state.calls == 1
+    assert {body for _, body, _ in responses} == {b'{"call":1}'}
+    assert store.waits == 4
+
+
+def test_server_errors_are_not_stored():
+    app = slow_app(IdempotencyStore())
+
+    async def send_twice():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.post("/work", params={"fail": True}, headers={"Idempotency-Key": "k"})
+            second = await client.post("/work", params={"fail": True}, headers={"Idempotency-Key": "k"})
+            return first, second
+
+    first, second = asyncio.run(send_twice())
+
+    assert first.status_code == second.status_code == 503
+    assert app.state.calls == 2
+
+
+def test_store_evicts_expired_and_oldest_entries():
+    store = IdempotencyStore(max_entries=2, ttl=60)
+    for key in ("a", "b"):
+        entry, _ = store.claim(key, "f")
+        store.complete(entry, (200, [], b""))
+    store.claim("a", "f")
+    store.claim("c", "f")
+
+    assert store.claim("b", "f")[1] is False
+    assert store.claim("a", "f")[1] is True
+
+    store.ttl = 0.01
+    entry, _ = store.claim("d", "f")
+    time.sleep(0.02)
+    assert store.claim("d", "f")[1] is True
+
+
+def workers(sessions, count=2):
+    """Apps with their own in-process stores sharing one idempotency_keys table, like worker processes."""
+    return [slow_app(IdempotencyStore(), IdempotencyRecords(sessions, poll_interval=0.01)) for _ in range(count)]
+
+
+def test_retry_on_another_worker_replays_the_first_response(sqlite_async_sessions):
+    first, second = workers(sqlite_async_sessions)
+
+    async def send():
+        return await post(first, "/work", "k"), await post(second, "/work", "k")
+
+    (status, body, _), (retry_status, retry_body, headers) = asyncio.run(send())
+
+    assert first.state.calls == 1 and second.state.calls == 0
+    assert (retry_status, retry_body) == (status, body) == (200, b'{"call":1}')
+    assert headers[REPLAYED_HEADER.lower().encode()] == b"true"
+
+
+def test_concurrent_duplicates_on_two_workers_run_once(sqlite_async_sessions):
+    first, second = workers(sqlite_async_sessions)
+
+    async def send_all():
+        return await asyncio.gather(post(first, "/work", "k"), post(second, "/work", "k"))
+
+    responses = asyncio.run(send_all())
+
+    assert first.state.calls + second.state.calls == 1
+    assert {body for _, body, _ in responses} == {b'{"call":1}'}
+
+
+def test_failed_requests_release_the_shared_key(sqlite_async_sessions):
+    first, second = workers(sqlite_async_sessions)
+
+    async def fail_then_retry():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=first), base_url="http://test") as client:
+            await client.post("/work", params={"fail": True}, headers={"Idempotency-Key": "k"})
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=second), base_url="http://test") as client:
+            return await client.post("/work", headers={"Idempotency-Key": "k"})
+
+    retry = asyncio.run(fail_then_retry())
+
+    assert retry.status_code == 200 and REPLAYED_HEADER not in retry.headers
+    assert first.state.calls == second.state.calls == 1
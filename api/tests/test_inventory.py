@@ -0,0 +1,149 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from ..dependencies.database import Base
+from ..controllers import inventory
+from ..controllers import order_details as controller
+from ..controllers import recipes
+from ..models.orders import Order
+from ..models.recipes import Recipe
+from ..models.resources import Resource
+from ..models.sandwiches import Sandwich
+
+
+def seed(session, bread=10, cheese=10):
+    session.add_all([
+        Sandwich(id=1, sandwich_name="Grilled Cheese", price=5),
+        Sandwich(id=2, sandwich_name="Toast", price=2),
+        Resource(id=1, item="Bread", amount=bread),
+        Resource(id=2, item="Cheese", amount=cheese),
+        Recipe(sandwich_id=1, resource_id=1, amount=2),
+        Recipe(sandwich_id=1, resource_id=2, amount=1),
+        Recipe(sandwich_id=2, resource_id=1, amount=1),
+        Order(id=1, customer_name="John Doe"),
+    ])
+    session.commit()
+
+
+def stock(session):
+    session.expire_all()
+    return {r.item: r.amount for r in session.query(Resource).all()}
+
+
+def test_reserve_decrements_every_resource(sqlite_session):
+    seed(sqlite_session)
+
+    inventory.reserve(sqlite_session, [(1, 2), (2, 3)])
+    sqlite_session.commit()
+
+    assert stock(sqlite_session) == {"Bread": 3, "Cheese": 8}
+
+
+def test_reserve_reports_every_shortfall(sqlite_session):
+    seed(sqlite_session, bread=3, cheese=1)
+
+    with pytest.raises(HTTPException) as exc:
+        inventory.reserve(sqlite_session, [(1, 2)])
+
+    assert exc.value.status_code == 400
+    assert exc.value.detail == {
+        "message": "Insufficient ingredients",
+        "details": [
+            {"item": "Bread", "available": 3, "required": 4},
+            {"item": "Cheese", "available": 1, "required": 2},
+        ]
+    }
+    assert stock(sqlite_session) == {"Bread": 3, "Cheese": 1}
+
+
+def test_reserve_unknown_sandwich(sqlite_session):
+    seed(sqlite_session)
+
+    with pytest.raises(HTTPException) as exc:
+        inventory.reserve(sqlite_session, [(99, 1)])
+
+    assert exc.value.status_code == 404
+
+
+def test_bom_cache_counts_hits_and_misses(sqlite_session):
+    seed(sqlite_session)
+    before = inventory.bom_cache.stats()
+
+    inventory.reserve(sqlite_session, [(1, 1)])
+    inventory.reserve(sqlite_session, [(1, 1), (2, 1)])
+
+    stats = inventory.bom_cache.stats()
+    assert stats["hits"] - before["hits"] == 1
+    assert stats["misses"] - before["misses"] == 2
+    assert stats["size"] == 2
+
+
+def test_recipe_writes_invalidate_bom_cache(sqlite_session):
+    seed(sqlite_session, bread=100, cheese=100)
+    inventory.reserve(sqlite_session, [(2, 1)])
+    sqlite_session.commit()
+
+    recipe = sqlite_session.query(Recipe).filter_by(sandwich_id=2).one()
+    recipes.update(sqlite_session, recipe.id, SimpleNamespace(dict=lambda **_: {"amount": 5}))
+    inventory.reserve(sqlite_session, [(2, 1)])
+    sqlite_session.commit()
+
+    assert stock(sqlite_session)["Bread"] == 94
+
+
+def test_recipes_written_elsewhere_are_seen_after_the_ttl(sqlite_session):
+    seed(sqlite_session)
+    cache = inventory.BomCache(ttl=0.01)
+    assert cache.get_many(sqlite_session, [2])[2] == ((1, 1, 0),)
+
+    # Another worker's write: this cache is never invalidated.
+    sqlite_session.query(Recipe).filter_by(sandwich_id=2).update({"amount": 3})
+    sqlite_session.commit()
+    time.sleep(0.02)
+
+    assert cache.get_many(sqlite_session, [2])[2] == ((1, 3, 0),)
+
+
+def test_sandwiches_without_a_recipe_are_not_cached(sqlite_session):
+    seed(sqlite_session)
+    cache = inventory.BomCache()
+    sqlite_session.add(Sandwich(id=3, sandwich_name="New"))
+    sqlite_session.commit()
+    assert cache.get_many(sqlite_session, [3]) == {3: ()}
+
+    sqlite_session.add(Recipe(sandwich_id=3, resource_id=1, amount=1))
+    sqlite_session.commit()
+
+    assert cache.get_many(sqlite_session, [3]) == {3: ((1, 1, 0),)}
+
+
+def test_concurrent_orders_never_oversell(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'inventory.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with SessionLocal() as session:
+        seed(session, bread=20, cheese=100)
+
+    def place_order(_):
+        with SessionLocal() as session:
+            request = SimpleNamespace(order_id=1, sandwich_id=1, amount=1)
+            try:
+                controller.create(session, request)
+                return True
+            except HTTPException:
+                return False
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(place_order, range(30)))
+
+    with SessionLocal() as session:
+        assert results.count(True) == 10
+        assert stock(session) == {"Bread": 0, "Cheese": 90}
+    engine.dispose()
@@ -0,0 +1,67 @@
+from sqlalchemy import event
+from ..controllers import menu
+
+
+def add_sandwich(client, name, price=8.5):
+    response = client.post("/sandwiches/", json={"sandwich_name": name, "price": price, "calories": 500})
+    assert response.status_code == 200
+
+
+def test_menu_is_served_with_etag_and_cache_control(sqlite_client):
+    add_sandwich(sqlite_client, "Club")
+
+    response = sqlite_client.get("/sandwiches/")
+
+    assert response.status_code == 200
+    assert [item["sandwich_name"] for item in response.json()] == ["Club"]
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["cache-control"] == f"public, max-age={menu.snapshot.max_age}"
+
+
+def test_matching_etag_gets_304_without_a_query(sqlite_client, sqlite_async_sessions):
+    add_sandwich(sqlite_client, "Club")
+    etag = sqlite_client.get("/sandwiches/").headers["etag"]
+    statements = []
+    engine = sqlite_async_sessions.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    repeat = sqlite_client.get("/sandwiches/")
+    not_modified = sqlite_client.get("/sandwiches/", headers={"If-None-Match": f'W/{etag}, "other"'})
+
+    assert repeat.status_code == 200 and repeat.headers["etag"] == etag
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert not any(statement.lstrip().upper().startswith("SELECT") for statement in statements)
+
+
+def test_menu_writes_replace_the_snapshot(sqlite_client):
+    add_sandwich(sqlite_client, "Club")
+    before = sqlite_client.get("/sandwiches/")
+
+    add_sandwich(sqlite_client, "Reuben")
+    after = sqlite_client.get("/sandwiches/", headers={"If-None-Match": before.headers["etag"]})
+
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert [item["sandwich_name"] for item in after.json()] == ["Club", "Reuben"]
+
+
+def test_paginated_reads_bypass_the_snapshot(sqlite_client):
+    for name in ("Club", "Reuben", "Cuban"):
+        add_sandwich(sqlite_client, name)
+
+    response = sqlite_client.get("/sandwiches/", params={"limit": 2})
+
+    assert [item["sandwich_name"] for item in response.json()] == ["Club", "Reuben"]
+    assert "etag" not in response.headers
+
+
+def test_menu_metrics_are_exported(sqlite_client):
+    add_sandwich(sqlite_client, "Club")
+    etag = sqlite_client.get("/sandwiches/").headers["etag"]
+    sqlite_client.get("/sandwiches/", headers={"If-None-Match": etag})
+
+    text = sqlite_client.get("/metrics").text
+
+    assert "menu_version " in text
+    assert 'menu_responses_total{status="304"}' in text
+    assert "menu_snapshot_builds_total " in text
@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy import create_engine, exc
+from ..dependencies import metrics
+
+
+@pytest.fixture
+def pooled_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=metrics.MeteredQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_pool_records_overflow_timeouts_and_waits(pooled_engine):
+    first = pooled_engine.connect()
+    second = pooled_engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        pooled_engine.connect()
+
+    lines = metrics.pool_collector([("test", pooled_engine)])()
+
+    assert 'db_pool_checked_out{pool="test"} 2' in lines
+    assert 'db_pool_overflow{pool="test"} 1' in lines
+    assert 'db_pool_overflow_connections_total{pool="test"} 1' in lines
+    assert 'db_pool_checkout_timeouts_total{pool="test"} 1' in lines
+    assert 'db_pool_checkout_wait_seconds_count{pool="test"} 3' in lines
+    assert 'db_pool_checkout_wait_seconds_bucket{pool="test",le="+Inf"} 3' in lines
+
+    first.close()
+    second.close()
+    lines = metrics.pool_collector([("test", pooled_engine)])()
+    assert 'db_pool_checked_out{pool="test"} 0' in lines
+    assert 'db_pool_idle{pool="test"} 1' in lines
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram((0.1, 1.0))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value)
+
+    samples = {(suffix, labels.get("le")): value for suffix, labels, value in histogram.samples({})}
+
+    assert samples[("_bucket", 0.1)] == 1
+    assert samples[("_bucket", 1.0)] == 2
+    assert samples[("_bucket", "+Inf")] == 3
+    assert samples[("_count", None)] == 3
+
+
+def test_metrics_endpoint_serves_prometheus_text(sqlite_client):
+    response = sqlite_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE db_pool_checkout_wait_seconds histogram" in response.text
+    assert "bom_cache_hits_total" in response.text
+
+
+def test_metrics_page_declares_each_family_once(sqlite_client):
+    text = sqlite_client.get("/metrics").text
+
+    types = [line for line in text.splitlines() if line.startswith("# TYPE ")]
+    assert len(types) == len(set(types))
+    # The primary's sync and async pools share each family.
+    assert 'db_pool_size{pool="primary"}' in text and 'db_pool_size{pool="primary_async"}' in text
+    assert 'db_pool_checkout_wait_seconds_count{pool="primary_async"}' in text
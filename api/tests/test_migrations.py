@@ -0,0 +1,71 @@
+from sqlalchemy import create_engine, inspect, select, text
+from ..dependencies.database import Base
+from ..migrations import runner
+
+
+def columns(engine, table):
+    return {column["name"] for column in inspect(engine).get_columns(table)}
+
+
+def test_fresh_database_is_migrated_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+
+    first = runner.migrate(engine, log=lambda message: None)
+    second = runner.migrate(engine, log=lambda message: None)
+
+    assert first == [version for version, _, _ in runner.discover()]
+    assert second == []
+    assert set(Base.metadata.tables) <= set(inspect(engine).get_table_names())
+    with engine.connect() as connection:
+        assert list(connection.scalars(select(runner.schema_migrations.c.version))) == first
+
+
+def test_existing_schema_gains_columns_and_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE orders (id INTEGER PRIMARY KEY, customer_id INTEGER, customer_name VARCHAR(100),"
+            " order_date DATETIME, tracking_number VARCHAR(100), total_price DECIMAL(10, 2),"
+            " description VARCHAR(300), order_type VARCHAR(50), status VARCHAR(50), promotion_id INTEGER)"
+        ))
+        connection.execute(text("INSERT INTO orders (id, customer_name) VALUES (1, 'Existing')"))
+
+    runner.migrate(engine, log=lambda message: None)
+
+    assert "version" in columns(engine, "orders")
+    assert "ix_orders_order_date_id" in {index["name"] for index in inspect(engine).get_indexes("orders")}
+    with engine.connect() as connection:
+        assert connection.scalar(text("SELECT version FROM orders WHERE id = 1")) == 1
+
+
+def test_target_and_pending(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'partial.db'}")
+
+    assert runner.migrate(engine, target=1, log=lambda message: None) == [1]
+    assert [version for version, _, _ in runner.pending(engine)][0] == 2
+
+
+def test_amount_indexes_are_replaced_by_foreign_key_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'indexes.db'}")
+    runner.migrate(engine, target=1, log=lambda message: None)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE INDEX ix_resources_amount ON resources (amount)"))
+
+    runner.migrate(engine, log=lambda message: None)
+
+    assert "ix_resources_amount" not in {index["name"] for index in inspect(engine).get_indexes("resources")}
+    assert "ix_order_details_order_id" in {index["name"] for index in inspect(engine).get_indexes("order_details")}
+
+
+def test_review_search_index_covers_existing_reviews(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    runner.migrate(engine, target=1, log=lambda message: None)
+    with engine.begin() as connection:
+        for statement in ("DROP TRIGGER reviews_fts_insert", "DROP TABLE reviews_fts"):
+            connection.execute(text(statement))
+        connection.execute(text("INSERT INTO reviews (id, review_text, score) VALUES (1, 'Cold fries', 2)"))
+
+    runner.migrate(engine, log=lambda message: None)
+
+    with engine.connect() as connection:
+        assert connection.scalar(text("SELECT rowid FROM reviews_fts WHERE reviews_fts MATCH 'cold'")) == 1
@@ -25,6 +25,12 @@ def test_create_order_details(db_session):
 
     order_object = model.OrderDetail(**order_data)
 
+    # Mock the bill of materials, the stock read and the guarded update
+    bom, stock = Mock(), Mock()
+    bom.all.return_value = [(0, 1, 2, 5)]
+    stock.all.return_value = [(1, "Bread", 100)]
+    db_session.execute.side_effect = [bom, stock, Mock(rowcount=1)]
+
     # Mock the behavior of adding and committing to the database
     db_session.add = Mock()
     db_session.commit = Mock()
@@ -42,7 +48,7 @@ def test_create_order_details(db_session):
 
 def test_read_all_orders(db_session):
     # Mock a response list from the database
-    db_session.query.return_value.all.return_value = [
+    db_session.query.return_value.options.return_value.all.return_value = [
         model.OrderDetail(id=1, amount=10, order_id=1, sandwich_id=0),
         model.OrderDetail(id=2, amount=5, order_id=2, sandwich_id=1)
     ]
@@ -58,7 +64,7 @@ def test_read_all_orders(db_session):
 
 def test_read_one_order(db_session):
     # Mock a single order detail
-    db_session.query.return_value.filter.return_value.first.return_value = model.OrderDetail(
+    db_session.query.return_value.options.return_value.filter.return_value.first.return_value = model.OrderDetail(
         id=1, amount=10, order_id=1, sandwich_id=0)
 
     # Call the read_one function
@@ -83,6 +89,8 @@ def test_update_order(db_session):
 
     # Mock the update behavior
     db_session.commit = Mock()
+    db_session.get_bind.return_value.dialect.update_returning = False
+    db_session.execute.return_value.rowcount = 1
 
     # Call the update function
     updated_order = controller.update(db_session, 1, request_data)
@@ -5,6 +5,11 @@ from sqlalchemy.exc import SQLAlchemyError
 from ..main import app
 from ..controllers import orders as controller
 from ..models import orders as model
+from ..models.recipes import Recipe
+from ..models.resources import Resource
+from ..models.sandwiches import Sandwich
+from ..schemas import orders as schema
+from fastapi import HTTPException
 from datetime import datetime
 
 client = TestClient(app)
@@ -46,7 +51,7 @@ def test_create_order(db_session):
 
 def test_read_all_orders(db_session):
     # Mock a response list from the database
-    db_session.query.return_value.all.return_value = [
+    db_session.query.return_value.options.return_value.all.return_value = [
         model.Order(id=1, customer_name="John Doe", description="Test order", status="pending"),
         model.Order(id=2, customer_name="Jane Doe", description="Another test order", status="ready")
     ]
@@ -64,7 +69,7 @@ def test_read_all_orders(db_session):
 
 def test_read_one_order(db_session):
     # Mock a single order
-    db_session.query.return_value.filter.return_value.first.return_value = model.Order(
+    db_session.query.return_value.options.return_value.filter.return_value.first.return_value = model.Order(
         id=1, customer_name="John Doe", description="Test order", status="preparing"
     )
 
@@ -91,6 +96,8 @@ def test_update_order(db_session):
 
     # Mock the update behavior
     db_session.commit = Mock()
+    db_session.get_bind.return_value.dialect.update_returning = False
+    db_session.execute.return_value.rowcount = 1
 
     # Call the update function
     updated_order = controller.update(db_session, 1, request_data)
@@ -106,7 +113,7 @@ def test_update_order(db_session):
 
 def test_delete_order(db_session):
     # Mock an existing order to delete
-    db_session.query.return_value.filter.return_value.first.return_value = model.Order(
+    db_session.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = model.Order(
         id=1, customer_name="John Doe", description="Test order", status="pending"
     )
 
@@ -122,7 +129,7 @@ def test_read_all_sorted_by_date(db_session):
         model.Order(id=2, customer_name="Jane Doe", description="Another test order", status="ready", order_date=datetime(2024, 11, 16, 15, 45)),
     ]
 
-    db_session.query.return_value.order_by.return_value.all.return_value = orders_data
+    db_session.query.return_value.options.return_value.order_by.return_value.all.return_value = orders_data
 
     results = controller.read_all_sorted_by_date(db_session)
     assert len(results) == 2
@@ -130,8 +137,49 @@ def test_read_all_sorted_by_date(db_session):
     assert results[0].status == "pending"
     assert results[1].status == "ready"
 
-    db_session.query.return_value.filter.return_value.order_by.return_value.all.return_value = [orders_data[1]]
+    db_session.query.return_value.options.return_value.filter.return_value.order_by.return_value.all.return_value = [orders_data[1]]
     results_filtered = controller.read_all_sorted_by_date(db_session, datetime(2024, 11, 16))
     assert len(results_filtered) == 1
     assert results_filtered[0].customer_name == "Jane Doe"
-    assert results_filtered[0].status == "ready"
\ No newline at end of file
+    assert results_filtered[0].status == "ready"
+
+
+def seed_menu(session, bread):
+    session.add_all([
+        Sandwich(id=1, sandwich_name="Grilled Cheese", price=5),
+        Sandwich(id=2, sandwich_name="Toast", price=2),
+        Resource(id=1, item="Bread", amount=bread),
+        Recipe(sandwich_id=1, resource_id=1, amount=2),
+        Recipe(sandwich_id=2, resource_id=1, amount=2),
+    ])
+    session.commit()
+
+
+def checkout_request():
+    return schema.OrderCheckout(
+        customer_id=1,
+        customer_name="John Doe",
+        order_details=[{"sandwich_id": 1, "amount": 1}, {"sandwich_id": 2, "amount": 1}]
+    )
+
+
+def test_checkout_creates_order_and_details(sqlite_session):
+    seed_menu(sqlite_session, bread=4)
+
+    order = controller.checkout(sqlite_session, checkout_request())
+
+    assert order.id is not None
+    assert sorted(detail.sandwich_id for detail in order.order_details) == [1, 2]
+    assert all(detail.order_id == order.id for detail in order.order_details)
+    assert sqlite_session.get(Resource, 1).amount == 0
+
+
+def test_checkout_checks_combined_requirements(sqlite_session):
+    # Each line alone fits in stock, together they do not
+    seed_menu(sqlite_session, bread=3)
+
+    with pytest.raises(HTTPException) as exc:
+        controller.checkout(sqlite_session, checkout_request())
+
+    assert exc.value.detail["details"] == [{"item": "Bread", "available": 3, "required": 4}]
+    assert sqlite_session.query(model.Order).count() == 0
@@ -0,0 +1,65 @@
+from datetime import datetime
+import pytest
+from fastapi import HTTPException, Response
+from ..dependencies.pagination import Page, NEXT_CURSOR_HEADER
+from ..controllers import orders as controller
+from ..models import orders as model
+
+
+def make_page(limit=None, after=None):
+    return Page(Response(), limit=limit, after=after)
+
+
+def seed_orders(session, count):
+    session.add_all([
+        model.Order(id=i, customer_name=f"Customer {i}", order_date=datetime(2024, 11, 1 + i % 3, 12))
+        for i in range(1, count + 1)
+    ])
+    session.commit()
+
+
+def test_read_all_without_page_params_returns_everything(sqlite_session):
+    seed_orders(sqlite_session, 5)
+
+    page = make_page()
+    results = controller.read_all(sqlite_session, page)
+
+    assert len(results) == 5
+    assert NEXT_CURSOR_HEADER not in page.response.headers
+
+
+def test_read_all_walks_every_page_once(sqlite_session):
+    seed_orders(sqlite_session, 7)
+
+    seen, cursor = [], None
+    while True:
+        page = make_page(limit=3, after=cursor)
+        seen += [order.id for order in controller.read_all(sqlite_session, page)]
+        cursor = page.response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+
+    assert seen == [1, 2, 3, 4, 5, 6, 7]
+
+
+def test_composite_descending_keyset(sqlite_session):
+    seed_orders(sqlite_session, 7)
+    columns = (model.Order.order_date, model.Order.id)
+
+    seen, cursor = [], None
+    while True:
+        page = make_page(limit=2, after=cursor)
+        seen += page.paginate(sqlite_session.query(model.Order), *columns, descending=True)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    expected = sorted(sqlite_session.query(model.Order).all(), key=lambda o: (o.order_date, o.id), reverse=True)
+    assert [order.id for order in seen] == [order.id for order in expected]
+
+
+def test_invalid_cursor_is_rejected(sqlite_session):
+    with pytest.raises(HTTPException) as exc:
+        controller.read_all(sqlite_session, make_page(limit=2, after="not-a-cursor"))
+
+    assert exc.value.status_code == 400
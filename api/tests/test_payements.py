@@ -5,6 +5,8 @@ from sqlalchemy.exc import SQLAlchemyError
 from ..main import app
 from ..controllers import payments as controller
 from ..models import payments as model
+from ..schemas import payments as schema
+from datetime import datetime
 
 client = TestClient(app)
 
@@ -21,12 +23,13 @@ def test_create_payment(db_session):
     payment_data = {
         "order_id": 1,
         "card_information": "1234-5678-9012-3456",
+        "total": "12.50",
         "transaction_status": "Pending",
         "payment_type": "Credit Card"
     }
 
-    # Create a mock Payment object to simulate the database behavior
-    created_payment = model.Payment(**payment_data)
+    # Build the request the router would receive
+    created_payment = schema.PaymentCreate(**payment_data)
 
     # Mock database methods
     db_session.add = Mock()
@@ -46,15 +49,16 @@ def test_create_payment(db_session):
     # Assertions
     assert result.order_id == payment_data["order_id"]
     assert result.card_information == payment_data["card_information"]
-    assert result.transaction_status == payment_data["transaction_status"]
+    assert result.transaction_status == "pending"  # Set by the server; the payment workers move it on
     assert result.payment_type == payment_data["payment_type"]
+    assert str(result.amount) == payment_data["total"]
     assert result.id == 1  # Ensure the ID is correctly set
 
 
 def test_read_all_payments(db_session):
     """Test for reading all payments."""
     # Mock a response list from the database
-    db_session.query.return_value.all.return_value = [
+    db_session.query.return_value.options.return_value.all.return_value = [
         model.Payment(id=1, order_id=1, card_information="1234-5678-9012-3456", transaction_status="Completed", payment_type="Credit Card"),
         model.Payment(id=2, order_id=2, card_information="9876-5432-1098-7654", transaction_status="Pending", payment_type="Debit Card")
     ]
@@ -73,7 +77,7 @@ def test_read_all_payments(db_session):
 def test_read_one_payment(db_session):
     """Test for reading a single payment."""
     # Mock a single payment
-    db_session.query.return_value.filter.return_value.first.return_value = model.Payment(
+    db_session.query.return_value.options.return_value.filter.return_value.first.return_value = model.Payment(
         id=1, order_id=1, card_information="1234-5678-9012-3456", transaction_status="Completed", payment_type="Credit Card"
     )
 
@@ -101,6 +105,8 @@ def test_update_payment(db_session):
 
     # Mock database commit
     db_session.commit = Mock()
+    db_session.get_bind.return_value.dialect.update_returning = False
+    db_session.execute.return_value.rowcount = 1
 
     # Call the update function
     updated_payment = controller.update(db_session, 1, request_data)
@@ -115,8 +121,9 @@ def test_update_payment(db_session):
 def test_delete_payment(db_session):
     """Test for deleting a payment."""
     # Mock an existing payment to delete
-    db_session.query.return_value.filter.return_value.first.return_value = model.Payment(
-        id=1, order_id=1, card_information="1234-5678-9012-3456", transaction_status="Pending", payment_type="Credit Card"
+    db_session.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = model.Payment(
+        id=1, order_id=1, card_information="1234-5678-9012-3456", transaction_status="Pending", payment_type="Credit Card",
+        amount=12, created_at=datetime(2024, 11, 1)
     )
 
     # Call the delete function
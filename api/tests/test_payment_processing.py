@@ -0,0 +1,193 @@
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from ..controllers.gateways import GatewayError, PaymentDeclined, PaymentGateway, SimulatedGateway, Charge
+from ..controllers.payment_processing import PaymentProcessor
+from ..dependencies.database import Base
+from ..models.payments import Payment
+
+
+class ScriptedGateway(PaymentGateway):
+    """Raises the scripted errors in turn, then succeeds."""
+
+    def __init__(self, *errors, delay=0.0):
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def charge(self, charge):
+        with self._lock:
+            self.calls.append(charge.payment_id)
+            error = self.errors.pop(0) if self.errors else None
+        time.sleep(self.delay)
+        if error:
+            raise error
+        return f"ref-{charge.payment_id}"
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'payments.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def add_payments(sessions, count):
+    with sessions() as db:
+        payments = [Payment(amount=5, payment_type="Card", transaction_status="pending") for _ in range(count)]
+        db.add_all(payments)
+        db.commit()
+        return [payment.id for payment in payments]
+
+
+def statuses(sessions):
+    with sessions() as db:
+        return {payment.id: payment.transaction_status for payment in db.query(Payment)}
+
+
+def run(processor, sessions, count=1):
+    """Accept ``count`` payments the way the API does, then wait for the workers."""
+    processor.start()
+    try:
+        ids = add_payments(sessions, count)
+        for payment_id in ids:
+            processor.enqueue(payment_id)
+        processor.join()
+    finally:
+        processor.stop()
+    return ids
+
+
+def test_workers_complete_payments_in_parallel(sessions):
+    gateway = ScriptedGateway(delay=0.1)
+    processor = PaymentProcessor(sessions, gateway, workers=8)
+
+    started = time.perf_counter()
+    ids = run(processor, sessions, 8)
+
+    assert time.perf_counter() - started < 0.5
+    assert sorted(gateway.calls) == sorted(set(gateway.calls)) == sorted(ids)
+    assert set(statuses(sessions).values()) == {"completed"}
+
+
+def test_transient_errors_are_retried_with_backoff(sessions):
+    gateway = ScriptedGateway(GatewayError("timeout"), GatewayError("timeout"))
+    processor = PaymentProcessor(sessions, gateway, workers=1, backoff_base=0.05)
+
+    started = time.perf_counter()
+    [payment_id] = run(processor, sessions)
+
+    assert time.perf_counter() - started >= 0.05 + 0.1
+    assert gateway.calls == [payment_id] * 3
+    assert statuses(sessions)[payment_id] == "completed"
+    assert processor.outcomes["retried"] == 2
+
+
+def test_payment_fails_after_max_attempts(sessions):
+    processor = PaymentProcessor(sessions, ScriptedGateway(*[GatewayError("down")] * 3), workers=1,
+                                 max_attempts=3, backoff_base=0.01)
+
+    [payment_id] = run(processor, sessions)
+
+    assert statuses(sessions)[payment_id] == "failed"
+
+
+def test_declines_are_final(sessions):
+    gateway = ScriptedGateway(PaymentDeclined("no funds"))
+
+    [payment_id] = run(PaymentProcessor(sessions, gateway, workers=1), sessions)
+
+    assert gateway.calls == [payment_id]
+    assert statuses(sessions)[payment_id] == "declined"
+
+
+def test_unexpected_gateway_errors_release_the_claim(sessions):
+    gateway = ScriptedGateway(RuntimeError("socket closed"))
+    processor = PaymentProcessor(sessions, gateway, workers=1, backoff_base=0.01)
+
+    [payment_id] = run(processor, sessions)
+
+    assert gateway.calls == [payment_id] * 2
+    assert statuses(sessions)[payment_id] == "completed"
+    assert processor.outcomes["retried"] == 1
+
+
+def test_failed_outcome_write_is_retried(sessions, monkeypatch):
+    gateway = ScriptedGateway()
+    processor = PaymentProcessor(sessions, gateway, workers=1, backoff_base=0.01)
+    set_status = processor._set_status
+    failures = ["completed"]
+
+    def flaky(db, payment_id, status, expected, **values):
+        if status in failures:
+            failures.remove(status)
+            raise OperationalError("UPDATE payments", {}, Exception("connection lost"))
+        return set_status(db, payment_id, status, expected, **values)
+
+    monkeypatch.setattr(processor, "_set_status", flaky)
+    [payment_id] = run(processor, sessions)
+
+    assert gateway.calls == [payment_id] * 2
+    assert statuses(sessions)[payment_id] == "completed"
+
+
+def test_start_reclaims_processing_payments_past_their_lease(sessions):
+    with sessions() as db:
+        db.add_all([
+            Payment(id=1, amount=5, transaction_status="processing", claimed_at=datetime.now() - timedelta(hours=1)),
+            Payment(id=2, amount=5, transaction_status="processing", claimed_at=datetime.now()),
+        ])
+        db.commit()
+    gateway = ScriptedGateway()
+    processor = PaymentProcessor(sessions, gateway, workers=1, lease=60)
+
+    processor.start()
+    processor.join()
+    processor.stop()
+
+    assert gateway.calls == [1]
+    assert statuses(sessions) == {1: "completed", 2: "processing"}
+
+
+def test_start_resumes_pending_payments_and_claims_each_once(sessions):
+    ids = add_payments(sessions, 5)
+    gateway = ScriptedGateway()
+    first = PaymentProcessor(sessions, gateway, workers=2)
+    second = PaymentProcessor(sessions, gateway, workers=2)
+
+    first.start()
+    second.start()
+    first.join()
+    second.join()
+    first.stop()
+    second.stop()
+
+    assert sorted(gateway.calls) == ids
+    assert set(statuses(sessions).values()) == {"completed"}
+
+
+def test_simulated_gateway_is_idempotent_per_payment():
+    gateway = SimulatedGateway(latency=(0, 0), failure_rate=0, decline_rate=0)
+    charge = Charge(payment_id=7, amount=5, payment_type="Card", card_information="4111")
+
+    assert gateway.charge(charge) == gateway.charge(charge) == "sim-7"
+
+
+def test_api_accepts_payments_as_pending(sqlite_client, sqlite_session):
+    from ..models.customers import Customer
+    from ..models.orders import Order
+    sqlite_session.add(Order(id=1, customer=Customer(name="A", email="a@example.com"), customer_name="A"))
+    sqlite_session.commit()
+
+    response = sqlite_client.post("/payments/", json={
+        "order_id": 1, "card_information": "4111", "total": 5,
+        "transaction_status": "Completed", "payment_type": "Card",
+    })
+
+    assert response.json()["transaction_status"] == "pending"
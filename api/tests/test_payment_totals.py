@@ -0,0 +1,75 @@
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import create_engine, select, text
+from ..controllers import payment_totals
+from ..migrations import runner
+from ..models.customers import Customer
+from ..models.orders import Order
+from ..models.payment_totals import PaymentTotal
+
+
+def ledger(session):
+    session.expire_all()
+    return {(row.day, row.payment_type): (row.total, row.payment_count)
+            for row in session.scalars(select(PaymentTotal))}
+
+
+def pay(client, order_id, total, payment_type="Card"):
+    response = client.post("/payments/", json={
+        "order_id": order_id, "card_information": "4111", "total": total,
+        "transaction_status": "Completed", "payment_type": payment_type,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_ledger_follows_create_update_and_delete(sqlite_client, sqlite_session):
+    sqlite_session.add(Order(id=1, customer=Customer(name="A", email="a@example.com"), customer_name="A"))
+    sqlite_session.commit()
+
+    first = pay(sqlite_client, 1, 0.1)
+    pay(sqlite_client, 1, 0.2)
+    pay(sqlite_client, 1, 5, "Cash")
+    today = date.fromisoformat(first["created_at"][:10])
+
+    assert first["total"] == 0.1
+    assert ledger(sqlite_session) == {(today, "Card"): (Decimal("0.30"), 2), (today, "Cash"): (Decimal("5.00"), 1)}
+
+    assert sqlite_client.put(f"/payments/{first['id']}", json={"payment_type": "Cash", "total": 1}).status_code == 200
+    assert ledger(sqlite_session) == {(today, "Card"): (Decimal("0.20"), 1), (today, "Cash"): (Decimal("6.00"), 2)}
+
+    assert sqlite_client.delete(f"/payments/{first['id']}").status_code == 204
+    assert ledger(sqlite_session)[(today, "Cash")] == (Decimal("5.00"), 1)
+
+    total = sqlite_client.get("/payments/total").json()
+    assert total == {"total": 5.2, "count": 2, "by_payment_type": {"Card": 0.2, "Cash": 5.0}}
+
+
+def test_total_sums_only_days_in_range(sqlite_session):
+    for day, amount in ((1, "10.00"), (2, "20.00"), (3, "40.00")):
+        payment_totals.record(sqlite_session, datetime(2024, 11, day, 12), "Card", Decimal(amount))
+    sqlite_session.commit()
+
+    result = payment_totals.totals(sqlite_session, date(2024, 11, 2), date(2024, 11, 3))
+
+    assert result["total"] == Decimal("20.00")
+    assert result["count"] == 1
+
+
+def test_migration_dates_existing_payments_by_order_and_rebuilds_ledger(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE orders (id INTEGER PRIMARY KEY, customer_id INTEGER, order_date DATETIME, status VARCHAR(50), total_price DECIMAL(10, 2))"))
+        connection.execute(text(
+            "CREATE TABLE payments (id INTEGER PRIMARY KEY, order_id INTEGER, card_information VARCHAR(100),"
+            " amount FLOAT, transaction_status VARCHAR(50), payment_type VARCHAR(50))"
+        ))
+        connection.execute(text("INSERT INTO orders (id, order_date) VALUES (1, '2024-11-05 10:00:00')"))
+        connection.execute(text("INSERT INTO payments (order_id, amount, payment_type) VALUES (1, 2.5, 'Card'), (1, 1.5, 'Card')"))
+
+    runner.migrate(engine, log=lambda message: None)
+
+    with engine.connect() as connection:
+        rows = connection.execute(select(PaymentTotal.day, PaymentTotal.payment_type,
+                                         PaymentTotal.total, PaymentTotal.payment_count)).all()
+    assert rows == [(date(2024, 11, 5), "Card", Decimal("4.00"), 2)]
@@ -0,0 +1,256 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from ..controllers import promotions as controller
+from ..dependencies.bloom import BloomFilter
+from ..dependencies.database import Base
+from ..models.promotions import Promotion
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    codes = [f"CODE{i}" for i in range(2000)]
+    bloom = BloomFilter.from_iterable(codes, error_rate=0.01)
+
+    assert all(code in bloom for code in codes)
+    false_positives = sum(f"RANDOM{i}" in bloom for i in range(10000))
+    assert false_positives < 10000 * 0.01
+
+
+def future(days=30):
+    return datetime.now() + timedelta(days=days)
+
+
+def test_validate_reports_live_expired_and_unknown_codes(sqlite_client, sqlite_session):
+    sqlite_session.add_all([
+        Promotion(promotion_code="LIVE10", expiration_date=future()),
+        Promotion(promotion_code="OLD10", expiration_date=datetime(2020, 1, 1)),
+    ])
+    sqlite_session.commit()
+
+    live = sqlite_client.get("/promotions/validate/LIVE10").json()
+    expired = sqlite_client.get("/promotions/validate/OLD10").json()
+    unknown = sqlite_client.get("/promotions/validate/NOPE").json()
+
+    assert live["valid"] is True and live["promotion_id"] == 1
+    assert expired["valid"] is False and expired["promotion_id"] == 2
+    assert unknown == {"promotion_code": "NOPE", "valid": False, "promotion_id": None, "expiration_date": None}
+
+
+def test_unknown_codes_are_rejected_without_a_query(sqlite_session):
+    sqlite_session.add(Promotion(promotion_code="LIVE10", expiration_date=future()))
+    sqlite_session.commit()
+    cache = controller.PromotionCodeCache()
+    now = datetime.now()
+
+    statements = []
+    cache.lookup(sqlite_session, "LIVE10", now)
+    event.listen(sqlite_session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    for i in range(200):
+        cache.lookup(sqlite_session, f"GUESS{i}", now)
+    cache.lookup(sqlite_session, "LIVE10", now)
+
+    stats = cache.stats()
+    assert len(statements) == stats["false_positives"] < 10
+    assert stats["rejected"] + stats["false_positives"] == 200
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_codes_deleted_elsewhere_stop_validating_after_the_ttl(sqlite_session):
+    sqlite_session.add(Promotion(promotion_code="GONE10", expiration_date=future(days=365)))
+    sqlite_session.commit()
+    cache = controller.PromotionCodeCache(ttl=60)
+    now = datetime.now()
+    assert cache.lookup(sqlite_session, "GONE10", now) is not None
+
+    # Deleted by another worker: this cache's invalidate() never runs.
+    sqlite_session.query(Promotion).delete()
+    sqlite_session.commit()
+
+    assert cache.lookup(sqlite_session, "GONE10", now + timedelta(seconds=30)) is not None
+    assert cache.lookup(sqlite_session, "GONE10", now + timedelta(seconds=61)) is None
+
+
+def test_codes_created_elsewhere_reach_the_filter(sqlite_session):
+    cache = controller.PromotionCodeCache(refresh=0)
+    assert cache.lookup(sqlite_session, "OTHER10", datetime.now()) is None
+
+    # Written by another worker: this cache's add() never sees it.
+    sqlite_session.add(Promotion(promotion_code="OTHER10", expiration_date=future()))
+    sqlite_session.commit()
+
+    assert cache.lookup(sqlite_session, "OTHER10", datetime.now())[1] == "OTHER10"
+
+
+def test_filter_is_built_from_the_primary(sqlite_session, tmp_path):
+    replica = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'replica.db'}"))()
+    Base.metadata.create_all(replica.get_bind())
+    sqlite_session.add(Promotion(promotion_code="FRESH10", expiration_date=future()))
+    sqlite_session.commit()
+    cache = controller.PromotionCodeCache()
+
+    entry = cache.lookup(replica, "FRESH10", datetime.now(), primary=sqlite_session)
+
+    assert entry is not None and entry[1] == "FRESH10"
+    replica.close()
+
+
+def test_generated_campaigns_do_not_saturate_the_filter(sqlite_session):
+    sqlite_session.add(Promotion(promotion_code="LIVE10", expiration_date=future()))
+    sqlite_session.commit()
+    cache = controller.PromotionCodeCache()
+    cache.lookup(sqlite_session, "LIVE10", datetime.now())
+
+    cache.add(*(f"GEN{i}" for i in range(5000)))
+    cache.lookup(sqlite_session, "LIVE10", datetime.now())
+
+    for i in range(1000):
+        cache.lookup(sqlite_session, f"GUESS{i}", datetime.now())
+    assert cache.stats()["false_positives"] < 1000 * 0.05
+
+
+def test_cached_codes_are_evicted_at_expiration(sqlite_session):
+    expires = datetime(2030, 1, 1)
+    sqlite_session.add(Promotion(promotion_code="SOON", expiration_date=expires))
+    sqlite_session.commit()
+    cache = controller.PromotionCodeCache()
+
+    cache.lookup(sqlite_session, "SOON", expires - timedelta(minutes=1))
+    assert cache.stats()["size"] == 1
+
+    assert cache.lookup(sqlite_session, "SOON", expires)[2] == expires
+    assert cache.stats()["size"] == 0
+    assert cache.stats()["misses"] == 2
+
+
+def test_writes_keep_the_filter_current(sqlite_client):
+    assert sqlite_client.get("/promotions/validate/NEW10").json()["valid"] is False
+
+    created = sqlite_client.post("/promotions/", json={
+        "promotion_code": "NEW10", "expiration_date": future().isoformat()
+    }).json()
+    assert sqlite_client.get("/promotions/validate/NEW10").json()["valid"] is True
+
+    sqlite_client.put(f"/promotions/{created['id']}", json={"promotion_code": "RENAMED10"})
+    assert sqlite_client.get("/promotions/validate/NEW10").json()["valid"] is False
+    assert sqlite_client.get("/promotions/validate/RENAMED10").json()["valid"] is True
+
+    sqlite_client.delete(f"/promotions/{created['id']}")
+    assert sqlite_client.get("/promotions/validate/RENAMED10").json()["valid"] is False
+
+
+def test_counters_are_exported(sqlite_client):
+    def rejections():
+        text = sqlite_client.get("/metrics").text
+        return int(next(line for line in text.splitlines() if line.startswith("promotion_bloom_rejections_total ")).split()[1])
+
+    before = rejections()
+    sqlite_client.get("/promotions/validate/NOPE")
+
+    assert rejections() == before + 1
+
+
+def test_generate_inserts_unique_codes_in_batches(sqlite_session):
+    batches = []
+
+    result = controller.generate_codes(sqlite_session, "SPRING-", 1200, future(), length=8,
+                                       batch_size=500, on_batch=batches.append)
+
+    assert result["created"] == 1200 and len(set(result["codes"])) == 1200
+    assert [len(batch) for batch in batches] == [500, 500, 200]
+    assert all(code.startswith("SPRING-") and len(code) == 15 for code in result["codes"])
+    assert sqlite_session.query(Promotion).count() == 1200
+
+
+def test_generate_retries_codes_that_are_taken(sqlite_session, monkeypatch):
+    sqlite_session.add(Promotion(promotion_code="X-TAKEN", expiration_date=future()))
+    sqlite_session.commit()
+    random_codes = controller._random_codes
+    calls = []
+
+    def with_collision(prefix, length, count, exclude=()):
+        calls.append(count)
+        codes = random_codes(prefix, length, count, exclude)
+        return ["X-TAKEN", *codes[1:]] if len(calls) == 1 else codes
+
+    monkeypatch.setattr(controller, "_random_codes", with_collision)
+
+    result = controller.generate_codes(sqlite_session, "X-", 10, future())
+
+    assert result["created"] == 10 and result["collisions"] == 1
+    assert "X-TAKEN" not in result["codes"]
+    assert calls == [10, 1]
+    assert sqlite_session.query(Promotion).count() == 11
+
+
+def test_generate_rejects_a_code_space_that_is_too_small(sqlite_session):
+    with pytest.raises(HTTPException) as error:
+        controller.generate_codes(sqlite_session, "A", 1000, future(), length=3)
+
+    assert error.value.status_code == 400
+    assert sqlite_session.query(Promotion).count() == 0
+
+
+def test_generate_endpoint_returns_the_codes(sqlite_client):
+    response = sqlite_client.post("/promotions/generate", json={
+        "prefix": "FALL", "count": 3, "expiration_date": future().isoformat()
+    })
+
+    assert response.status_code == 200
+    assert response.json()["created"] == 3
+    assert all(sqlite_client.get(f"/promotions/validate/{code}").json()["valid"] for code in response.json()["codes"])
+
+
+def test_purge_deletes_expired_promotions_and_links_in_chunks(sqlite_client, sqlite_session):
+    from ..models.customers import Customer
+    from ..models.orders import Order
+    expired = [Promotion(promotion_code=f"OLD{i}", expiration_date=datetime(2020, 1, i + 1)) for i in range(5)]
+    live = Promotion(promotion_code="LIVE", expiration_date=future())
+    order = Order(customer=Customer(name="A", email="a@example.com"), customer_name="A",
+                  promotions=[expired[0], expired[4], live])
+    sqlite_session.add_all([*expired, live, order])
+    sqlite_session.commit()
+
+    purged = controller.purge_expired(sqlite_session, before=datetime(2021, 1, 1), batch_size=2)
+
+    assert purged == {"promotions": 5, "order_links": 2, "batches": 3}
+    assert [promotion.promotion_code for promotion in sqlite_session.query(Promotion)] == ["LIVE"]
+    sqlite_session.expire_all()
+    assert [promotion.promotion_code for promotion in sqlite_session.get(Order, order.id).promotions] == ["LIVE"]
+    assert sqlite_client.get("/promotions/validate/OLD0").json()["promotion_id"] is None
+
+
+def test_purge_never_deletes_live_promotions(sqlite_client, sqlite_session):
+    sqlite_session.add_all([
+        Promotion(promotion_code="OLD", expiration_date=datetime(2020, 1, 1)),
+        Promotion(promotion_code="LIVE", expiration_date=future()),
+    ])
+    sqlite_session.commit()
+
+    purged = sqlite_client.post("/promotions/purge-expired", params={"before": "2099-01-01T00:00:00"}).json()
+
+    assert purged["promotions"] == 1
+    assert [promotion.promotion_code for promotion in sqlite_session.query(Promotion)] == ["LIVE"]
+
+
+def test_generate_endpoint_caps_the_count(sqlite_client):
+    response = sqlite_client.post("/promotions/generate", json={
+        "count": 1_000_000, "expiration_date": future().isoformat()
+    })
+
+    assert response.status_code == 422
+
+
+def test_purge_skips_the_round_while_another_process_holds_the_lock(monkeypatch):
+    lock = MagicMock()
+    lock.dialect.name = "mysql"
+    lock.scalar.return_value = 0
+    db = MagicMock()
+    db.get_bind.return_value.connect.return_value.__enter__.return_value = lock
+    monkeypatch.setattr(controller, "purge_expired", MagicMock())
+
+    assert controller.purge_expired_once(db) is None
+    controller.purge_expired.assert_not_called()
+    lock.execute.assert_not_called()
@@ -51,7 +51,7 @@ def test_create_promotion(db_session):
 def test_read_all_promotions(db_session):
     """Test for reading all promotions."""
     # Mock a list of promotions
-    db_session.query.return_value.all.return_value = [
+    db_session.query.return_value.options.return_value.all.return_value = [
         model.Promotion(id=1, promotion_code="DISCOUNT10", expiration_date=datetime(2024, 12, 31)),
         model.Promotion(id=2, promotion_code="SUMMER20", expiration_date=datetime(2024, 6, 30))
     ]
@@ -70,7 +70,7 @@ def test_read_all_promotions(db_session):
 def test_read_one_promotion(db_session):
     """Test for reading a single promotion."""
     # Mock a single promotion
-    db_session.query.return_value.filter.return_value.first.return_value = model.Promotion(
+    db_session.query.return_value.options.return_value.filter.return_value.first.return_value = model.Promotion(
         id=1, promotion_code="DISCOUNT10", expiration_date=datetime(2024, 12, 31)
     )
 
@@ -0,0 +1,136 @@
+from datetime import datetime, timezone
+import pytest
+from fastapi import Response
+from sqlalchemy import event
+from ..controllers import (customers, inventory, order_details, orders, payment_processing, payments, promotions,
+                           recipes, resources, reviews, sandwiches)
+from ..dependencies.pagination import Page, _encode
+from ..models.customers import Customer
+from ..models.order_details import OrderDetail
+from ..models.orders import Order
+from ..models.payments import Payment
+from ..models.promotions import Promotion
+from ..models.recipes import Recipe
+from ..models.resources import Resource
+from ..models.reviews import Review
+from ..models.sandwiches import Sandwich
+
+
+def query_plans(session, fn):
+    """Run ``fn`` and return the SQLite query plan of every SELECT it issued."""
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    connection = session.connection().connection.driver_connection
+    return [
+        " / ".join(row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters))
+        for statement, parameters in captured
+    ]
+
+
+def seed_orders(session):
+    session.add_all([
+        Order(customer_name=f"Customer {i}", order_date=datetime(2024, 11, 1 + i % 28, i % 24), status="pending")
+        for i in range(200)
+    ])
+    session.commit()
+
+
+def test_orders_by_date_range_uses_order_date_index(sqlite_session):
+    seed_orders(sqlite_session)
+    start = datetime(2024, 11, 5, tzinfo=timezone.utc)
+    end = datetime(2024, 11, 6, tzinfo=timezone.utc)
+
+    plans = query_plans(sqlite_session, lambda: orders.read_all_sorted_by_date(sqlite_session, start=start, end=end))
+
+    assert "USING INDEX ix_orders_order_date_id" in plans[0]
+    assert "TEMP B-TREE" not in plans[0]
+
+
+def test_orders_by_date_pages_walk_the_index(sqlite_session):
+    seed_orders(sqlite_session)
+    page = Page(Response(), limit=10, after=None)
+    orders.read_all_sorted_by_date(sqlite_session, page=page)
+    page = Page(Response(), limit=10, after=page.next_cursor)
+
+    plans = query_plans(sqlite_session, lambda: orders.read_all_sorted_by_date(sqlite_session, page=page))
+
+    assert "USING INDEX ix_orders_order_date_id" in plans[0]
+    assert "TEMP B-TREE" not in plans[0]
+
+
+def test_date_shorthand_is_a_half_open_day(sqlite_session):
+    seed_orders(sqlite_session)
+
+    results = orders.read_all_sorted_by_date(sqlite_session, datetime(2024, 11, 5))
+
+    assert results
+    assert all(datetime(2024, 11, 5) <= order.order_date < datetime(2024, 11, 6) for order in results)
+    assert [o.order_date for o in results] == sorted((o.order_date for o in results), reverse=True)
+
+
+def seed_everything(session):
+    customers = [Customer(name=f"Customer {i}", email=f"customer{i}@example.com") for i in range(50)]
+    sandwiches = [Sandwich(sandwich_name=f"Sandwich {i}", price=5) for i in range(50)]
+    resources = [Resource(item=f"Item {i}", amount=100) for i in range(50)]
+    session.add_all(customers + sandwiches + resources)
+    session.add_all(Recipe(sandwich=sandwiches[i % 50], resource=resources[(i * 7) % 50], amount=1) for i in range(150))
+    for i in range(200):
+        order = Order(customer=customers[i % 50], customer_name=f"Customer {i % 50}",
+                      order_date=datetime(2024, 11, 1 + i % 28, i % 24), status="pending",
+                      order_details=[OrderDetail(sandwich=sandwiches[(i + j) % 50], amount=1) for j in range(3)])
+        session.add_all([
+            order,
+            Payment(order=order, card_information="1234", payment_type="Card"),
+            Review(customer=customers[i % 50], sandwich=sandwiches[i % 50], review_text="Good", score=4),
+        ])
+        if i % 10 == 0:
+            session.add(Promotion(promotion_code=f"CODE{i}", expiration_date=datetime(2030, 1, 1), orders=[order]))
+    session.commit()
+    session.expunge_all()
+
+
+def next_page(read_all, after):
+    return lambda db: read_all(db, Page(Response(), limit=10, after=_encode(after)))
+
+
+# Queries on the request path: each must be answered from an index, never a table scan.
+HOT_QUERIES = {
+    "orders.read_one": lambda db: orders.read_one(db, 150),
+    "orders.read_all page": next_page(orders.read_all, [100]),
+    "order_details.read_one": lambda db: order_details.read_one(db, 300),
+    "payments.read_one": lambda db: payments.read_one(db, 150),
+    "payment_processing resume": lambda db: payment_processing.processor.resume(db),
+    "promotions.read_one": lambda db: promotions.read_one(db, 5),
+    "promotions.purge_expired": lambda db: promotions.purge_expired(db, before=datetime(2000, 1, 1)),
+    "reviews.read_one": lambda db: reviews.read_one(db, 150),
+    "recipes.read_one": lambda db: recipes.read_one(db, 100),
+    "customers.read_one": lambda db: customers.read_one(db, 20),
+    "customers.read_orders": lambda db: customers.read_orders(db, 20, Page(Response(), limit=10, after=None)),
+    "sandwiches.read_one": lambda db: sandwiches.read_one(db, 20),
+    "sandwiches.read_rating": lambda db: sandwiches.read_rating(db, 20),
+    "resources.read_one": lambda db: resources.read_one(db, 20),
+    "inventory bill of materials": lambda db: inventory.bom_cache.get_many(db, [3, 4]),
+    "inventory stock": lambda db: inventory.reserve(db, [(3, 1)]),
+}
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_queries_do_not_scan(sqlite_session, name):
+    seed_everything(sqlite_session)
+
+    plans = query_plans(sqlite_session, lambda: HOT_QUERIES[name](sqlite_session))
+
+    assert plans
+    for plan in plans:
+        assert "SCAN" not in plan.replace("SCAN CONSTANT ROW", ""), plan
@@ -47,7 +47,7 @@ def test_create_recipe(db_session):
 
 def test_read_all_recipes(db_session):
     # Mock a response list from the database
-    db_session.query.return_value.all.return_value = [
+    db_session.query.return_value.options.return_value.all.return_value = [
         model.Recipe(id=1, sandwich_id=1, resource_id=2, amount=3, time_to_make=10),
         model.Recipe(id=2, sandwich_id=2, resource_id=3, amount=4, time_to_make=15)
     ]
@@ -65,7 +65,7 @@ def test_read_all_recipes(db_session):
 
 def test_read_one_recipe(db_session):
     # Mock a single recipe
-    db_session.query.return_value.filter.return_value.first.return_value = model.Recipe(
+    db_session.query.return_value.options.return_value.filter.return_value.first.return_value = model.Recipe(
         id=1, sandwich_id=1, resource_id=2, amount=3, time_to_make=10)
 
     # Call the read_one function
@@ -90,6 +90,8 @@ def test_update_recipe(db_session):
 
     # Mock the update behavior
     db_session.commit = Mock()
+    db_session.get_bind.return_value.dialect.update_returning = False
+    db_session.execute.return_value.rowcount = 1
 
     # Call the update function
     updated_recipe = controller.update(db_session, 1, request_data)
@@ -0,0 +1,91 @@
+from fastapi import Response
+from ..controllers import reviews as controller
+from ..dependencies.pagination import Page
+from ..models.customers import Customer
+from ..models.reviews import Review
+from ..models.sandwiches import Sandwich
+from .test_query_plans import query_plans
+
+
+def seed(session):
+    session.add_all([
+        Customer(id=1, name="A", email="a@example.com"),
+        Sandwich(id=1, sandwich_name="BLT", price=5),
+        Sandwich(id=2, sandwich_name="Club", price=6),
+    ])
+    texts = [
+        (1, 1, "Bread was cold and the order was late"),
+        (1, 2, "Cold, cold, cold. Everything was cold"),
+        (2, 1, "Missing the pickles"),
+        (2, 5, "Great sandwich, arrived hot"),
+        (1, 2, "Delivery was late"),
+    ]
+    session.add_all([Review(customer_id=1, sandwich_id=sandwich_id, score=score, review_text=review_text)
+                     for sandwich_id, score, review_text in texts])
+    session.commit()
+
+
+def ids(response):
+    return [hit["review"]["id"] for hit in response.json()]
+
+
+def test_search_ranks_matches_and_ignores_other_reviews(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+
+    response = sqlite_client.get("/reviews/search", params={"q": "cold"})
+
+    assert response.status_code == 200
+    assert ids(response) == [2, 1]
+    hits = response.json()
+    assert hits[0]["relevance"] > hits[1]["relevance"]
+    assert hits[0]["review"]["sandwich"]["sandwich_name"] == "BLT"
+
+
+def test_search_matches_any_word_and_applies_filters(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+
+    assert sorted(ids(sqlite_client.get("/reviews/search", params={"q": "late missing"}))) == [1, 3, 5]
+    assert sorted(ids(sqlite_client.get("/reviews/search", params={"q": "late missing", "sandwich_id": 2}))) == [3]
+    assert sorted(ids(sqlite_client.get("/reviews/search", params={"q": "late cold", "score": 2}))) == [2, 5]
+
+
+def test_search_treats_query_syntax_as_text(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+
+    assert ids(sqlite_client.get("/reviews/search", params={"q": 'pickles" OR (NEAR'})) == [3]
+    assert sqlite_client.get("/reviews/search", params={"q": "!!!"}).json() == []
+
+
+def test_search_pages_by_relevance(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+    params = {"q": "cold late", "limit": 2}
+
+    first = sqlite_client.get("/reviews/search", params=params)
+    second = sqlite_client.get("/reviews/search", params={**params, "after": first.headers["X-Next-Cursor"]})
+
+    assert len(ids(first)) == 2 and "X-Next-Cursor" not in second.headers
+    assert sorted(ids(first) + ids(second)) == [1, 2, 5]
+
+
+def test_index_follows_review_writes(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+
+    created = sqlite_client.post("/reviews/", json={
+        "customer_id": 1, "sandwich_id": 2, "review_text": "Soggy bread", "score": 2}).json()
+    assert ids(sqlite_client.get("/reviews/search", params={"q": "soggy"})) == [created["id"]]
+
+    sqlite_client.put(f"/reviews/{created['id']}", json={"review_text": "Crisp bread"})
+    assert ids(sqlite_client.get("/reviews/search", params={"q": "soggy"})) == []
+    assert ids(sqlite_client.get("/reviews/search", params={"q": "crisp"})) == [created["id"]]
+
+    sqlite_client.delete(f"/reviews/{created['id']}")
+    assert ids(sqlite_client.get("/reviews/search", params={"q": "crisp"})) == []
+
+
+def test_search_uses_the_full_text_index(sqlite_session):
+    seed(sqlite_session)
+
+    plans = query_plans(sqlite_session, lambda: controller.search(sqlite_session, "cold", Page(Response(), 10, None)))
+
+    assert "VIRTUAL TABLE INDEX" in plans[0]
+    assert "SEARCH reviews USING INTEGER PRIMARY KEY" in plans[0]
@@ -54,7 +54,7 @@ def test_create_review(db_session):
 def test_read_all_reviews(db_session):
     """Test for reading all reviews."""
     # Mock a list of reviews
-    db_session.query.return_value.all.return_value = [
+    db_session.query.return_value.options.return_value.all.return_value = [
         model.Review(id=1, customer_id=1, sandwich_id=2, review_text="Delicious sandwich!", score=5),
         model.Review(id=2, customer_id=2, sandwich_id=3, review_text="Not bad", score=4)
     ]
@@ -73,7 +73,7 @@ def test_read_all_reviews(db_session):
 def test_read_one_review(db_session):
     """Test for reading a single review."""
     # Mock a single review
-    db_session.query.return_value.filter.return_value.first.return_value = model.Review(
+    db_session.query.return_value.options.return_value.filter.return_value.first.return_value = model.Review(
         id=1, customer_id=1, sandwich_id=2, review_text="Delicious sandwich!", score=5
     )
 
@@ -92,7 +92,7 @@ def test_update_review(db_session):
     existing_review = model.Review(
         id=1, customer_id=1, sandwich_id=2, review_text="Delicious sandwich!", score=5
     )
-    db_session.query.return_value.filter.return_value.first.return_value = existing_review
+    db_session.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = existing_review
 
     # Mock update data
     update_data = {"review_text": "Amazing taste!", "score": 4}
@@ -117,7 +117,7 @@ def test_update_review(db_session):
 def test_delete_review(db_session):
     """Test for deleting a review."""
     # Mock an existing review to delete
-    db_session.query.return_value.filter.return_value.first.return_value = model.Review(
+    db_session.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = model.Review(
         id=1, customer_id=1, sandwich_id=2, review_text="Delicious sandwich!", score=5
     )
 
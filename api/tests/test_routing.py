@@ -0,0 +1,95 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from ..dependencies.database import Base
+from ..dependencies.routing import ReplicaSet, RoutingSession
+from ..models.sandwiches import Sandwich
+
+
+def sqlite_file(path, name):
+    engine = create_engine(f"sqlite:///{path / name}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(Sandwich(sandwich_name=name, price=5))
+        db.commit()
+    return engine
+
+
+@pytest.fixture
+def primary(tmp_path):
+    return sqlite_file(tmp_path, "primary.db")
+
+
+@pytest.fixture
+def replicas(tmp_path):
+    return ReplicaSet([sqlite_file(tmp_path, "replica1.db"), sqlite_file(tmp_path, "replica2.db")])
+
+
+def routed(primary, replicas, fallback=True):
+    return sessionmaker(class_=RoutingSession, primary=primary, replicas=replicas, fallback=fallback)()
+
+
+def name_seen(db):
+    return db.scalars(select(Sandwich.sandwich_name).order_by(Sandwich.id)).first()
+
+
+def test_reads_go_to_replicas_round_robin(primary, replicas):
+    seen = []
+    for _ in range(4):
+        with routed(primary, replicas) as db:
+            seen.append(name_seen(db))
+            assert name_seen(db) == seen[-1]
+
+    assert seen == ["replica1.db", "replica2.db", "replica1.db", "replica2.db"]
+
+
+def test_writes_pin_the_session_to_the_primary(primary, replicas):
+    with routed(primary, replicas) as db:
+        assert name_seen(db) == "replica1.db"
+        db.add(Sandwich(sandwich_name="New", price=6))
+        db.commit()
+        assert db.scalars(select(Sandwich.sandwich_name).where(Sandwich.sandwich_name == "New")).first() == "New"
+        assert name_seen(db) == "primary.db"
+
+    with routed(primary, replicas) as db:
+        db.execute(update(Sandwich).values(price=7))
+        assert name_seen(db) == "primary.db"
+
+
+def test_unhealthy_replica_is_skipped(primary, replicas, tmp_path):
+    down = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    replica_set = ReplicaSet([down, replicas.engines[0]])
+
+    for _ in range(3):
+        with routed(primary, replica_set) as db:
+            assert name_seen(db) == "replica1.db"
+
+
+def test_fallback_to_primary_when_replicas_are_down(primary, tmp_path):
+    down = ReplicaSet([create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")])
+
+    with routed(primary, down) as db:
+        assert name_seen(db) == "primary.db"
+
+    with routed(primary, down, fallback=False) as db:
+        with pytest.raises(HTTPException) as exc_info:
+            name_seen(db)
+        assert exc_info.value.status_code == 503
+
+
+def test_async_session_reads_from_replica(primary, tmp_path):
+    sqlite_file(tmp_path, "async_replica.db")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async_replica.db'}", poolclass=NullPool)
+    async_primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}", poolclass=NullPool)
+    sessions = async_sessionmaker(sync_session_class=RoutingSession, primary=async_primary.sync_engine,
+                                  replicas=ReplicaSet([replica.sync_engine]))
+
+    async def read():
+        async with sessions() as db:
+            return (await db.scalars(select(Sandwich.sandwich_name))).first()
+
+    assert asyncio.run(read()) == "async_replica.db"
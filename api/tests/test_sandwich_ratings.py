@@ -0,0 +1,73 @@
+from ..controllers import sandwich_ratings
+from ..models.customers import Customer
+from ..models.sandwiches import Sandwich
+
+
+def seed(session):
+    session.add_all([
+        Customer(id=1, name="A", email="a@example.com"),
+        Sandwich(id=1, sandwich_name="BLT", price=5),
+        Sandwich(id=2, sandwich_name="Club", price=6),
+        Sandwich(id=3, sandwich_name="Reuben", price=7),
+    ])
+    session.commit()
+
+
+def review(client, sandwich_id, score):
+    return client.post("/reviews/", json={
+        "customer_id": 1, "sandwich_id": sandwich_id, "review_text": "ok", "score": score
+    }).json()
+
+
+def test_review_writes_keep_the_stats_current(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+    first = review(sqlite_client, 1, 5)
+    review(sqlite_client, 1, 3)
+    moved = review(sqlite_client, 1, 4)
+
+    assert sqlite_client.get("/sandwiches/1/rating").json() == {
+        "sandwich_id": 1, "review_count": 3, "average_score": 4.0,
+        "histogram": {"1": 0, "2": 0, "3": 1, "4": 1, "5": 1},
+    }
+
+    sqlite_client.put(f"/reviews/{first['id']}", json={"score": 1})
+    sqlite_client.put(f"/reviews/{moved['id']}", json={"sandwich_id": 2, "score": 2})
+    sqlite_client.put(f"/reviews/{first['id']}", json={"review_text": "changed my mind"})
+
+    one = sqlite_client.get("/sandwiches/1/rating").json()
+    assert one["review_count"] == 2 and one["average_score"] == 2.0
+    assert one["histogram"] == {"1": 1, "2": 0, "3": 1, "4": 0, "5": 0}
+    assert sqlite_client.get("/sandwiches/2/rating").json()["histogram"]["2"] == 1
+
+    sqlite_client.delete(f"/reviews/{moved['id']}")
+    assert sqlite_client.get("/sandwiches/2/rating").json()["review_count"] == 0
+    assert sqlite_client.get("/sandwiches/2/rating").json()["average_score"] is None
+
+
+def test_menu_ratings_include_unreviewed_sandwiches(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+    review(sqlite_client, 2, 4)
+
+    ratings = sqlite_client.get("/sandwiches/ratings").json()
+
+    assert [(rating["sandwich_id"], rating["review_count"], rating["average_score"]) for rating in ratings] == [
+        (1, 0, None), (2, 1, 4.0), (3, 0, None)]
+
+
+def test_rating_of_unknown_sandwich_is_404(sqlite_client, sqlite_session):
+    seed(sqlite_session)
+
+    assert sqlite_client.get("/sandwiches/99/rating").status_code == 404
+    assert sqlite_client.get("/sandwiches/1/rating").json()["review_count"] == 0
+
+
+def test_rebuild_matches_incremental_stats(sqlite_client, sqlite_session, sqlite_engine):
+    seed(sqlite_session)
+    for sandwich_id, score in [(1, 5), (1, 4), (2, 2), (3, None), (3, 1)]:
+        review(sqlite_client, sandwich_id, score)
+    incremental = sqlite_client.get("/sandwiches/ratings").json()
+
+    with sqlite_engine.begin() as connection:
+        sandwich_ratings.rebuild(connection)
+
+    assert sqlite_client.get("/sandwiches/ratings").json() == incremental
@@ -71,6 +71,8 @@ def test_update_resource(db_session):
 
     # Mock the update behavior
     db_session.commit = Mock()
+    db_session.get_bind.return_value.dialect.update_returning = False
+    db_session.execute.return_value.rowcount = 1
 
     # Call the update function
     updated_resource = controller.update(db_session, 1, request_data)
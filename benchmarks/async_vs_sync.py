@@ -0,0 +1,143 @@
+"""
+Compare requests/sec and p99 latency of the sync and async GET /orders paths.
+
+Run from the repository root:  python -m benchmarks.async_vs_sync [requests] [concurrency] [database_url]
+Defaults to 5000 requests at 500 concurrent connections against a throwaway
+SQLite file; pass a MySQL URL (mysql+pymysql://...) to measure the real thing.
+
+Sync handlers keep their pooled connection until dependency teardown, which
+itself needs a free worker thread, so past the threadpool size the sync path
+can stall until pool_timeout; those requests are reported as errors.
+"""
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+import httpx
+import uvicorn
+from datetime import datetime
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from api.dependencies.database import Base, POOL_OPTIONS
+from api.dependencies.pagination import Page
+from api.models import model_loader, customers
+from api.models.customers import Customer
+from api.models.order_details import OrderDetail
+from api.models.orders import Order
+from api.models.sandwiches import Sandwich
+from api.controllers import orders as controller
+from api.schemas import orders as schema
+
+
+def async_url(url):
+    for sync, driver in (("mysql+pymysql://", "mysql+aiomysql://"), ("sqlite://", "sqlite+aiosqlite://")):
+        if url.startswith(sync):
+            return driver + url[len(sync):]
+    raise ValueError(f"No async driver known for {url}")
+
+
+def build_app(url):
+    engine = create_engine(url, **POOL_OPTIONS)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    AsyncSessionLocal = async_sessionmaker(create_async_engine(async_url(url), **POOL_OPTIONS), expire_on_commit=False)
+
+    with SessionLocal() as db:
+        if not db.query(Order).first():
+            customer = Customer(name="Bench", email="bench@example.com")
+            sandwich = Sandwich(sandwich_name="Bench", price=5)
+            db.add_all([
+                Order(customer=customer, customer_name="Bench", order_date=datetime(2024, 11, 1),
+                      order_details=[OrderDetail(sandwich=sandwich, amount=1)])
+                for _ in range(50)
+            ])
+            db.commit()
+
+    def get_db():
+        with SessionLocal() as db:
+            yield db
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/sync", response_model=list[schema.Order])
+    def read_sync(page: Page = Depends(), db: Session = Depends(get_db)):
+        return controller.read_all(db, page)
+
+    @app.get("/async", response_model=list[schema.Order])
+    async def read_async(page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+        return await controller.read_all_async(db, page)
+
+    return app
+
+
+async def load(base_url, path, requests, concurrency):
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path, params={"limit": 20})
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return requests / elapsed, latencies[int(len(latencies) * 0.99) - 1], errors
+
+
+@contextmanager
+def serve(app, backlog):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="critical", backlog=backlog,
+                                          timeout_graceful_shutdown=5))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    url = sys.argv[3] if len(sys.argv) > 3 else f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+    print(f"requests: {requests}  concurrency: {concurrency}")
+    for path in ("/sync", "/async"):
+        # A fresh server per path, so a backlog left by one run cannot slow the next.
+        with serve(build_app(url), backlog=concurrency * 2) as base_url:
+            rate, p99, errors = asyncio.run(load(base_url, path, requests, concurrency))
+        print(f"{path:7} {rate:8,.0f} req/s   p99 {p99 * 1000:8.1f} ms   errors {errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Compare POST /resources once per row against POST /resources/bulk.
+
+Run from the repository root:  python -m benchmarks.bulk_create [rows] [database_url]
+Defaults to a throwaway SQLite file; pass a MySQL URL to measure the real thing.
+"""
+import os
+import sys
+import tempfile
+import time
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+from api.dependencies.database import Base
+from api.models import model_loader, customers
+from api.controllers import resources as controller
+from api.models.resources import Resource
+from api.schemas.resources import ResourceCreate
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    url = sys.argv[2] if len(sys.argv) > 2 else f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    requests = [ResourceCreate(item=f"Item {i}", amount=i, unit="g") for i in range(rows)]
+
+    with SessionLocal() as db:
+        db.execute(delete(Resource))
+        db.commit()
+        started = time.perf_counter()
+        for request in requests:
+            controller.create(db, request)
+        single = time.perf_counter() - started
+
+        db.execute(delete(Resource))
+        db.commit()
+        started = time.perf_counter()
+        controller.create_bulk(db, requests)
+        batched = time.perf_counter() - started
+
+    print(f"rows:        {rows}")
+    print(f"single-row:  {single:.3f}s  ({rows / single:,.0f} rows/s)")
+    print(f"bulk:        {batched:.3f}s  ({rows / batched:,.0f} rows/s)")
+    print(f"speed-up:    {single / batched:.1f}x")
+
+
+if __name__ == "__main__":
+    main()